@@ -0,0 +1,90 @@
+"""
+Benchmark for the .scs packer's compression policy and parallel compression.
+
+Builds a synthetic paint job pack in memory (one DXT5 texture shared by many models,
+plus the usual small text files per model) and packs it several ways:
+
+- "deflate all": every entry deflated, as `pack_to_scs` used to do.
+- "policy":      textures/images stored, text entries deflated (the current default).
+
+Each mode runs on 1 thread and, with --jobs N, on N compression threads.
+
+Run from the repository root:
+
+    python benchmarks/bench_pack_scs.py --textures 4 --models 20 --resolution 2048 --jobs 4
+
+Requires NumPy (the texture is produced by the builtin DDS encoder).
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.dds_encoder import encode_dds
+from core.pack_scs import write_scs
+
+
+def make_texture(resolution: int, seed: int) -> bytes:
+    """Encodes a smooth, slightly noisy RGBA image, which compresses about like a real skin."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:resolution, 0:resolution].astype(np.float32) / resolution
+    rgba = np.empty((resolution, resolution, 4), dtype=np.float32)
+    rgba[..., 0] = 128 + 100 * np.sin(x * 7 + seed)
+    rgba[..., 1] = 128 + 100 * np.cos(y * 5 + seed)
+    rgba[..., 2] = 255 * x * y
+    rgba[..., 3] = 255
+    rgba[..., :3] += rng.normal(0, 6, (resolution, resolution, 3))
+    return encode_dds(np.clip(rgba, 0, 255).astype(np.uint8), "DXT5")
+
+
+def build_entries(work_dir: Path, textures: int, models: int, resolution: int) -> list:
+    entries = []
+    for t in range(textures):
+        texture_path = work_dir / f"skin{t}.dds"
+        texture_path.write_bytes(make_texture(resolution, t))
+        for m in range(models):
+            folder = f"vehicle/truck/upgrade/paintjob/model{m}/skin{t}"
+            entries.append((f"{folder}/skin{t}_0.dds", texture_path))
+            entries.append((f"{folder}/skin{t}_0.tobj", b"\x01\x0a\xb1\x70" + bytes(40) + folder.encode()))
+            definition = f"def/vehicle/truck/model{m}/paint_job"
+            entries.append((f"{definition}/skin{t}.sii", (f'SiiNunit\n{{\naccessory_paint_job_data: skin{t}_0.model{m}.paint_job\n{{\n'
+                                                          f'@include "skin{t}_shared.sui"\n}}\n}}').encode()))
+            entries.append((f"{definition}/skin{t}_shared.sui", f'name: "skin{t}"\nprice: 1\nunlock: 0\n'.encode()))
+    return sorted(entries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--textures", type=int, default=4, help="Number of paint jobs (distinct textures).")
+    parser.add_argument("--models", type=int, default=20, help="Number of models each texture is placed on.")
+    parser.add_argument("--resolution", type=int, default=2048, help="Texture width/height in pixels.")
+    parser.add_argument("--level", type=int, default=6, help="zlib level for deflated entries.")
+    parser.add_argument("--jobs", type=int, default=1, help="Also run each mode with this many compression threads.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        print(f"Encoding {args.textures} texture(s) at {args.resolution}x{args.resolution}...")
+        entries = build_entries(work_dir, args.textures, args.models, args.resolution)
+        raw_size = sum(len(c) if isinstance(c, bytes) else c.stat().st_size for _, c in entries)
+        print(f"{len(entries)} entries, {raw_size / 2**20:.1f} MiB uncompressed\n")
+
+        print(f"{'mode':<12} {'jobs':>4} {'time (s)':>9} {'size (MiB)':>11}")
+        job_counts = sorted({1, args.jobs})
+        for label, stored_extensions in (("deflate all", ()), ("policy", None)):
+            kwargs = {} if stored_extensions is None else {"stored_extensions": stored_extensions}
+            for jobs in job_counts:
+                scs_path = work_dir / f"{label.replace(' ', '_')}_{jobs}.scs"
+                start = time.perf_counter()
+                write_scs(scs_path, entries, args.level, jobs=jobs, **kwargs)
+                elapsed = time.perf_counter() - start
+                print(f"{label:<12} {jobs:>4} {elapsed:>9.2f} {scs_path.stat().st_size / 2**20:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Microbenchmark for the shared .tobj writer (core/tobj_writer.py).
+
+Builds the .tobj of every model of a synthetic pack several ways:
+
+- "hex string":  Paint Job Packer's former implementation (hexlify, concatenate, decode).
+- "build_tobj":  the shared writer, joining the cached header, the length and the path.
+
+With --write, `write_many` is also timed writing every file to a temporary folder.
+
+Run from the repository root:
+
+    python benchmarks/bench_tobj.py --count 20000 --write
+"""
+import argparse
+import binascii
+import codecs
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.tobj_writer import build_tobj, write_many
+
+
+def legacy_hex_tobj(path: str) -> bytes:
+    """Paint Job Packer's original generate_tobj, kept here as the baseline."""
+    tobj_string = "010AB170000000000000000000000000000000000100020002000303030002020001000000010000"
+    tobj_string += binascii.hexlify(bytes([len(path)])).decode()
+    tobj_string += "00000000000000"
+    tobj_string += binascii.hexlify(path.encode()).decode()
+    return codecs.decode(tobj_string, "hex_codec")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20000, help="Number of .tobj files to build.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per method; the best time is shown.")
+    parser.add_argument("--write", action="store_true", help="Also time write_many writing the files to disk.")
+    args = parser.parse_args()
+
+    paths = [f"/vehicle/truck/upgrade/paintjob/model{i % 200}/skin{i:04d}/skin{i:04d}.dds" for i in range(args.count)]
+    if any(legacy_hex_tobj(path) != build_tobj(path, "clamp") for path in paths[:100]):
+        sys.exit("The shared writer doesn't match the hex-string implementation.")
+
+    methods = [
+        ("hex string", lambda: [legacy_hex_tobj(path) for path in paths]),
+        ("build_tobj", lambda: [build_tobj(path, "clamp") for path in paths]),
+    ]
+
+    print(f"{'method':<12} {'time (ms)':>10} {'us/file':>8}")
+    for label, run in methods:
+        best = min(_timed(run) for _ in range(args.repeat))
+        print(f"{label:<12} {best * 1000:>10.1f} {best / args.count * 1e6:>8.2f}")
+
+    if args.write:
+        with tempfile.TemporaryDirectory() as tmp:
+            tobjs = [(Path(tmp) / f"{i}.tobj", path) for i, path in enumerate(paths)]
+            elapsed = _timed(lambda: write_many(tobjs, "clamp"))
+            print(f"{'write_many':<12} {elapsed * 1000:>10.1f} {elapsed / args.count * 1e6:>8.2f}")
+
+
+def _timed(run) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
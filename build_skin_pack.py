@@ -8,32 +8,46 @@ This script:
 - Organizes all mod files into an SCS-compatible structure
 - Optionally packages everything into a .scs file
 
+Work is split into independent units (one per image, one per vehicle model). Images are
+processed in parallel across several processes, vehicle models on threads:
+
+    python build_skin_pack.py --jobs 8
+
 Dependencies:
 - Pillow
-- texconv (external DDS converter)
+- texconv (external DDS converter), or NumPy for the builtin encoder (dds_backend = "builtin")
 """
 
 import os
 import sys
-import zipfile
+import argparse
+import shutil
 import logging
 #import subprocess
 from pathlib import Path
 #from PIL import Image
-from collections import Counter
-import random
+from typing import NamedTuple, Optional
 
 # Project-specific modules
-from core.tobj_writer import write_tobj
-from core.sui_file_creation import create_truck_sui, create_trailer_sui
-from core.sii_file_creation import create_truck_sii, create_trailer_sii
+from core.sii_templates import render_all
 from core.trailer_models import trailer_models
 from core.truck_models import truck_models
-from core.create_ui_mat import create_ui_mat
-from core.create_tobj import create_tobj
-from core.image_utils import resize_image, convert_to_dds, create_mod_icon
-from core.mod_metadata import write_manifest, write_description
+from core.create_ui_mat import render_ui_mat
+from core.create_tobj import render_tobj
+from core.image_pyramid import ImagePyramid, estimate_memory
+from core.dds_cache import (
+    encode_dds_cached, encode_image_dds_cached, queue_dds_cached, queue_image_dds_cached, flush_dds_queue
+)
+from core.mod_metadata import render_manifest
+from core.output_sink import ArchiveSink, DirectorySink
+from core.texture_profiles import TextureProfile, profile_for_model, validate_profiles
+from core.paint_ids import assign_paint_ids, load_paint_id_map, save_paint_id_map
+from core.build_manifest import (
+    settings_fingerprint, load_manifest, save_manifest, empty_manifest, source_state,
+    make_image_record, is_reusable, prune_folder, remove_stale_outputs
+)
 from core.pack_scs import pack_to_scs
+from core.parallel import WorkUnit, WorkUnitError, run_work_units, iter_work_units, resolve_job_count, parse_memory_size
 
 
 from core.config import (
@@ -41,308 +55,589 @@ from core.config import (
     generate_zip, output_folder, paintjob_root, def_root,
     ui_folder, mod_icon_path, temp_folder, paint_job_prefix,
     mod_version, mod_author, mod_description_content,
-    ui_accessory_resolution
+    ui_accessory_resolution, dds_cache_folder, use_hardlinks,
+    build_jobs, dds_backend, in_memory_pipeline, write_staging_folder,
+    scs_compress_level, scs_stored_extensions, incremental_build, build_manifest_path,
+    paint_id_digits, paint_id_map_path, texconv_batch_size, dds_queue_folder,
+    dds_mipmaps, mipmap_filter, resolution_profiles, max_memory
 )
 
 # === LOGGING SETUP ===
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+# Bump whenever a change to the generators alters the files they produce,
+# so incremental builds don't reuse outputs made by an older version.
+GENERATOR_VERSION = 2
+
+
+def _mod_path(path: Path) -> str:
+    """Turns a path below `output_folder` (as configured in core/config.py) into a mod/archive path like "def/vehicle"."""
+    return path.relative_to(output_folder).as_posix()
+
+
+# Per vehicle type: (type name, model list, paint job root).
+# Roots are mod paths (relative to the mod root, "/"-separated), as used inside the .scs archive.
+# The definition files go below def_root (see `core.sii_templates.render_all`).
+VEHICLE_TYPES = [
+    ("truck", truck_models, _mod_path(paintjob_root / "truck/upgrade/paintjob")),
+    ("trailer_owned", trailer_models, _mod_path(paintjob_root / "trailer_owned/upgrade/paintjob")),
+]
+
+
+def _batch_texconv() -> bool:
+    """Whether texconv conversions are queued and run in batches (see `flush_dds_queue`)."""
+    return dds_backend == "texconv" and texconv_batch_size > 0
+
+
+def _encode_image(image, texture_format: str, mipmaps=1) -> Path:
+    """Encodes an in-memory image through the DDS cache, or queues it for a batched texconv run."""
+    if _batch_texconv():
+        return queue_image_dds_cached(image, dds_cache_folder, dds_queue_folder, texture_format, dds_backend, mipmaps, mipmap_filter)
+    return encode_image_dds_cached(texconv_path, image, dds_cache_folder, texture_format, dds_backend, mipmaps, mipmap_filter)
+
+
+def _encode_file(src: Path, texture_format: str, mipmaps=1) -> Path:
+    """Encodes an image file through the DDS cache, or queues it for a batched texconv run."""
+    if _batch_texconv():
+        return queue_dds_cached(src, dds_cache_folder, dds_queue_folder, texture_format, dds_backend, mipmaps, mipmap_filter)
+    return encode_dds_cached(texconv_path, src, dds_cache_folder, texture_format, dds_backend, mipmaps, mipmap_filter)
+
+
+def _image_resolutions(profiles: list) -> list:
+    """
+    Every size a source image is resized to: one per texture profile, then the UI accessory icon.
+
+    The same list drives the resizing in the work units and their memory estimate (see
+    `estimate_memory`), so the `max_memory` budget counts exactly the buffers a unit holds.
+    `image_resolution` itself only matters through the profiles that use it.
+
+    Args:
+        profiles (list[TextureProfile]): The distinct texture profiles in use.
+
+    Returns:
+        list[tuple[int, int]]: The distinct sizes, in profile order.
+    """
+    return list(dict.fromkeys([tuple(profile.resolution) for profile in profiles] + [tuple(ui_accessory_resolution)]))
+
 
-# === INIT ===
-logging.info("Initializing script and creating base folder structure...")
-# Create required folder structure
-for folder in [paintjob_root, def_root, ui_folder, temp_folder]:
-    folder.mkdir(parents=True, exist_ok=True)
-    logging.info(f"Ensured output sub-folder exists: {folder}")
-
-# === PRE-FLIGHT CHECKS ===
-logging.info("Performing pre-flight checks...")
-# Check if input folder exists
-input_folder_path = Path(input_folder)
-if not input_folder_path.is_dir():
-    logging.error(f"Input folder '{input_folder}' not found.")
-    logging.error("Please ensure the folder exists and the path is correctly set in core/config.py.")
-    sys.exit(1)
-
-# Gather source images
-images = [f for f in os.listdir(input_folder) if f.lower().endswith((".jpg", ".png"))]
-
-# Check if images were found
-if not images:
-    logging.error(f"No images (.jpg or .png) found in input folder '{input_folder}'.")
-    logging.error("Please add your skin textures to this folder.")
-    sys.exit(1)
-else:
-    logging.info(f"Found {len(images)} image(s) in '{input_folder}'.")
-
-
-def generate_random_paint_id():
+# === WORK UNITS ===
+# Work units don't write into the mod themselves. They return a list of mod entries,
+# `(mod path, bytes | Path)`, and the main process hands those to the output sink
+# (the .scs archive, or the staging folder). See core/output_sink.py.
+
+def _encode_textures_in_memory(input_path: Path, paint_id: str, profiles: list, with_icon: bool = False) -> tuple:
     """
-    Generate a unique paint job ID in the format girlXXXX, where X is a digit.
-    Ensures random and valid texture names using the prefix from config.
+    Encodes the paint job textures and the UI accessory icon without intermediate files.
+
+    The source image is read once; the resized textures, the UI icon and (optionally) the
+    mod icon are derived from it in memory and handed straight to the encoders.
+
+    Args:
+        input_path (Path): Path to the source image.
+        paint_id (str): The paint job's unique identifier (used for log messages).
+        profiles (list[TextureProfile]): The distinct texture profiles to encode.
+        with_icon (bool): Whether to also render the mod icon from this image. Defaults to False.
 
     Returns:
-        str: A unique paint job ID string (e.g., "skin1234" if prefix is "skin").
+        tuple[dict, Path, bytes | None]: The cached paint job DDS per profile key, the cached
+                                         UI accessory DDS, and the mod icon JPEG (None unless `with_icon`).
+    """
+    # Every size is produced from one decode of the source: the texture resolutions first (from
+    # the source), then the UI and mod icons (from the smallest texture that is large enough).
+    pyramid = ImagePyramid(input_path)
+    logging.info(f"  [{paint_id}] Loading '{input_path}' and resizing in memory...")
+    pyramid.get_many(_image_resolutions(profiles))
+    ui_image = pyramid.get(ui_accessory_resolution)
+    mod_icon = pyramid.mod_icon() if with_icon else None
+    pyramid.drop_source() # Free the full-size source before encoding
+
+    paint_dds_paths = {}
+    for profile in profiles:
+        logging.info(f"  [{paint_id}] Encoding paint job texture ({profile.key}, mipmaps: {dds_mipmaps})...")
+        paint_dds_paths[profile.key] = _encode_image(pyramid.get(profile.resolution), profile.dds_format, dds_mipmaps)
+
+    logging.info(f"  [{paint_id}] Encoding UI accessory icon...")
+    ui_dds_path = _encode_image(ui_image, dds_format)
+    return paint_dds_paths, ui_dds_path, mod_icon
+
+
+def _encode_textures_via_temp_files(input_path: Path, paint_id: str, profiles: list, with_icon: bool = False) -> tuple:
+    """
+    Encodes the paint job textures and the UI accessory icon through PNG files in `temp_folder`.
+
+    This is the original staging flow, kept for debugging (`in_memory_pipeline = False`):
+    every intermediate image can be inspected afterwards.
+
+    Args:
+        input_path (Path): Path to the source image.
+        paint_id (str): The paint job's unique identifier.
+        profiles (list[TextureProfile]): The distinct texture profiles to encode.
+        with_icon (bool): Whether to also render the mod icon from this image. Defaults to False.
+
+    Returns:
+        tuple[dict, Path, bytes | None]: The cached paint job DDS per profile key, the cached
+                                         UI accessory DDS, and the mod icon JPEG (None unless `with_icon`).
+    """
+    # Resize the source image to every resolution a profile asks for (e.g., 4096x4096),
+    # saving each as a PNG in the temporary folder.
+    # The source is decoded only once (see `ImagePyramid`).
+    pyramid = ImagePyramid(input_path)
+    resized_images = pyramid.get_many(_image_resolutions(profiles))
+    resized_paths = {}
+    for resolution in dict.fromkeys(tuple(profile.resolution) for profile in profiles):
+        resized = resized_images[resolution]
+        suffix = "" if resolution == image_resolution else f"_{resolution[0]}x{resolution[1]}"
+        resized_path = temp_folder / f"{paint_id}{suffix}.png"
+        logging.info(f"  [{paint_id}] Resizing '{input_path}' to {resolution} and saving to '{resized_path}'...")
+        resized.save(resized_path)
+        resized_paths[resolution] = resized_path
+
+    # Define the output path for the UI accessory specific image
+    ui_accessory_resized_path = temp_folder / f"{paint_id}_ui_accessory.png"
+    logging.info(f"  [{paint_id}] Resizing for UI accessory to {ui_accessory_resolution} and saving to '{ui_accessory_resized_path}'...")
+    pyramid.get(ui_accessory_resolution).save(ui_accessory_resized_path)
+    mod_icon = pyramid.mod_icon() if with_icon else None
+    del pyramid
+
+    paint_dds_paths = {}
+    for profile in profiles:
+        logging.info(f"  [{paint_id}] Encoding paint job texture ({profile.key}, mipmaps: {dds_mipmaps})...")
+        paint_dds_paths[profile.key] = _encode_file(resized_paths[profile.resolution], profile.dds_format, dds_mipmaps)
+    ui_dds_path = _encode_file(ui_accessory_resized_path, dds_format)
+    return paint_dds_paths, ui_dds_path, mod_icon
+
+
+class ImageAssets(NamedTuple):
+    """
+    The cached files produced from one source image by `_process_image`.
+
+    Attributes:
+        paint_dds (dict[str, Path]): The paint job texture for each texture profile
+                                     (by `TextureProfile.key`), shared by every model using that profile.
+        ui_dds (Path): The UI accessory icon texture.
+        mod_icon (Path | None): The mod icon JPEG, if this image provides it.
     """
-    digits = ''.join(str(random.randint(0, 9)) for _ in range(4)) # Generate 4 random digits
-    return f"{paint_job_prefix}{digits}" # Combine with prefix from config
-
-# Generate unique paint IDs for each source image.
-# This loop ensures that even if random IDs collide (unlikely with enough digits),
-# we generate a unique ID for every image.
-paint_ids = set()
-while len(paint_ids) < len(images):
-    paint_ids.add(generate_random_paint_id())
-paint_ids = list(paint_ids)
-
-# === HELPER FUNCTION ===
-def _process_vehicle_type(
+    paint_dds: dict
+    ui_dds: Path
+    mod_icon: Optional[Path] = None
+
+    def files(self) -> dict:
+        """The files by role, as recorded in the build manifest."""
+        files = {f"paint_dds:{key}": path for key, path in self.paint_dds.items()}
+        files.update(ui_dds=self.ui_dds, mod_icon=self.mod_icon)
+        return files
+
+    @classmethod
+    def from_files(cls, files: dict, with_icon: bool) -> "ImageAssets":
+        """Rebuilds the assets from a build manifest record's files (see `files`)."""
+        paint_dds = {role.split(":", 1)[1]: Path(path) for role, path in files.items() if role.startswith("paint_dds:")}
+        mod_icon = Path(files["mod_icon"]) if with_icon and files.get("mod_icon") else None
+        return cls(paint_dds, Path(files["ui_dds"]), mod_icon)
+
+
+def _process_image(img_file: str, paint_id: str, profiles: list, with_icon: bool = False) -> ImageAssets:
+    """
+    Processes a single source image: resizing, texture encoding and UI icon.
+
+    This is the per-image work unit, and the expensive part of a build. It:
+    1.  Resizes the source image to every resolution in `profiles` and to the UI accessory
+        size (see `_image_resolutions`), in memory or via PNGs in `temp_folder` depending on `in_memory_pipeline`.
+    2.  Encodes the paint job texture to DDS exactly once per texture profile (see
+        `core.dds_cache`). Each result is shared by every truck and trailer model with that
+        profile, and reused on later runs if unchanged.
+        With texconv batching (`texconv_batch_size`), the texture is only queued here and
+        converted together with all other images by `flush_dds_queue` in the main process.
+    3.  Encodes the UI accessory icon, and renders the mod icon if requested.
+
+    Everything it produces lives in the DDS cache, so an incremental build can skip this
+    unit entirely for unchanged images (see `core.build_manifest`).
+
+    Args:
+        img_file (str): File name of the source image inside `input_folder`.
+        paint_id (str): The unique identifier assigned to this image's paint job.
+        profiles (list[TextureProfile]): The distinct texture profiles used by the vehicle models
+                                         (see `core.texture_profiles`).
+        with_icon (bool): Whether this image also provides the mod icon (mod_icon.jpg).
+                          Defaults to False.
+
+    Returns:
+        ImageAssets: The cached files for this image.
+    """
+    input_path = Path(input_folder) / img_file
+
+    if in_memory_pipeline:
+        paint_dds_paths, ui_dds_path, mod_icon = _encode_textures_in_memory(input_path, paint_id, profiles, with_icon)
+    else:
+        paint_dds_paths, ui_dds_path, mod_icon = _encode_textures_via_temp_files(input_path, paint_id, profiles, with_icon)
+
+    mod_icon_cache_path = None
+    if mod_icon is not None:
+        dds_cache_folder.mkdir(parents=True, exist_ok=True)
+        mod_icon_cache_path = dds_cache_folder / f"{ui_dds_path.stem}_mod_icon.jpg"
+        mod_icon_cache_path.write_bytes(mod_icon)
+    if _batch_texconv():
+        logging.info(f"  [{paint_id}] Textures queued for texconv.")
+    else:
+        logging.info(f"  [{paint_id}] Textures encoded successfully.")
+    return ImageAssets(paint_dds_paths, ui_dds_path, mod_icon_cache_path)
+
+
+def _image_entries(paint_id: str, assets: ImageAssets) -> list:
+    """
+    Builds the mod entries for one paint job's UI assets (and the mod icon, if it has it).
+
+    These are the icon, its texture object and its material for the in-game paint job selection menu.
+    The .mat uses the base name "{paint_id}_ui_accessory" and references "{paint_id}_ui_accessory.tobj".
+
+    Args:
+        paint_id (str): The paint job's unique identifier.
+        assets (ImageAssets): The cached files produced from the paint job's image.
+
+    Returns:
+        list[tuple[str, bytes | Path]]: The mod entries.
+    """
+    ui_base = f"{_mod_path(ui_folder)}/{paint_id}_ui_accessory"
+    entries = [
+        (f"{ui_base}.dds", assets.ui_dds),
+        (f"{ui_base}.tobj", render_tobj(f"{paint_id}_ui_accessory.dds", "/material/ui/accessory", save_mode="default")),
+        (f"{ui_base}.mat", render_ui_mat(f"{paint_id}_ui_accessory").encode("utf-8")),
+    ]
+    if assets.mod_icon is not None:
+        entries.append((_mod_path(mod_icon_path), assets.mod_icon))
+    return entries
+
+
+def _process_vehicle_model(
     vehicle_type_name: str,
-    vehicle_models_list: list,
+    model: str,
     current_paint_id: str,
-    source_resized_image_path: Path,
-    base_paintjob_path_root: Path,
-    base_def_path_root: Path,
-    external_texconv_path: str,
-    texture_dds_format: str,
-    sii_create_function,
-    sui_create_function,
-):
+    source_dds_path: Path,
+    base_paintjob_path_root: str,
+) -> list:
     """
-    Processes paint job generation for a specific vehicle type (e.g., truck, trailer) and all its models.
+    Generates the paint job texture entries for one model of a vehicle type (e.g., truck, trailer).
 
-    This function orchestrates several steps for each model in the provided list:
-    1.  Creates the necessary output directory structure for the paint job files.
-    2.  Determines the correct DDS filename and internal TOBJ texture path based on whether
+    The texture for the paint job has already been encoded once (see `_process_image`);
+    this function only fans that single DDS out to the model:
+    1.  Determines the correct DDS filename and internal TOBJ texture path based on whether
         it's a truck or a trailer (e.g., "_0.dds" for trucks, "_shared.dds" for trailers).
-    3.  Calls `convert_to_dds` to convert the master resized source image to the DDS format.
-    4.  Renames the converted DDS file to the game's expected naming convention.
-    5.  Calls `create_tobj` to generate the texture object file that references the DDS.
-    6.  Calls the provided SII and SUI creation functions to generate the main definition
-        files for the paint job.
-    7.  Creates empty placeholder SUI files for optional metallic and mask properties,
-        allowing users to customize these later.
+    2.  Places the encoded DDS under that name.
+    3.  Renders the texture object file that references the DDS.
+
+    The definition files (.sii/.sui) are rendered by `_generate_model_files`.
 
     Args:
         vehicle_type_name (str): Identifier for the vehicle type, typically "truck" or "trailer_owned".
-        vehicle_models_list (list[str]): A list of internal game model names for this vehicle type
-                                         (e.g., ["scania.s_2016", "volvo.fh16_2012"]).
+        model (str): The internal game model name (e.g., "scania.s_2016").
         current_paint_id (str): The unique identifier for the current paint job being processed.
-        source_resized_image_path (Path): Path to the (master) resized PNG image that serves as the
-                                          source texture for this paint job.
-        base_paintjob_path_root (Path): The root directory within the mod structure where paint job
-                                        files for this vehicle type should be stored (e.g., "output_mod/vehicle/truck/upgrade/paintjob").
-        base_def_path_root (Path): The root directory within the mod structure where definition
-                                   files for this vehicle type should be stored (e.g., "output_mod/def/vehicle/truck").
-        external_texconv_path (str): Filesystem path to the texconv.exe utility.
-        texture_dds_format (str): The DDS compression format to use (e.g., "DXT5").
-        sii_create_function (callable): A function (e.g., `create_truck_sii`) that will be called
-                                        to generate the main .sii accessory definition file.
-        sui_create_function (callable): A function (e.g., `create_truck_sui`) that will be called
-                                        to generate the shared .sui accessory definition file.
-    
+        source_dds_path (Path): Path to the DDS texture encoded once for this paint job,
+                                which is placed into every model's paint job folder.
+        base_paintjob_path_root (str): The mod path where paint job files for this vehicle type
+                                       are stored (e.g., "vehicle/truck/upgrade/paintjob").
+
+    Returns:
+        list[tuple[str, bytes | Path]]: The mod entries for this model and paint job.
+
     Raises:
         ValueError: If `vehicle_type_name` is not one of the expected values.
     """
-    logging.info(f"Processing {vehicle_type_name} models for paint ID: {current_paint_id}...")
-    for model in vehicle_models_list:
-        logging.info(f"  Generating files for {vehicle_type_name} model: {model}, paint ID: {current_paint_id}")
-        # Construct the specific output folder for this paintjob, model, and vehicle type
-        paint_folder = base_paintjob_path_root / model / current_paint_id
-        paint_folder.mkdir(parents=True, exist_ok=True) # Create directory if it doesn't exist
-        logging.debug(f"    Ensured paint folder exists: {paint_folder}")
-
-        # Determine target DDS filename and TOBJ texture path based on vehicle type conventions
-        if vehicle_type_name == "truck":
-            target_dds_filename = f"{current_paint_id}_0.dds"
-            # Note: TOBJ paths for trucks often use "..dds" for one of the texture map entries
-            tobj_texture_path = f"/vehicle/truck/upgrade/paintjob/{model}/{current_paint_id}/{current_paint_id}_0..dds"
-        elif vehicle_type_name == "trailer_owned":
-            target_dds_filename = f"{current_paint_id}_shared.dds"
-            tobj_texture_path = f"/vehicle/trailer_owned/upgrade/paintjob/{model}/{current_paint_id}/{target_dds_filename}"
-        else:
-            # This case should ideally not be reached if called with correct parameters
-            raise ValueError(f"Invalid vehicle_type_name provided: {vehicle_type_name}")
-
-        # Convert the master resized image to DDS format for this specific model
-        # The output DDS will initially be named based on current_paint_id (e.g., "paint001.DDS")
-        convert_to_dds(external_texconv_path, source_resized_image_path, paint_folder, texture_dds_format)
-        
-        # Rename the output DDS to the specific convention required (e.g., "paint001_0.dds")
-        source_dds_output_path = paint_folder / f"{current_paint_id}.DDS" # Default output name from texconv
-        final_dds_path = paint_folder / target_dds_filename
-        if source_dds_output_path.exists():
-            source_dds_output_path.rename(final_dds_path)
-        elif final_dds_path.exists(): # If texconv directly created the final name (e.g. if source was already .dds or due to other reasons)
-            pass # File is already correctly named, no action needed
-        else:
-            # Log a warning if the expected DDS file isn't found after conversion attempt
-            logging.warning(f"DDS file {source_dds_output_path} not found after conversion for model {model}, paint ID {current_paint_id}. Skipping rename.")
-
-
-        # Create the TOBJ (Texture Object) file for the newly converted and renamed DDS
-        # The TOBJ filename matches the DDS filename, but with a .tobj extension.
-        tobj_file_path = paint_folder / target_dds_filename.replace(".dds", ".tobj")
-        # The path stored inside the TOBJ is the relative path to the DDS file from the mod's root.
-        # The first argument to create_tobj is just the filename part of the texture path.
-        create_tobj(tobj_texture_path.split('/')[-1], tobj_file_path, "/".join(tobj_texture_path.split('/')[:-1]), save_mode="default")
-
-
-        # Create definition files (.sii for main accessory, .sui for shared attributes)
-        # These files tell the game how to use the paint job.
-        def_path = base_def_path_root / model / "paint_job"
-        def_path.mkdir(parents=True, exist_ok=True) # Ensure definition subfolder exists
-        
-        # Call the respective SUI and SII creation functions passed as arguments
-        # These functions are specific to trucks or trailers.
-        sui_create_function(current_paint_id, def_path / f"{current_paint_id}_shared.sui", model)
-        sii_create_function(current_paint_id, def_path / f"{current_paint_id}.sii", model)
-
-        # Create empty include stubs for metallic and mask SUI files.
-        # These allow users to later add custom metallic/mask properties by editing these files
-        # without needing to change the main SUI/SII files.
-        for suffix in ["metallic", "mask"]:
-            include_path = def_path / f"{current_paint_id}_{suffix}.sui"
-            include_path.write_text("") # Create an empty file
-        logging.debug(f"    Created definition files and stubs for {model}, paint ID {current_paint_id}")
-    logging.info(f"Finished processing {vehicle_type_name} models for paint ID {current_paint_id}.\n")
-
-# === MAIN PROCESSING LOOP ===
-# Iterate over each source image found in the input folder.
-# Each image will become a distinct paint job available on all specified trucks/trailers.
-logging.info(f"Starting main processing for {len(images)} image(s) found in '{input_folder_path}'.")
-for idx, img_file in enumerate(images):
-    paint_id = paint_ids[idx] # Get the unique pre-generated ID for this image
-    logging.info(f"--- Processing image {idx+1}/{len(images)}: '{img_file}' with paint_id: '{paint_id}' ---")
+    logging.debug(f"  [{current_paint_id}] Generating files for {vehicle_type_name} model: {model}")
+    # The mod folder for this paintjob, model, and vehicle type
+    paint_folder = f"{base_paintjob_path_root}/{model}/{current_paint_id}"
+
+    # Determine target DDS filename and TOBJ texture path based on vehicle type conventions
+    if vehicle_type_name == "truck":
+        target_dds_filename = f"{current_paint_id}_0.dds"
+        # Note: TOBJ paths for trucks often use "..dds" for one of the texture map entries
+        tobj_texture_path = f"/vehicle/truck/upgrade/paintjob/{model}/{current_paint_id}/{current_paint_id}_0..dds"
+    elif vehicle_type_name == "trailer_owned":
+        target_dds_filename = f"{current_paint_id}_shared.dds"
+        tobj_texture_path = f"/vehicle/trailer_owned/upgrade/paintjob/{model}/{current_paint_id}/{target_dds_filename}"
+    else:
+        # This case should ideally not be reached if called with correct parameters
+        raise ValueError(f"Invalid vehicle_type_name provided: {vehicle_type_name}")
 
-    input_path = Path(input_folder) / img_file
-    # Define path for the master resized version of the current image (saved as PNG in a temporary folder)
-    resized_path = temp_folder / f"{paint_id}.png" 
-    
-    # Resize the source image to the configured resolution (e.g., 4096x4096).
-    # This resized PNG is then used as the single source for all subsequent DDS conversions for this paint_id.
-    logging.info(f"  Resizing '{input_path}' to {image_resolution} and saving to '{resized_path}'...")
-    resize_image(input_path, resized_path, image_resolution)
-
-    # --- Generate UI (User Interface) assets for the paint job ---
-    # These are icons and material files for the in-game paint job selection menu.
-    logging.info(f"  Generating UI assets for '{paint_id}'...")
+    # The TOBJ filename matches the DDS filename, but with a .tobj extension.
+    # The path stored inside the TOBJ is the path to the DDS file from the mod's root.
+    tobj_filename = target_dds_filename.replace(".dds", ".tobj")
+    tobj_texture_folder, tobj_texture_name = tobj_texture_path.rsplit("/", 1)
 
-    # Define the output path for the UI accessory specific image
-    ui_accessory_resized_path = temp_folder / f"{paint_id}_ui_accessory.png"
+    return [
+        # The already-encoded DDS for this model under its final name (e.g., "paint001_0.dds")
+        (f"{paint_folder}/{target_dds_filename}", source_dds_path),
+        (f"{paint_folder}/{tobj_filename}", render_tobj(tobj_texture_name, tobj_texture_folder, save_mode="default")),
+    ]
 
-    logging.info(f"  Resizing for UI accessory: '{resized_path}' to {ui_accessory_resolution} and saving to '{ui_accessory_resized_path}'...")
-    resize_image(resized_path, ui_accessory_resized_path, ui_accessory_resolution) # Add the new resize call
-
-    # Convert the resized image to DDS format for UI purposes.
-    # Input PNG is {paint_id}_ui_accessory.png, so output from convert_to_dds will be {paint_id}_ui_accessory.DDS
-    convert_to_dds(texconv_path, ui_accessory_resized_path, ui_folder, dds_format)
-    
-    # Define expected DDS names
-    original_dds_output_name = ui_folder / f"{paint_id}_ui_accessory.DDS" # Name as output by convert_to_dds
-    final_ui_dds_name = ui_folder / f"{paint_id}_ui_accessory.dds"      # Desired final name with lowercase .dds
-
-    # Rename to ensure lowercase .dds extension
-    if original_dds_output_name.exists():
-        if original_dds_output_name != final_ui_dds_name: # Avoid renaming if it's already correct (e.g. texconv changes)
-            original_dds_output_name.rename(final_ui_dds_name)
-            logging.debug(f"    Renamed UI DDS to {final_ui_dds_name}")
-        else:
-            logging.debug(f"    UI DDS already has correct name and case: {final_ui_dds_name}")
-    elif final_ui_dds_name.exists():
-        logging.debug(f"    UI DDS already exists with correct name: {final_ui_dds_name}")
-    else:
-        logging.warning(f"    Expected UI DDS file {original_dds_output_name} or {final_ui_dds_name} not found after conversion.")
-
-    # Create TOBJ file for the UI DDS.
-    # The first argument is the texture name (e.g., "paintjob001_ui_accessory.dds")
-    # The second argument is the full path to where the .tobj file should be saved (e.g., "output_mod/material/ui/accessory/paintjob001_ui_accessory.tobj")
-    create_tobj(
-        f"{paint_id}_ui_accessory.dds",
-        ui_folder / f"{paint_id}_ui_accessory.tobj",
-        "/material/ui/accessory",
-        save_mode="default"
-    )
-    # Create the .mat (material) file for the UI.
-    # This needs to use the base name "{paint_id}_ui_accessory" to correctly generate
-    # "{paint_id}_ui_accessory.mat" and reference "{paint_id}_ui_accessory.tobj" internally.
-    create_ui_mat(f"{paint_id}_ui_accessory", ui_folder)
-    logging.info(f"  UI assets for '{paint_id}' generated successfully.")
-
-    # --- Process Truck Paint Jobs ---
-    # Call the helper function to generate all truck-specific files for the current paint_id.
-    logging.info(f"  Starting truck paint job processing for '{paint_id}'...")
-    _process_vehicle_type(
-        vehicle_type_name="truck",
-        vehicle_models_list=truck_models,
-        current_paint_id=paint_id,
-        source_resized_image_path=resized_path,
-        base_paintjob_path_root=paintjob_root / "truck/upgrade/paintjob",
-        base_def_path_root=def_root / "vehicle/truck",
-        external_texconv_path=texconv_path,
-        texture_dds_format=dds_format,
-        sii_create_function=create_truck_sii,
-        sui_create_function=create_truck_sui
-    )
 
-    # --- Process Trailer Paint Jobs ---
-    # Call the helper function to generate all trailer-specific files for the current paint_id.
-    logging.info(f"  Starting trailer paint job processing for '{paint_id}'...")
-    _process_vehicle_type(
-        vehicle_type_name="trailer_owned",
-        vehicle_models_list=trailer_models,
-        current_paint_id=paint_id,
-        source_resized_image_path=resized_path,
-        base_paintjob_path_root=paintjob_root / "trailer_owned/upgrade/paintjob",
-        base_def_path_root=def_root / "vehicle/trailer_owned",
-        external_texconv_path=texconv_path,
-        texture_dds_format=dds_format,
-        sii_create_function=create_trailer_sii,
-        sui_create_function=create_trailer_sui
-    )
+def _generate_model_files(vehicle_type_name: str, model: str, paint_jobs: list,
+                          base_paintjob_path_root: str, def_root_path: str) -> list:
+    """
+    Generates the files of every paint job for one vehicle model.
 
-    logging.info(f"--- Finished processing for paint_id: '{paint_id}' ---\n")
-
-# === FINAL STEPS ===
-# These steps are performed once after all images have been processed.
-logging.info("Starting final steps for mod packaging...")
-
-# === MOD ICON ===
-# Uses the first image from the input folder to generate the mod icon (mod_icon.jpg).
-# This icon is displayed in the game's mod manager.
-if images: # Check if there were any images to process (and thus, an images[0] exists)
-    logging.info("Generating mod icon...")
-    first_image_path = Path(input_folder) / images[0] # Use the first image found
-    create_mod_icon(first_image_path, mod_icon_path)
-    # The create_mod_icon function in image_utils already prints/logs, so no need for a duplicate message here
-    # logging.info(f"Mod icon generated from '{images[0]}' and saved to '{mod_icon_path}'")
-else:
-    logging.warning("No images found, skipping mod icon generation.")
-
-
-# === Manifest & Description Files ===
-# These files provide metadata for the mod (name, author, version, description) for the game.
-logging.info("Generating mod manifest and description files...")
-write_manifest(output_folder, mod_name, mod_version, mod_author)
-write_description(output_folder, mod_description_content)
-# The write_manifest/description functions in mod_metadata already print/log
-# logging.info("Mod manifest (manifest.sii) and description (mod_description.txt) generated.")
-
-# === PACK TO .SCS ARCHIVE ===
-# If generate_zip is True in the configuration, pack the entire output folder 
-# into an .scs archive, which is the format mods use in the game.
-if generate_zip:
-    logging.info(f"Attempting to pack contents of '{output_folder}' into an .scs archive...")
-    # The pack_to_scs function will typically name the archive based on mod_name.
-    scs_file = pack_to_scs(output_folder, mod_name) 
-    logging.info(f"Mod successfully packed into: '{scs_file}'")
-else:
-    # If generate_zip is False, the script will leave the generated files in the output_folder.
-    # This is useful for debugging or manual adjustments before packing.
-    logging.info(f"Mod files prepared in '{output_folder}'. SCS archive generation was skipped (as per config).")
-
-logging.info("\nAll tasks completed successfully!")
+    This is the per-model work unit: the textures and texture objects of each paint job
+    (see `_process_vehicle_model`), followed by the definition files of all paint jobs
+    (see `core.sii_templates.render_all`).
 
+    Args:
+        vehicle_type_name (str): "truck" or "trailer_owned".
+        model (str): The internal game model name (e.g., "scania.s_2016").
+        paint_jobs (list[tuple[str, Path]]): `(paint ID, encoded DDS for this model's texture profile)` pairs.
+        base_paintjob_path_root (str): The mod path of this vehicle type's paint job folders.
+        def_root_path (str): The mod path of the definition folder (e.g., "def").
+
+    Returns:
+        list[tuple[str, bytes | Path]]: The mod entries for this model.
+    """
+    logging.info(f"  Generating files for {vehicle_type_name} model: {model}")
+    entries = []
+    for paint_id, source_dds_path in paint_jobs:
+        entries.extend(_process_vehicle_model(vehicle_type_name, model, paint_id, source_dds_path, base_paintjob_path_root))
+    entries.extend(render_all([paint_id for paint_id, _ in paint_jobs], [(vehicle_type_name, model)], def_root_path))
+    return entries
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parses command-line options. Everything else is configured in core/config.py.
+
+    Args:
+        argv (list[str], optional): Arguments to parse. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Build an ETS2/ATS paint job pack from the images in the input folder.")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=build_jobs,
+        help="Number of worker processes, and of .scs compression or staging folder writer threads "
+             "(1 = serial, 0 = one per CPU core). "
+             "Defaults to build_jobs in core/config.py."
+    )
+    parser.add_argument(
+        "--max-mem", default=max_memory,
+        help="Memory budget for the images processed at the same time (e.g. 8G, 512M). New images are only "
+             "started when their buffers fit. Defaults to max_memory in core/config.py (no limit)."
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true",
+        help="Ignore the build manifest and re-encode every image (see incremental_build in core/config.py)."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, datefmt=LOG_DATEFMT)
+    jobs = resolve_job_count(args.jobs)
+    try:
+        memory_budget = parse_memory_size(args.max_mem) if args.max_mem is not None else None
+    except ValueError as e:
+        logging.error(str(e))
+        sys.exit(1)
+
+    # === INIT ===
+    # Mod files go straight into the .scs archive, unless a staging folder was requested
+    # (write_staging_folder) or no archive is wanted at all (generate_zip = False).
+    write_to_archive = generate_zip and not write_staging_folder
+    logging.info("Initializing script and creating base folder structure...")
+    temp_folder.mkdir(parents=True, exist_ok=True)
+    # Sources queued for texconv by an interrupted run are not needed anymore
+    shutil.rmtree(dds_queue_folder, ignore_errors=True)
+    if not write_to_archive:
+        # Create required folder structure
+        for folder in [paintjob_root, def_root, ui_folder]:
+            folder.mkdir(parents=True, exist_ok=True)
+            logging.info(f"Ensured output sub-folder exists: {folder}")
+
+    # === PRE-FLIGHT CHECKS ===
+    logging.info("Performing pre-flight checks...")
+    # Check if input folder exists
+    input_folder_path = Path(input_folder)
+    if not input_folder_path.is_dir():
+        logging.error(f"Input folder '{input_folder}' not found.")
+        logging.error("Please ensure the folder exists and the path is correctly set in core/config.py.")
+        sys.exit(1)
+
+    # Gather source images. Sorted so the image order (and therefore the output) doesn't
+    # depend on the filesystem's directory listing order.
+    images = sorted(f for f in os.listdir(input_folder) if f.lower().endswith((".jpg", ".png")))
+
+    # Check if images were found
+    if not images:
+        logging.error(f"No images (.jpg or .png) found in input folder '{input_folder}'.")
+        logging.error("Please add your skin textures to this folder.")
+        sys.exit(1)
+    else:
+        logging.info(f"Found {len(images)} image(s) in '{input_folder}'.")
+
+    # === BUILD MANIFEST ===
+    # The manifest of the previous build tells which images are unchanged.
+    # Their textures are reused from the DDS cache instead of being encoded again.
+    fingerprint = settings_fingerprint({
+        "generator_version": GENERATOR_VERSION,
+        "image_resolution": list(image_resolution),
+        "ui_accessory_resolution": list(ui_accessory_resolution),
+        "dds_format": dds_format,
+        "dds_backend": dds_backend,
+        "dds_mipmaps": dds_mipmaps,
+        "mipmap_filter": mipmap_filter,
+        "resolution_profiles": [[pattern, list(resolution), profile_format] for pattern, resolution, profile_format in resolution_profiles],
+        "truck_models": list(truck_models),
+        "trailer_models": list(trailer_models),
+    })
+    if incremental_build and not args.rebuild:
+        previous = load_manifest(build_manifest_path, fingerprint)
+    else:
+        previous = empty_manifest()
+    previous_images = previous["images"]
+
+    # Assign paint IDs up front, so every work unit gets the same ID no matter which process runs it.
+    # IDs are derived from the image file names and kept in paint_id_map_path, so an image keeps its
+    # ID (and its mod file paths) across runs and releases.
+    try:
+        paint_id_map = assign_paint_ids(images, load_paint_id_map(paint_id_map_path), paint_job_prefix, paint_id_digits)
+    except ValueError as e:
+        logging.error(str(e))
+        sys.exit(1)
+    paint_ids = [paint_id_map[img_file] for img_file in images]
+
+    # === TEXTURE PROFILES ===
+    # Each model gets the texture profile (resolution and format) of the first matching entry in
+    # resolution_profiles, or image_resolution/dds_format. Every image is encoded once per distinct profile.
+    try:
+        validate_profiles(resolution_profiles)
+    except ValueError as e:
+        logging.error(str(e))
+        sys.exit(1)
+    default_profile = TextureProfile(tuple(image_resolution), dds_format)
+    model_profiles = {
+        (vehicle_type_name, model): profile_for_model(model, resolution_profiles, default_profile)
+        for vehicle_type_name, models, *_ in VEHICLE_TYPES for model in models
+    }
+    profiles = list(dict.fromkeys(model_profiles.values()))
+    logging.info(f"Texture profiles in use: {', '.join(profile.key for profile in profiles)}")
+
+    if write_to_archive:
+        sink = ArchiveSink(Path(f"{mod_name}.scs"), scs_compress_level, scs_stored_extensions, jobs)
+    else:
+        sink = DirectorySink(output_folder, use_hardlinks, jobs)
+
+    try:
+        # === IMAGE STAGE ===
+        # Each image will become a distinct paint job available on all specified trucks/trailers.
+        # The first image also provides the mod icon (mod_icon.jpg) shown in the game's mod manager.
+        image_assets = {}
+        source_states = {}
+        image_units = []
+        for index, (img_file, paint_id) in enumerate(zip(images, paint_ids)):
+            with_icon = index == 0
+            record = previous_images.get(img_file)
+            state = source_state(input_folder_path / img_file, record)
+            source_states[img_file] = state
+            if is_reusable(record, state) and (record["files"].get("mod_icon") or not with_icon):
+                image_assets[img_file] = ImageAssets.from_files(record["files"], with_icon)
+            else:
+                image_units.append(WorkUnit(f"image '{img_file}' ({paint_id})", _process_image, (img_file, paint_id, profiles, with_icon)))
+        if image_assets:
+            logging.info(f"Reusing the textures of {len(image_assets)} unchanged image(s) from the previous build.")
+
+        logging.info(f"Starting main processing for {len(image_units)} image(s) found in '{input_folder_path}' using {jobs} job(s).")
+        unit_files = [unit.args[0] for unit in image_units]
+        unit_costs = None
+        if memory_budget is not None:
+            # Only the image headers are read here; the pixels are decoded by the work units
+            unit_costs = [estimate_memory(input_folder_path / img_file, _image_resolutions(profiles), dds_mipmaps) for img_file in unit_files]
+            logging.info(f"Limiting image buffers to {memory_budget / 1024 ** 2:.0f} MB "
+                         f"(largest image needs about {max(unit_costs, default=0) / 1024 ** 2:.0f} MB).")
+        image_results = run_work_units(image_units, jobs, LOG_FORMAT, LOG_DATEFMT, unit_costs, memory_budget)
+        for img_file, assets in zip(unit_files, image_results):
+            image_assets[img_file] = assets
+        if _batch_texconv():
+            converted = flush_dds_queue(texconv_path, dds_queue_folder, dds_cache_folder, texconv_batch_size)
+            if converted:
+                logging.info(f"Converted {converted} queued texture(s) with texconv in batches of up to {texconv_batch_size}.")
+
+        for img_file, paint_id in zip(images, paint_ids):
+            sink.write_entries(_image_entries(paint_id, image_assets[img_file]))
+
+        # === MODEL STAGE ===
+        # Fan every encoded texture out to every truck and trailer model, and render the definition
+        # files. This is cheap work, so it runs on threads (no pickling), one unit per model, and each
+        # model's files go to the sink as soon as they (and every model before them) are ready.
+        model_units = []
+        for vehicle_type_name, models, paintjob_type_root in VEHICLE_TYPES:
+            for model in models:
+                profile_key = model_profiles[vehicle_type_name, model].key
+                paint_jobs = [(paint_id, image_assets[img_file].paint_dds[profile_key]) for img_file, paint_id in zip(images, paint_ids)]
+                model_units.append(WorkUnit(
+                    f"{vehicle_type_name} '{model}'",
+                    _generate_model_files,
+                    (vehicle_type_name, model, paint_jobs, paintjob_type_root, _mod_path(def_root)),
+                ))
+        logging.info(f"Generating files for {len(images)} paint job(s) on {len(model_units)} model(s)...")
+        for entries in iter_work_units(model_units, jobs):
+            sink.write_entries(entries)
+    except WorkUnitError as e:
+        logging.error(str(e))
+        sys.exit(1)
+
+    # === FINAL STEPS ===
+    # These steps are performed once after all images have been processed.
+    logging.info("Starting final steps for mod packaging...")
+
+    # === Manifest & Description Files ===
+    # These files provide metadata for the mod (name, author, version, description) for the game.
+    logging.info("Generating mod manifest and description files...")
+    sink.write_bytes("manifest.sii", render_manifest(mod_name, mod_version, mod_author).encode("utf-8"))
+    sink.write_bytes("mod_description.txt", mod_description_content.encode("utf-8"))
+
+    if write_to_archive:
+        logging.info(f"Writing .scs archive '{sink.scs_path}'...")
+        sink.close()
+        logging.info(f"Mod successfully packed into: '{sink.scs_path}'")
+    elif generate_zip:
+        # === PACK TO .SCS ARCHIVE ===
+        # Staging folder mode: pack the entire output folder into an .scs archive,
+        # which is the format mods use in the game.
+        sink.close()
+        logging.info(f"Attempting to pack contents of '{output_folder}' into an .scs archive...")
+        # The pack_to_scs function will typically name the archive based on mod_name.
+        scs_file = pack_to_scs(output_folder, mod_name, scs_compress_level, scs_stored_extensions, jobs)
+        logging.info(f"Mod successfully packed into: '{scs_file}'")
+    else:
+        # If generate_zip is False, the script will leave the generated files in the output_folder.
+        # This is useful for debugging or manual adjustments before packing.
+        sink.close()
+        logging.info(f"Mod files prepared in '{output_folder}'. SCS archive generation was skipped (as per config).")
+    if sink.duplicate_files:
+        # e.g., the shared .sui and the empty stubs, which are identical for every model of a paint job
+        logging.info(f"{sink.duplicate_files} file(s) ({sink.duplicate_bytes / 1024:.1f} KB) duplicated an earlier file "
+                     f"and reused its data instead of being written or compressed again.")
+
+    # Persist the paint IDs only once the build succeeded
+    save_paint_id_map(paint_id_map_path, paint_id_map)
+
+    # === UPDATE BUILD MANIFEST ===
+    # Recorded only after a successful build, so a failed run never marks anything as up to date.
+    image_records = {
+        img_file: make_image_record(source_states[img_file], paint_id, image_assets[img_file].files())
+        for img_file, paint_id in zip(images, paint_ids)
+    }
+    outputs = set() if write_to_archive else sink.written
+    if not write_to_archive:
+        removed = remove_stale_outputs(output_folder, previous["outputs"], outputs)
+        if removed:
+            logging.info(f"Removed {removed} stale file(s) from '{output_folder}'.")
+    save_manifest(build_manifest_path, fingerprint, image_records, outputs)
+    # Drop cached textures that no longer belong to any image (removed or edited skins)
+    keep = {path for record in image_records.values() for path in record["files"].values() if path}
+    removed = prune_folder(dds_cache_folder, keep)
+    if removed:
+        logging.info(f"Removed {removed} stale file(s) from the DDS cache '{dds_cache_folder}'.")
+
+    logging.info("\nAll tasks completed successfully!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Persistent build manifest for incremental builds of the ETS2/ATS Skin Pack Builder.
+
+After a successful build, a small JSON file records for every source image:
+- its size, modification time and SHA-256 hash,
+- the paint ID it was given,
+- the cached files produced from it (paint job DDS, UI accessory DDS, mod icon).
+
+The whole manifest is tied to a fingerprint of every setting that affects the output
+(resolutions, DDS format and backend, vehicle model lists, generator version). If the
+fingerprint changes, the manifest is ignored and everything is rebuilt.
+
+On the next run, images whose content is unchanged are not decoded, resized or encoded
+again; their cached files are reused as they are. Files that no longer belong to any
+image (removed or edited skins) are deleted from the DDS cache and the staging folder.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Bump when the manifest layout changes; older manifests are then ignored.
+MANIFEST_VERSION = 1
+
+# Read source files in 1 MiB chunks when hashing, to keep memory use flat on large images.
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    """
+    Computes the SHA-256 hex digest of a file's content.
+
+    Args:
+        path (Path): The file to hash.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_fingerprint(settings: dict) -> str:
+    """
+    Computes a fingerprint of the build settings that affect the generated files.
+
+    Args:
+        settings (dict): JSON-serializable settings (tuples become lists).
+
+    Returns:
+        str: A hex digest that changes whenever any of the settings change.
+    """
+    encoded = json.dumps(settings, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def empty_manifest() -> dict:
+    """Returns a manifest with no recorded images or outputs."""
+    return {"images": {}, "outputs": []}
+
+
+def load_manifest(path: Path, fingerprint: str) -> dict:
+    """
+    Loads the manifest of the previous build.
+
+    Args:
+        path (Path): Location of the manifest JSON file.
+        fingerprint (str): The current `settings_fingerprint`.
+
+    Returns:
+        dict: The manifest (`{"images": {...}, "outputs": [...]}`), or an empty manifest if there
+              is none, it can't be read, or it was written with different settings.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return empty_manifest()
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Warning: Ignoring unreadable build manifest '{path}': {e}")
+        return empty_manifest()
+    if data.get("version") != MANIFEST_VERSION or data.get("fingerprint") != fingerprint:
+        return empty_manifest()
+    return {"images": data.get("images", {}), "outputs": data.get("outputs", [])}
+
+
+def save_manifest(path: Path, fingerprint: str, images: dict, outputs: list) -> None:
+    """
+    Writes the manifest for the build that just finished.
+
+    The file is written to a temporary name first and then moved into place, so an
+    interrupted write never leaves a truncated manifest behind.
+
+    Args:
+        path (Path): Location of the manifest JSON file.
+        fingerprint (str): The current `settings_fingerprint`.
+        images (dict): Image records keyed by source file name (see `make_image_record`).
+        outputs (list[str]): Paths of the files written to the staging folder (empty in archive mode).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": MANIFEST_VERSION,
+        "fingerprint": fingerprint,
+        "images": images,
+        "outputs": sorted(outputs),
+    }
+    partial_path = path.with_name(path.name + ".partial")
+    with open(partial_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(partial_path, path)
+
+
+def source_state(src_path: Path, record: dict = None) -> dict:
+    """
+    Describes the current state of a source image: size, modification time and content hash.
+
+    The hash is taken over from `record` when size and modification time are unchanged,
+    so unchanged images don't have to be read at all.
+
+    Args:
+        src_path (Path): The source image.
+        record (dict, optional): The image's record from the previous build.
+
+    Returns:
+        dict: `{"size": ..., "mtime_ns": ..., "sha256": ...}`.
+    """
+    stat = src_path.stat()
+    if record and record.get("size") == stat.st_size and record.get("mtime_ns") == stat.st_mtime_ns:
+        sha256 = record["sha256"]
+    else:
+        sha256 = file_sha256(src_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+
+
+def make_image_record(state: dict, paint_id: str, files: dict) -> dict:
+    """
+    Builds the manifest record for one source image.
+
+    Args:
+        state (dict): The image's `source_state`.
+        paint_id (str): The paint ID assigned to the image.
+        files (dict): The cached files produced from the image, by role
+                      (e.g., `{"paint_dds": ..., "ui_dds": ..., "mod_icon": None}`).
+
+    Returns:
+        dict: The record.
+    """
+    return {**state, "paint_id": paint_id, "files": {role: str(path) if path else None for role, path in files.items()}}
+
+
+def is_reusable(record: dict, state: dict) -> bool:
+    """
+    Checks whether a previous build's outputs for an image can be reused as-is.
+
+    Args:
+        record (dict): The image's record from the previous build (may be None).
+        state (dict): The image's current `source_state`.
+
+    Returns:
+        bool: True if the content is unchanged and every recorded cached file still exists.
+    """
+    if not record or record.get("sha256") != state["sha256"]:
+        return False
+    return all(path is None or Path(path).is_file() for path in record.get("files", {}).values())
+
+
+def prune_folder(folder: Path, keep: set) -> int:
+    """
+    Deletes every file in `folder` (not recursive) that is not listed in `keep`.
+
+    Args:
+        folder (Path): The folder to clean up (e.g., the DDS cache).
+        keep (set[Path]): Files to keep.
+
+    Returns:
+        int: The number of files deleted.
+    """
+    if not folder.is_dir():
+        return 0
+    keep = {Path(path).resolve() for path in keep}
+    removed = 0
+    for entry in folder.iterdir():
+        if entry.is_file() and entry.resolve() not in keep:
+            entry.unlink()
+            removed += 1
+    return removed
+
+
+def remove_stale_outputs(root: Path, previous_outputs: list, current_outputs: set) -> int:
+    """
+    Deletes files the previous build wrote into `root` that the current build no longer produces,
+    along with any folders left empty by that.
+
+    Args:
+        root (Path): The staging folder.
+        previous_outputs (list[str]): Paths (relative to `root`) written by the previous build.
+        current_outputs (set[str]): Paths (relative to `root`) written by this build.
+
+    Returns:
+        int: The number of files deleted.
+    """
+    removed = 0
+    for rel_path in previous_outputs:
+        if rel_path in current_outputs:
+            continue
+        path = root / rel_path
+        if path.is_file():
+            path.unlink()
+            removed += 1
+        # Remove folders that became empty, up to (not including) the root
+        parent = path.parent
+        while parent != root and parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    return removed
@@ -11,6 +11,7 @@ mod_version = "1.0.0"
 mod_author = "Your Name"
 # TODO: Customize these values
 paint_job_prefix = "skin"
+paint_id_digits = 4 # Digits after the prefix in paint IDs (prefix + digits should stay within 10 characters)
 # TODO: Customize these values
 mod_description_content = """\
     My awesome skin pack!
@@ -22,10 +23,25 @@ input_folder = "skin_sources"
 texconv_path = "Externals/texconv.exe"
 image_resolution = (4096, 4096)
 ui_accessory_resolution = (256, 54) # Resolution for UI accessory icons
+# Per-model texture size/format overrides: (model name or wildcard, (width, height), dds_format or None for the default).
+# The first match wins; other models use image_resolution and dds_format. Example: [("scs.*", (2048, 2048), None)]
+resolution_profiles = []
 dds_format = "DXT5"
+dds_backend = "texconv" # "texconv" (external texconv.exe) or "builtin" (NumPy encoder, DXT1/DXT5 only, needs numpy)
+dds_mipmaps = 1 # Mipmap levels for paint job textures: 1 = no mipmaps, a level count, or "full" (down to 1x1); more than 1 needs numpy
+mipmap_filter = "box" # Mipmap downsampling filter: "box" (fastest), "lanczos" or "kaiser" (sharper)
+texconv_batch_size = 64 # Images converted per texconv run (0 = one texconv run per image)
 create_mask_sui = True
 create_metallic_sui = True
 generate_zip = True
+scs_compress_level = 6 # zlib level (1 = fastest ... 9 = smallest) for deflated entries in the .scs
+scs_stored_extensions = (".dds", ".jpg", ".jpeg", ".png") # Stored uncompressed in the .scs (fast); use () to deflate everything (smaller archive)
+write_staging_folder = False # True: write the mod files to output_folder first, then pack them (for debugging); False: write straight into the .scs
+build_jobs = 1 # Worker processes for the build (1 = serial, 0 = one per CPU core); overridden by --jobs
+max_memory = None # Memory budget for images processed at the same time, e.g. "8G" (None = no limit); overridden by --max-mem
+in_memory_pipeline = True # Resize/encode images in memory; False writes the intermediate PNGs to temp_folder for debugging
+use_hardlinks = True # Hardlink the single encoded DDS into every model folder instead of copying it
+incremental_build = True # Reuse the textures of images unchanged since the last build; --rebuild forces a full build
 
 output_folder = Path(f"output_{mod_name}")
 paintjob_root = output_folder / "vehicle"
@@ -33,4 +49,8 @@ def_root = output_folder / "def"
 ui_folder = output_folder / "material/ui/accessory"
 mod_icon_path = output_folder / "mod_icon.jpg"
 temp_folder = Path("temp_resized")
+dds_cache_folder = temp_folder / "dds_cache"
+dds_queue_folder = temp_folder / "dds_queue" # Images waiting for a batched texconv run
+build_manifest_path = temp_folder / "build_manifest.json"
+paint_id_map_path = Path("paint_ids.json") # Image file name -> paint ID; keep it with your skins so IDs never change between releases
 
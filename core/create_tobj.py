@@ -5,7 +5,22 @@ This module uses the lower-level `tobj_writer.write_tobj` function to generate
 .tobj files by constructing the full virtual texture path before calling the writer.
 """
 from pathlib import Path
-from core.tobj_writer import write_tobj
+from core.tobj_writer import build_tobj, write_tobj
+
+def render_tobj(texture_filename: str, virtual_base_path: str, save_mode: str = "default") -> bytes:
+    """
+    Builds the bytes of a .tobj file that points to a given texture file (see `create_tobj`).
+
+    Args:
+        texture_filename (str): The filename of the texture (e.g., "my_skin.dds", "ui_icon.dds").
+        virtual_base_path (str): The virtual base path within the mod where the texture is located
+                                 (e.g., "/material/ui/accessory").
+        save_mode (str): The save mode for `tobj_writer.build_tobj`. Defaults to "default".
+
+    Returns:
+        bytes: The .tobj file content.
+    """
+    return build_tobj(f"{virtual_base_path}/{texture_filename}", save_mode)
 
 def create_tobj(texture_filename: str, tobj_output_path: Path, virtual_base_path: str, save_mode: str = "default") -> None:
     """
@@ -32,6 +47,3 @@ def create_tobj(texture_filename: str, tobj_output_path: Path, virtual_base_path
     
     # Call the low-level TOBJ writer function
     write_tobj(tobj_output_path, full_virtual_texture_path, save_mode)
-    # A print statement confirming creation is typically in write_tobj itself.
-    # If not, or if more specific context is needed here, it could be added:
-    # print(f"    TOBJ creation request for: {tobj_output_path} -> {full_virtual_texture_path}")
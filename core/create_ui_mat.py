@@ -7,9 +7,9 @@ are typically simple, pointing to a .tobj file for the texture.
 """
 from pathlib import Path
 
-def create_ui_mat(paint_id: str, output_folder: Path) -> None:
+def render_ui_mat(paint_id: str) -> str:
     """
-    Creates a .mat file for a UI paint job icon.
+    Builds the content of a .mat file for a UI paint job icon.
 
     This .mat file defines a simple UI material that references the
     paint job's UI texture object (.tobj). It uses the "ui.rfx" effect,
@@ -19,14 +19,11 @@ def create_ui_mat(paint_id: str, output_folder: Path) -> None:
 
     Args:
         paint_id (str): The unique identifier for the paint job, used to
-                        name the .mat file and reference the corresponding .tobj file.
-                        (e.g., "skin001").
-        output_folder (Path): The directory where the .mat file will be saved.
-                              The filename will be `[paint_id].mat`.
+                        reference the corresponding .tobj file (e.g., "skin001").
+
+    Returns:
+        str: The .mat file content.
     """
-    # Construct the full path for the output .mat file
-    mat_filepath = output_folder / f"{paint_id}.mat"
-    
     # Define the content of the .mat file
     # - effect: "ui.rfx" is a common shader for UI elements.
     # - texture: Defines the source texture.
@@ -42,7 +39,23 @@ effect : "ui.rfx" {{
 		mip_filter : none
 	}}
 }}"""
-    
+    return content
+
+def create_ui_mat(paint_id: str, output_folder: Path) -> None:
+    """
+    Creates a .mat file for a UI paint job icon (see `render_ui_mat` for the content).
+
+    Args:
+        paint_id (str): The unique identifier for the paint job, used to
+                        name the .mat file and reference the corresponding .tobj file.
+                        (e.g., "skin001").
+        output_folder (Path): The directory where the .mat file will be saved.
+                              The filename will be `[paint_id].mat`.
+    """
+    # Construct the full path for the output .mat file
+    mat_filepath = output_folder / f"{paint_id}.mat"
+    content = render_ui_mat(paint_id)
+
     # Write the content to the .mat file
     try:
         with open(mat_filepath, "w", encoding="utf-8") as f:
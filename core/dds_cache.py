@@ -0,0 +1,326 @@
+"""
+Content-addressed DDS cache for the ETS2/ATS Skin Pack Builder.
+
+Every truck and trailer model of a paint job uses the exact same texture, so
+converting the resized source image once per model wastes almost all of the
+build time. This module encodes each distinct image/format combination only
+once and then places the result into every model's paint job folder.
+
+- `encode_dds_cached` converts an image file to DDS and stores it under a file name
+  derived from a hash of the image content and the DDS format.
+- `encode_image_dds_cached` does the same for an in-memory `PIL.Image`, hashing
+  its pixels instead of a file.
+- `queue_dds_cached` / `queue_image_dds_cached` only reserve the cache entry and leave the
+  source in a queue folder; `flush_dds_queue` then converts everything queued with a few
+  batched texconv runs (see `convert_many_to_dds`).
+- `place_file` puts a cached file at its final location, using a hardlink
+  where the filesystem supports it and a plain copy otherwise.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+from core.dds_encoder import combine_dds_levels
+from core.image_utils import convert_to_dds, convert_image_to_dds, convert_many_to_dds, find_dds_output, save_mip_levels
+from core.mipmaps import build_mip_chain
+
+# Read source files in 1 MiB chunks when hashing, to keep memory use flat on 4096x4096 images.
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _update_mipmap_key(digest, mipmaps, mip_filter: str) -> None:
+    # Textures without mipmaps keep the keys they had before mipmaps were supported
+    if mipmaps != 1:
+        digest.update(f":mipmaps={mipmaps}:{mip_filter}".encode("utf-8"))
+
+
+def dds_cache_key(src: Path, dds_format: str, backend: str = "texconv",
+                  mipmaps=1, mip_filter: str = "box") -> str:
+    """
+    Computes the cache key for converting `src` to the given DDS format.
+
+    The key is a SHA-256 hex digest over the source file's bytes, the format name and
+    the encoder backend, so two byte-identical images share one cache entry, while the
+    same image encoded in a different format (or by a different encoder) gets its own.
+
+    Args:
+        src (Path): Path to the image that will be converted (typically the resized PNG).
+        dds_format (str): The DDS compression format (e.g., "DXT5").
+        backend (str): The DDS encoder backend ("texconv" or "builtin"). Defaults to "texconv".
+        mipmaps (int | str): Number of mipmap levels (1 = none) or "full". Defaults to 1.
+        mip_filter (str): The mipmap filter. Defaults to "box".
+
+    Returns:
+        str: The hex digest identifying this conversion.
+    """
+    digest = hashlib.sha256()
+    with open(src, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    digest.update(dds_format.encode("utf-8"))
+    digest.update(backend.encode("utf-8"))
+    _update_mipmap_key(digest, mipmaps, mip_filter)
+    return digest.hexdigest()
+
+
+def image_cache_key(image: Image.Image, dds_format: str, backend: str = "texconv",
+                    mipmaps=1, mip_filter: str = "box") -> str:
+    """
+    Computes the cache key for converting an in-memory image to the given DDS format.
+
+    Same idea as `dds_cache_key`, but the digest covers the image mode, size and raw
+    pixel data instead of a file's bytes.
+
+    Args:
+        image (Image.Image): The image that will be converted.
+        dds_format (str): The DDS compression format (e.g., "DXT5").
+        backend (str): The DDS encoder backend ("texconv" or "builtin"). Defaults to "texconv".
+        mipmaps (int | str): Number of mipmap levels (1 = none) or "full". Defaults to 1.
+        mip_filter (str): The mipmap filter. Defaults to "box".
+
+    Returns:
+        str: The hex digest identifying this conversion.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.width}x{image.height}:".encode("utf-8"))
+    digest.update(image.tobytes())
+    digest.update(dds_format.encode("utf-8"))
+    digest.update(backend.encode("utf-8"))
+    _update_mipmap_key(digest, mipmaps, mip_filter)
+    return digest.hexdigest()
+
+
+def encode_dds_cached(texconv_path: str, src: Path, cache_folder: Path, dds_format: str = "DXT5", backend: str = "texconv",
+                      mipmaps=1, mip_filter: str = "box") -> Path:
+    """
+    Converts an image to DDS at most once and returns the path of the cached result.
+
+    If an entry for the same image content and format already exists in `cache_folder`,
+    it is returned straight away and no conversion is performed. Otherwise `convert_to_dds`
+    is called and its output is moved to `<cache_folder>/<key>.dds`.
+
+    Args:
+        texconv_path (str): Full path to the `texconv.exe` executable.
+        src (Path): Path to the source image file (typically the resized PNG).
+        cache_folder (Path): Directory holding the cached DDS files.
+        dds_format (str): The DDS compression format to use. Defaults to "DXT5".
+        backend (str): The DDS encoder backend ("texconv" or "builtin"). Defaults to "texconv".
+        mipmaps (int | str): Number of mipmap levels (1 = none) or "full". Defaults to 1.
+        mip_filter (str): The mipmap filter (see `core.mipmaps`). Defaults to "box".
+
+    Returns:
+        Path: Path to the cached DDS file.
+
+    Raises:
+        FileNotFoundError: If the converter did not produce a DDS file for `src`.
+    """
+    cache_folder.mkdir(parents=True, exist_ok=True)
+    key = dds_cache_key(src, dds_format, backend, mipmaps, mip_filter)
+    cached_path = cache_folder / f"{key}.dds"
+    if cached_path.is_file():
+        logging.debug(f"    Reusing cached DDS for '{src.name}' ({dds_format}): {cached_path.name}")
+        return cached_path
+
+    convert_to_dds(texconv_path, src, cache_folder, dds_format, backend, mipmaps, mip_filter)
+
+    # texconv names its output after the source stem, usually with an upper-case extension.
+    produced = find_dds_output(cache_folder, src.stem)
+    if produced is not None:
+        os.replace(produced, cached_path)
+        return cached_path
+    raise FileNotFoundError(f"DDS output for '{src}' not found in '{cache_folder}' after conversion.")
+
+
+def encode_image_dds_cached(texconv_path: str, image: Image.Image, cache_folder: Path, dds_format: str = "DXT5", backend: str = "texconv",
+                            mipmaps=1, mip_filter: str = "box") -> Path:
+    """
+    Converts an in-memory image to DDS at most once and returns the path of the cached result.
+
+    Works like `encode_dds_cached`, without needing the image to exist as a file first.
+
+    Args:
+        texconv_path (str): Full path to the `texconv.exe` executable.
+        image (Image.Image): The image to convert (typically the resized paint job texture).
+        cache_folder (Path): Directory holding the cached DDS files.
+        dds_format (str): The DDS compression format to use. Defaults to "DXT5".
+        backend (str): The DDS encoder backend ("texconv" or "builtin"). Defaults to "texconv".
+        mipmaps (int | str): Number of mipmap levels (1 = none) or "full". Defaults to 1.
+        mip_filter (str): The mipmap filter (see `core.mipmaps`). Defaults to "box".
+
+    Returns:
+        Path: Path to the cached DDS file.
+    """
+    cache_folder.mkdir(parents=True, exist_ok=True)
+    key = image_cache_key(image, dds_format, backend, mipmaps, mip_filter)
+    cached_path = cache_folder / f"{key}.dds"
+    if cached_path.is_file():
+        logging.debug(f"    Reusing cached DDS ({dds_format}): {cached_path.name}")
+        return cached_path
+
+    # Encode under a per-process name and move it into place, so two workers encoding
+    # identical images never expose a half-written cache entry to each other.
+    partial_path = cache_folder / f"{key}.{os.getpid()}.partial"
+    convert_image_to_dds(texconv_path, image, partial_path, dds_format, backend, mipmaps, mip_filter)
+    os.replace(partial_path, cached_path)
+    return cached_path
+
+
+def queue_dds_cached(src: Path, cache_folder: Path, queue_folder: Path, dds_format: str = "DXT5", backend: str = "texconv",
+                     mipmaps=1, mip_filter: str = "box") -> Path:
+    """
+    Queues an image file for a later batched conversion, unless it is already cached.
+
+    The source is placed into `queue_folder` under its cache key, so `flush_dds_queue` knows
+    where each result belongs, and identical images queued by different workers end up as
+    a single queue entry.
+
+    Args:
+        src (Path): Path to the source image file (typically the resized PNG).
+        cache_folder (Path): Directory holding the cached DDS files.
+        queue_folder (Path): Directory collecting the sources still to be converted
+                             (in a subfolder per DDS format).
+        dds_format (str): The DDS compression format. Defaults to "DXT5".
+        backend (str): The DDS encoder backend. Defaults to "texconv".
+        mipmaps (int | str): Number of mipmap levels (1 = none) or "full". Defaults to 1.
+        mip_filter (str): The mipmap filter (see `core.mipmaps`). Defaults to "box".
+
+    Returns:
+        Path: Path the cached DDS file will have once the queue is flushed.
+    """
+    key = dds_cache_key(src, dds_format, backend, mipmaps, mip_filter)
+    cached_path = cache_folder / f"{key}.dds"
+    if cached_path.is_file():
+        logging.debug(f"    Reusing cached DDS for '{src.name}' ({dds_format}): {cached_path.name}")
+        return cached_path
+    queue_folder = queue_folder / dds_format # texconv converts one format per run
+    queue_folder.mkdir(parents=True, exist_ok=True)
+    if mipmaps != 1:
+        with Image.open(src) as img:
+            _queue_levels(img, key, queue_folder, mipmaps, mip_filter)
+    else:
+        place_file(src, queue_folder / f"{key}.png")
+    return cached_path
+
+
+def queue_image_dds_cached(image: Image.Image, cache_folder: Path, queue_folder: Path, dds_format: str = "DXT5", backend: str = "texconv",
+                           mipmaps=1, mip_filter: str = "box") -> Path:
+    """
+    Queues an in-memory image for a later batched conversion, unless it is already cached.
+
+    Works like `queue_dds_cached`; the image is written to the queue as an uncompressed PNG.
+
+    Args:
+        image (Image.Image): The image to convert.
+        cache_folder (Path): Directory holding the cached DDS files.
+        queue_folder (Path): Directory collecting the sources still to be converted
+                             (in a subfolder per DDS format).
+        dds_format (str): The DDS compression format. Defaults to "DXT5".
+        backend (str): The DDS encoder backend. Defaults to "texconv".
+        mipmaps (int | str): Number of mipmap levels (1 = none) or "full". Defaults to 1.
+        mip_filter (str): The mipmap filter (see `core.mipmaps`). Defaults to "box".
+
+    Returns:
+        Path: Path the cached DDS file will have once the queue is flushed.
+    """
+    key = image_cache_key(image, dds_format, backend, mipmaps, mip_filter)
+    cached_path = cache_folder / f"{key}.dds"
+    if cached_path.is_file():
+        logging.debug(f"    Reusing cached DDS ({dds_format}): {cached_path.name}")
+        return cached_path
+    queue_folder = queue_folder / dds_format # texconv converts one format per run
+    queue_folder.mkdir(parents=True, exist_ok=True)
+    if mipmaps != 1:
+        _queue_levels(image, key, queue_folder, mipmaps, mip_filter)
+        return cached_path
+    queued_path = queue_folder / f"{key}.png"
+    if not queued_path.is_file():
+        # Written under a per-process name first, like `encode_image_dds_cached`
+        partial_path = queue_folder / f"{key}.{os.getpid()}.partial"
+        image.save(partial_path, "PNG", compress_level=0)
+        os.replace(partial_path, queued_path)
+    return cached_path
+
+
+def _queue_levels(image: Image.Image, key: str, queue_folder: Path, mipmaps, mip_filter: str) -> None:
+    """Queues every mipmap level of an image as "<key>_mip<N>.png" (see `flush_dds_queue`)."""
+    if (queue_folder / f"{key}_mip0.png").is_file():
+        return # Already queued by another work unit
+    # Written to a private folder first, so a half-written chain is never visible in the queue
+    with tempfile.TemporaryDirectory(prefix="levels_", dir=queue_folder) as work_dir:
+        level_paths = save_mip_levels(build_mip_chain(image, mipmaps, mip_filter), Path(work_dir), key)
+        # Level 0 last: its presence marks the chain as complete
+        for path in reversed(level_paths):
+            os.replace(path, queue_folder / path.name)
+
+
+def flush_dds_queue(texconv_path: str, queue_folder: Path, cache_folder: Path, batch_size: int = 64) -> int:
+    """
+    Converts every queued source with batched texconv runs and moves the results into the cache.
+
+    Sources are queued in one subfolder per DDS format, and each format is converted separately.
+    Mipmap levels queued as "<key>_mip<N>.png" are converted along with everything else and
+    then combined into one DDS per key (see `combine_dds_levels`).
+
+    Args:
+        texconv_path (str): Full path to the `texconv.exe` executable.
+        queue_folder (Path): Directory filled by `queue_dds_cached` / `queue_image_dds_cached`.
+        cache_folder (Path): Directory holding the cached DDS files.
+        batch_size (int): Maximum number of images per texconv run. Defaults to 64.
+
+    Returns:
+        int: The number of textures converted.
+    """
+    if not queue_folder.is_dir():
+        return 0
+    converted = 0
+    for format_folder in sorted(path for path in queue_folder.iterdir() if path.is_dir()):
+        sources = sorted(format_folder.glob("*.png"))
+        if not sources:
+            continue
+        # The stem is the cache key, with a "_mip<N>" suffix for mipmap levels
+        textures = {}
+        for src in sources:
+            key, _, level = src.stem.partition("_mip")
+            textures.setdefault(key, []).append((int(level or 0), src))
+        cache_folder.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix="dds_batch_", dir=cache_folder) as work_dir:
+            outputs = convert_many_to_dds(texconv_path, sources, Path(work_dir), format_folder.name, batch_size)
+            for key, levels in textures.items():
+                levels.sort()
+                if len(levels) == 1 and levels[0][1].stem == key:
+                    os.replace(outputs[levels[0][1]], cache_folder / f"{key}.dds")
+                else:
+                    level_files = [outputs[src].read_bytes() for _, src in levels]
+                    (cache_folder / f"{key}.dds").write_bytes(combine_dds_levels(level_files))
+        converted += len(textures)
+    shutil.rmtree(queue_folder)
+    return converted
+
+
+def place_file(src: Path, dst: Path, use_hardlinks: bool = True) -> None:
+    """
+    Places a copy of `src` at `dst`, replacing any existing file.
+
+    A hardlink is tried first when `use_hardlinks` is True, which costs no extra
+    disk space or I/O. If linking is not possible (e.g., different drives, or a
+    filesystem without hardlink support), the file is copied instead.
+
+    Args:
+        src (Path): The file to place (typically a cached DDS).
+        dst (Path): The final location of the file.
+        use_hardlinks (bool): Whether to try hardlinking before copying. Defaults to True.
+    """
+    if dst.exists():
+        dst.unlink()
+    if use_hardlinks:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass # Fall back to copying below
+    shutil.copyfile(src, dst)
@@ -0,0 +1,308 @@
+"""
+Built-in DDS (DirectDraw Surface) writer for the ETS2/ATS Skin Pack Builder.
+
+This module is an in-process alternative to `texconv.exe`. It compresses RGBA
+images to DXT1 (BC1) or DXT5 (BC3) with vectorized NumPy block compression and
+writes a standard DDS file, so textures can be produced on any platform without
+starting an external process per file.
+
+How it works, per 4x4 pixel block:
+- Colour endpoints are found along the block's principal colour axis (a few steps
+  of power iteration on the block's covariance matrix), quantized to RGB565.
+- Every pixel then picks the nearest of the 4 palette colours.
+- For DXT5, alpha uses the block's min/max alpha and the 8-value interpolated palette.
+
+DXT1 output is always opaque (the 1-bit alpha mode is not used), which matches
+how paint job textures are used in-game.
+
+Requires NumPy (pip install numpy).
+"""
+import struct
+from pathlib import Path
+
+from PIL import Image
+
+from core.mipmaps import build_mip_chain
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+# Accepted `dds_format` names (texconv and D3D spellings) and the FourCC they map to.
+SUPPORTED_FORMATS = {
+    "DXT1": b"DXT1",
+    "BC1_UNORM": b"DXT1",
+    "DXT5": b"DXT5",
+    "BC3_UNORM": b"DXT5",
+}
+
+# DDS header flags (see the DDS_HEADER documentation from Microsoft)
+_DDSD_CAPS = 0x1
+_DDSD_HEIGHT = 0x2
+_DDSD_WIDTH = 0x4
+_DDSD_PIXELFORMAT = 0x1000
+_DDSD_MIPMAPCOUNT = 0x20000
+_DDSD_LINEARSIZE = 0x80000
+_DDPF_FOURCC = 0x4
+_DDSCAPS_COMPLEX = 0x8
+_DDSCAPS_TEXTURE = 0x1000
+_DDSCAPS_MIPMAP = 0x400000
+
+# Number of 4x4 blocks compressed per NumPy batch. Keeps peak memory at a few tens of MB
+# even for 4096x4096 textures (which have about a million blocks).
+_BLOCKS_PER_BATCH = 65536
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("The builtin DDS encoder needs NumPy. Install it with: pip install numpy")
+
+
+def _fourcc_for(dds_format: str) -> bytes:
+    try:
+        return SUPPORTED_FORMATS[dds_format.upper()]
+    except KeyError:
+        raise ValueError(
+            f"DDS format '{dds_format}' is not supported by the builtin encoder. "
+            f"Supported formats: {', '.join(SUPPORTED_FORMATS)}"
+        ) from None
+
+
+def build_dds_header(width: int, height: int, fourcc: bytes, mip_count: int = 1) -> bytes:
+    """
+    Builds the 128-byte DDS file header ("DDS " magic + DDS_HEADER) for a block-compressed texture.
+
+    Args:
+        width (int): Width of the top-level image in pixels.
+        height (int): Height of the top-level image in pixels.
+        fourcc (bytes): The compression FourCC, b"DXT1" or b"DXT5".
+        mip_count (int): Number of mipmap levels stored in the file (1 = top level only).
+
+    Returns:
+        bytes: The header, ready to be followed by the compressed pixel data.
+    """
+    block_size = 8 if fourcc == b"DXT1" else 16
+    linear_size = max(1, (width + 3) // 4) * max(1, (height + 3) // 4) * block_size
+
+    flags = _DDSD_CAPS | _DDSD_HEIGHT | _DDSD_WIDTH | _DDSD_PIXELFORMAT | _DDSD_LINEARSIZE
+    caps = _DDSCAPS_TEXTURE
+    if mip_count > 1:
+        flags |= _DDSD_MIPMAPCOUNT
+        caps |= _DDSCAPS_COMPLEX | _DDSCAPS_MIPMAP
+
+    pixel_format = struct.pack("<II4s5I", 32, _DDPF_FOURCC, fourcc, 0, 0, 0, 0, 0)
+    header = struct.pack(
+        "<4s7I44x32s5I",
+        b"DDS ",
+        124,            # dwSize
+        flags,          # dwFlags
+        height,         # dwHeight
+        width,          # dwWidth
+        linear_size,    # dwPitchOrLinearSize
+        0,              # dwDepth
+        mip_count,      # dwMipMapCount (followed by 11 reserved DWORDs)
+        pixel_format,   # DDS_PIXELFORMAT
+        caps,           # dwCaps
+        0, 0, 0, 0,     # dwCaps2, dwCaps3, dwCaps4, dwReserved2
+    )
+    return header
+
+
+def _to_blocks(rgba: "np.ndarray") -> "np.ndarray":
+    """Splits an (H, W, 4) image into (N, 16, 4) blocks in row-major block order, padding edges if needed."""
+    height, width = rgba.shape[:2]
+    pad_h = (-height) % 4
+    pad_w = (-width) % 4
+    if pad_h or pad_w:
+        rgba = np.pad(rgba, ((0, pad_h), (0, pad_w), (0, 0)), mode="edge")
+    blocks_y = rgba.shape[0] // 4
+    blocks_x = rgba.shape[1] // 4
+    blocks = rgba.reshape(blocks_y, 4, blocks_x, 4, 4).transpose(0, 2, 1, 3, 4)
+    return blocks.reshape(blocks_y * blocks_x, 16, 4)
+
+
+def _quantize_565(colors: "np.ndarray") -> "np.ndarray":
+    """Quantizes float RGB colours (N, 3) in 0-255 to packed RGB565 values (N,) as uint32."""
+    r = np.rint(colors[:, 0] * (31.0 / 255.0)).astype(np.uint32)
+    g = np.rint(colors[:, 1] * (63.0 / 255.0)).astype(np.uint32)
+    b = np.rint(colors[:, 2] * (31.0 / 255.0)).astype(np.uint32)
+    return (r << 11) | (g << 5) | b
+
+
+def _expand_565(packed: "np.ndarray") -> "np.ndarray":
+    """Expands packed RGB565 values (N,) back to float RGB colours (N, 3), as a decoder would."""
+    r = (packed >> 11) & 0x1F
+    g = (packed >> 5) & 0x3F
+    b = packed & 0x1F
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=1).astype(np.float32)
+
+
+def _encode_color_blocks(blocks: "np.ndarray") -> "np.ndarray":
+    """Compresses the RGB part of (N, 16, 4) blocks into (N, 8) BC1 colour blocks (4-colour mode)."""
+    count = blocks.shape[0]
+    colors = blocks[:, :, :3].astype(np.float32)
+
+    # Principal axis of each block's colours, via power iteration on the covariance matrix
+    mean = colors.mean(axis=1, keepdims=True)
+    centered = colors - mean
+    covariance = np.einsum("nki,nkj->nij", centered, centered)
+    axis = colors.max(axis=1) - colors.min(axis=1) # Bounding-box diagonal as a starting guess
+    for _ in range(4):
+        axis = np.einsum("nij,nj->ni", covariance, axis)
+        norm = np.linalg.norm(axis, axis=1, keepdims=True)
+        axis = np.divide(axis, norm, out=np.zeros_like(axis), where=norm > 0)
+
+    projection = np.einsum("nki,ni->nk", centered, axis)
+    endpoint_max = np.clip(mean[:, 0] + axis * projection.max(axis=1, keepdims=True), 0, 255)
+    endpoint_min = np.clip(mean[:, 0] + axis * projection.min(axis=1, keepdims=True), 0, 255)
+
+    color0 = _quantize_565(endpoint_max)
+    color1 = _quantize_565(endpoint_min)
+    # 4-colour mode requires color0 > color1; swap where the quantized order came out reversed
+    swap = color0 < color1
+    color0, color1 = np.where(swap, color1, color0), np.where(swap, color0, color1)
+
+    c0 = _expand_565(color0)
+    c1 = _expand_565(color1)
+    palette = np.stack([c0, c1, (2 * c0 + c1) / 3, (c0 + 2 * c1) / 3], axis=1) # (N, 4, 3)
+    distances = ((colors[:, :, None, :] - palette[:, None, :, :]) ** 2).sum(axis=3) # (N, 16, 4)
+    indices = distances.argmin(axis=2).astype(np.uint32)
+    indices[color0 == color1] = 0 # Flat block: every pixel is exactly color0
+
+    shifts = np.arange(16, dtype=np.uint32) * 2
+    packed_indices = (indices << shifts).sum(axis=1, dtype=np.uint32)
+
+    out = np.empty((count, 8), dtype=np.uint8)
+    out[:, 0:2] = color0.astype("<u2").view(np.uint8).reshape(count, 2)
+    out[:, 2:4] = color1.astype("<u2").view(np.uint8).reshape(count, 2)
+    out[:, 4:8] = packed_indices.astype("<u4").view(np.uint8).reshape(count, 4)
+    return out
+
+
+def _encode_alpha_blocks(blocks: "np.ndarray") -> "np.ndarray":
+    """Compresses the alpha channel of (N, 16, 4) blocks into (N, 8) BC3 alpha blocks (8-value mode)."""
+    count = blocks.shape[0]
+    alpha = blocks[:, :, 3].astype(np.int32)
+    alpha0 = alpha.max(axis=1)
+    alpha1 = alpha.min(axis=1)
+
+    # Position of each pixel along the alpha0 -> alpha1 ramp, in sevenths (0 = alpha0, 7 = alpha1)
+    span = np.maximum(alpha0 - alpha1, 1)[:, None]
+    steps = (((alpha0[:, None] - alpha) * 7 + span // 2) // span).clip(0, 7)
+    # Palette order is alpha0, alpha1, then the 6 interpolated values from alpha0 towards alpha1
+    index_for_step = np.array([0, 2, 3, 4, 5, 6, 7, 1], dtype=np.uint64)
+    indices = index_for_step[steps]
+    indices[alpha0 == alpha1] = 0
+
+    shifts = np.arange(16, dtype=np.uint64) * 3
+    packed_indices = (indices << shifts).sum(axis=1, dtype=np.uint64)
+
+    out = np.empty((count, 8), dtype=np.uint8)
+    out[:, 0] = alpha0
+    out[:, 1] = alpha1
+    out[:, 2:8] = packed_indices.astype("<u8").view(np.uint8).reshape(count, 8)[:, :6]
+    return out
+
+
+def compress_blocks(rgba: "np.ndarray", dds_format: str = "DXT5") -> bytes:
+    """
+    Block-compresses an RGBA image without any header.
+
+    Args:
+        rgba (np.ndarray): Image pixels as a (height, width, 4) uint8 array.
+        dds_format (str): "DXT1"/"BC1_UNORM" or "DXT5"/"BC3_UNORM". Defaults to "DXT5".
+
+    Returns:
+        bytes: The compressed blocks in row-major block order.
+    """
+    _require_numpy()
+    fourcc = _fourcc_for(dds_format)
+    blocks = _to_blocks(np.ascontiguousarray(rgba, dtype=np.uint8))
+    parts = []
+    for start in range(0, blocks.shape[0], _BLOCKS_PER_BATCH):
+        batch = blocks[start:start + _BLOCKS_PER_BATCH]
+        color = _encode_color_blocks(batch)
+        if fourcc == b"DXT5":
+            parts.append(np.concatenate([_encode_alpha_blocks(batch), color], axis=1).tobytes())
+        else:
+            parts.append(color.tobytes())
+    return b"".join(parts)
+
+
+def encode_dds(image, dds_format: str = "DXT5", mipmaps=1, mip_filter: str = "box") -> bytes:
+    """
+    Encodes an image as a complete DDS file in memory.
+
+    Args:
+        image (PIL.Image.Image | np.ndarray): The image to encode. PIL images are converted to RGBA;
+                                              arrays must be (height, width, 4) uint8.
+        dds_format (str): "DXT1"/"BC1_UNORM" or "DXT5"/"BC3_UNORM". Defaults to "DXT5".
+        mipmaps (int | str): Number of mipmap levels (1 = none) or "full". Defaults to 1.
+        mip_filter (str): Downsampling filter for the mipmaps (see `core.mipmaps`). Defaults to "box".
+
+    Returns:
+        bytes: The DDS file contents (header followed by the compressed levels, largest first).
+    """
+    _require_numpy()
+    fourcc = _fourcc_for(dds_format)
+    if isinstance(image, Image.Image):
+        rgba = np.asarray(image.convert("RGBA"))
+    else:
+        rgba = image
+    height, width = rgba.shape[:2]
+    levels = build_mip_chain(rgba, mipmaps, mip_filter) if mipmaps != 1 else [rgba]
+    data = [compress_blocks(level, dds_format) for level in levels]
+    return build_dds_header(width, height, fourcc, len(levels)) + b"".join(data)
+
+
+def write_dds(image, dst_path: Path, dds_format: str = "DXT5", mipmaps=1, mip_filter: str = "box") -> None:
+    """
+    Encodes an image and saves it as a DDS file.
+
+    Args:
+        image (PIL.Image.Image | np.ndarray): The image to encode (see `encode_dds`).
+        dst_path (Path): Where the .dds file will be written.
+        dds_format (str): "DXT1"/"BC1_UNORM" or "DXT5"/"BC3_UNORM". Defaults to "DXT5".
+        mipmaps (int | str): Number of mipmap levels (1 = none) or "full". Defaults to 1.
+        mip_filter (str): Downsampling filter for the mipmaps. Defaults to "box".
+    """
+    data = encode_dds(image, dds_format, mipmaps, mip_filter)
+    with open(dst_path, "wb") as f:
+        f.write(data)
+
+
+def combine_dds_levels(level_files: list) -> bytes:
+    """
+    Combines single-level DDS files (e.g., one texconv output per mipmap level) into one mipmapped DDS.
+
+    The header of the first (largest) file is kept, with the mipmap count and flags set, and the
+    pixel data of every file is appended in order. Files with a DX10 extension header are supported.
+
+    Args:
+        level_files (list[bytes]): The DDS files, largest level first, all in the same format.
+
+    Returns:
+        bytes: The combined DDS file.
+
+    Raises:
+        ValueError: If a file is not a DDS file.
+    """
+    payloads = []
+    for data in level_files:
+        if data[:4] != b"DDS ":
+            raise ValueError("Not a DDS file (missing 'DDS ' magic).")
+        fourcc = data[84:88]
+        header_size = 148 if fourcc == b"DX10" else 128
+        payloads.append(data[header_size:])
+    first = level_files[0]
+    header = bytearray(first[:148 if first[84:88] == b"DX10" else 128])
+    flags, = struct.unpack_from("<I", header, 8)
+    caps, = struct.unpack_from("<I", header, 108)
+    if len(level_files) > 1:
+        flags |= _DDSD_MIPMAPCOUNT
+        caps |= _DDSCAPS_COMPLEX | _DDSCAPS_MIPMAP
+    struct.pack_into("<I", header, 8, flags)
+    struct.pack_into("<I", header, 28, len(level_files)) # dwMipMapCount
+    struct.pack_into("<I", header, 108, caps)
+    return bytes(header) + b"".join(payloads)
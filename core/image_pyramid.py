@@ -0,0 +1,130 @@
+"""
+Per-source image pyramid for the ETS2/ATS Skin Pack Builder.
+
+One source image is needed at several sizes: the paint job texture (once per texture
+profile resolution), the UI accessory icon and the mod icon. `ImagePyramid` decodes the
+source once, on first use, and produces every requested size lazily, memoizing each one.
+
+A new size is resampled from the smallest level already computed that is at least as
+large in both dimensions (or from the source), so asking for the sizes largest first
+means the full-resolution source is only resampled for the big textures, and the small
+icons come from a much smaller image.
+
+`estimate_memory` gives a rough upper bound of the buffers that processing one source
+needs, from the image header alone, so a build can schedule images within a memory budget.
+"""
+from pathlib import Path
+
+from PIL import Image
+
+from core.image_utils import load_image, resize_in_memory, render_mod_icon
+
+# Size of the mod manager icon (mod_icon.jpg)
+MOD_ICON_SIZE = (276, 162)
+
+# Bytes per pixel of an RGBA8 buffer, and of the float32 working arrays of mipmap generation
+# (the converted level, the padded copy and the accumulator, 16 bytes per pixel each)
+_RGBA_BYTES = 4
+_MIPMAP_WORK_BYTES = 3 * 16
+
+
+def estimate_memory(src_path: Path, resolutions, mipmaps=1) -> int:
+    """
+    Estimates the peak buffer memory of processing one source image.
+
+    Only the image header is read. The estimate covers the decoded source (plus its RGBA
+    conversion), every resized level and, with mipmaps, the chain of the largest level and
+    the float32 arrays used to build it.
+
+    Args:
+        src_path (Path): Path to the source image file.
+        resolutions (Iterable[tuple[int, int]]): Sizes the image will be resized to.
+        mipmaps (int | str): Mipmap setting of the textures (1 = none). Defaults to 1.
+
+    Returns:
+        int: The estimated size in bytes.
+    """
+    with Image.open(src_path) as image:
+        width, height = image.size
+    estimate = 2 * width * height * _RGBA_BYTES
+    level_pixels = [w * h for w, h in set(map(tuple, resolutions))]
+    estimate += sum(level_pixels) * _RGBA_BYTES
+    if mipmaps != 1 and level_pixels:
+        largest = max(level_pixels)
+        # A full chain adds a third of the top level; the working arrays are per level
+        estimate += largest * _RGBA_BYTES // 3 + largest * _MIPMAP_WORK_BYTES
+    return estimate
+
+
+class ImagePyramid:
+    """
+    Lazily decoded source image with memoized resized levels.
+
+    Args:
+        src_path (Path): Path to the source image file.
+    """
+
+    def __init__(self, src_path: Path):
+        self.src_path = Path(src_path)
+        self._source = None
+        self._source_dropped = False
+        self._levels = {}
+
+    @property
+    def source(self) -> Image.Image:
+        """The decoded RGBA source image (read from disk on first access)."""
+        if self._source is None:
+            if self._source_dropped:
+                raise RuntimeError(f"The source of '{self.src_path.name}' was already released.")
+            self._source = load_image(self.src_path)
+        return self._source
+
+    def get(self, resolution: tuple) -> Image.Image:
+        """
+        Returns the image resized to `resolution`, computing it on first request.
+
+        Args:
+            resolution (tuple[int, int]): Target size as (width, height).
+
+        Returns:
+            Image.Image: The RGBA image at that size. Treat it as read-only, it is shared.
+        """
+        resolution = tuple(resolution)
+        if resolution not in self._levels:
+            self._levels[resolution] = resize_in_memory(self._closest_larger(resolution), resolution)
+        return self._levels[resolution]
+
+    def get_many(self, resolutions) -> dict:
+        """
+        Computes several sizes, largest first, so each is derived from the smallest suitable level.
+
+        Args:
+            resolutions (Iterable[tuple[int, int]]): Target sizes as (width, height).
+
+        Returns:
+            dict[tuple[int, int], Image.Image]: The images by resolution.
+        """
+        ordered = sorted(set(map(tuple, resolutions)), key=lambda size: size[0] * size[1], reverse=True)
+        return {resolution: self.get(resolution) for resolution in ordered}
+
+    def mod_icon(self) -> bytes:
+        """Renders the mod icon JPEG (see `render_mod_icon`) from the pyramid."""
+        return render_mod_icon(self.get(MOD_ICON_SIZE))
+
+    def drop_source(self) -> None:
+        """
+        Releases the full-size source (64 MB for a 4096x4096 RGBA image) once every large level
+        has been computed. Later requests are served from the remaining levels.
+        """
+        self._source = None
+        self._source_dropped = True
+
+    def _closest_larger(self, resolution: tuple) -> Image.Image:
+        width, height = resolution
+        candidates = [size for size in self._levels if size[0] >= width and size[1] >= height]
+        if candidates:
+            return self._levels[min(candidates, key=lambda size: size[0] * size[1])]
+        if self._source_dropped and self._levels:
+            # No large-enough level left: use the largest one rather than decoding again
+            return self._levels[max(self._levels, key=lambda size: size[0] * size[1])]
+        return self.source
@@ -3,15 +3,33 @@ Core image manipulation utilities for the ETS2/ATS Skin Pack Builder.
 
 This module provides functions for:
 - Resizing images using the Pillow library.
-- Converting images to DDS (DirectDraw Surface) texture format using the
-  external `texconv.exe` tool.
+- Converting images to DDS (DirectDraw Surface) texture format using either the
+  external `texconv.exe` tool or the built-in NumPy encoder (`core.dds_encoder`).
+- Converting many images with a few batched `texconv.exe` runs.
 - Creating a standardized mod icon from a source image.
+
+Most operations come in two flavours: one working on image files, and one working on
+in-memory `PIL.Image` objects so the build can skip intermediate PNG files entirely.
 """
 from PIL import Image
+import io
+import os
 import subprocess
+import tempfile
 from pathlib import Path
 import sys # Imported for sys.exit in case of critical errors (though not used directly here now)
 
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None # Only needed for mipmaps (see core.mipmaps)
+
+from core.dds_encoder import combine_dds_levels, write_dds
+from core.mipmaps import build_mip_chain
+
+# Values accepted for the `backend` argument of `convert_to_dds` (and `dds_backend` in config.py)
+DDS_BACKENDS = ("texconv", "builtin")
+
 def resize_image(src_path: Path, dst_path: Path, resolution: tuple[int, int] = (4096, 4096)) -> None:
     """
     Resizes an image to the specified resolution and saves it to the destination path.
@@ -46,12 +64,52 @@ def resize_image(src_path: Path, dst_path: Path, resolution: tuple[int, int] = (
         print(f"❌ Error: Could not open or save image. Path: '{src_path}' or '{dst_path}'. Details: {e}")
         raise # Re-raise
 
-def convert_to_dds(texconv_path: str, src: Path, dst_folder: Path, dds_format: str = "DXT5") -> None:
+def load_image(src_path: Path) -> Image.Image:
+    """
+    Reads an image file fully into memory and converts it to RGBA.
+
+    Args:
+        src_path (Path): Path to the source image file.
+
+    Returns:
+        Image.Image: The loaded RGBA image (no longer tied to the file).
+
+    Raises:
+        FileNotFoundError: If the source image `src_path` does not exist.
+        IOError: If the image cannot be opened or decoded.
     """
-    Converts an image to DDS (DirectDraw Surface) format using the `texconv.exe` command-line tool.
+    try:
+        with Image.open(src_path) as img:
+            return img.convert("RGBA")
+    except FileNotFoundError:
+        print(f"❌ Error: Source image not found at '{src_path}'.")
+        raise
+    except IOError as e:
+        print(f"❌ Error: Could not open image '{src_path}'. Details: {e}")
+        raise
 
-    This function invokes `texconv.exe` as a subprocess. It includes error handling
-    for cases where `texconv.exe` is not found or if it returns an error during conversion.
+def resize_in_memory(image: Image.Image, resolution: tuple[int, int]) -> Image.Image:
+    """
+    Returns a resized RGBA copy of an in-memory image, using LANCZOS resampling like `resize_image`.
+
+    Args:
+        image (Image.Image): The image to resize.
+        resolution (tuple[int, int]): Target resolution as a (width, height) tuple.
+
+    Returns:
+        Image.Image: The resized image.
+    """
+    return image.convert("RGBA").resize(resolution, Image.Resampling.LANCZOS)
+
+def convert_to_dds(texconv_path: str, src: Path, dst_folder: Path, dds_format: str = "DXT5", backend: str = "texconv",
+                   mipmaps=1, mip_filter: str = "box") -> None:
+    """
+    Converts an image to DDS (DirectDraw Surface) format.
+
+    With the "texconv" backend this function invokes `texconv.exe` as a subprocess. It includes
+    error handling for cases where `texconv.exe` is not found or if it returns an error during
+    conversion. With the "builtin" backend the image is compressed in-process by `core.dds_encoder`
+    (DXT1/DXT5 only) and `texconv_path` is ignored. Both backends write `<src stem>.DDS`.
 
     Args:
         texconv_path (str): Full path to the `texconv.exe` executable.
@@ -60,13 +118,39 @@ def convert_to_dds(texconv_path: str, src: Path, dst_folder: Path, dds_format: s
                            `texconv.exe` will use the source image's name for the output DDS file.
         dds_format (str): The DDS compression format to use (e.g., "DXT1", "DXT5", "BC7_UNORM").
                           Defaults to "DXT5".
+        backend (str): "texconv" or "builtin". Defaults to "texconv".
+        mipmaps (int | str): Number of mipmap levels (1 = none) or "full". The chain is built by
+                             `core.mipmaps` and needs NumPy (see `convert_image_to_dds`). Defaults to 1.
+        mip_filter (str): Downsampling filter for the mipmaps. Defaults to "box".
     
     Raises:
         FileNotFoundError: If `texconv_path` is incorrect or `texconv.exe` is not found.
                            Also if `src` image path is not found.
         subprocess.CalledProcessError: If `texconv.exe` returns a non-zero exit code,
                                        indicating a conversion error.
+        ValueError: If `backend` is unknown, or the builtin backend does not support `dds_format`.
     """
+    if backend not in DDS_BACKENDS:
+        raise ValueError(f"Unknown DDS backend '{backend}'. Expected one of: {', '.join(DDS_BACKENDS)}")
+
+    if mipmaps != 1:
+        if not src.is_file():
+            print(f"❌ Error: Source image for DDS conversion not found at '{src}'.")
+            raise FileNotFoundError(f"Source image {src} not found for DDS conversion.")
+        with Image.open(src) as img:
+            convert_image_to_dds(texconv_path, img, dst_folder / f"{src.stem}.DDS", dds_format, backend, mipmaps, mip_filter)
+        return
+
+    if backend == "builtin":
+        if not src.is_file():
+            print(f"❌ Error: Source image for DDS conversion not found at '{src}'.")
+            raise FileNotFoundError(f"Source image {src} not found for DDS conversion.")
+        print(f"    Encoding '{src.name}' to DDS format '{dds_format}' in '{dst_folder}' (builtin encoder)...")
+        with Image.open(src) as img:
+            write_dds(img, dst_folder / f"{src.stem}.DDS", dds_format)
+        print(f"    Successfully converted '{src.name}' to DDS.")
+        return
+
     if not Path(texconv_path).is_file():
         print(f"❌ Error: texconv executable not found at '{texconv_path}'.")
         print("Please ensure it's installed, the path is correctly set in core/config.py, or texconv.exe is in your system PATH.")
@@ -113,6 +197,178 @@ def convert_to_dds(texconv_path: str, src: Path, dst_folder: Path, dds_format: s
         print("  Please check the texconv output above for more details (e.g., unsupported format, file issues).")
         raise # Re-raise the exception to halt execution or be handled by caller
 
+def find_dds_output(folder: Path, stem: str) -> Path:
+    """
+    Finds the DDS file texconv wrote for a source with the given stem.
+
+    texconv names its output after the source file, usually with an upper-case ".DDS"
+    extension, but that depends on the version and on how the source was named.
+
+    Args:
+        folder (Path): texconv's output directory.
+        stem (str): The source file name without extension.
+
+    Returns:
+        Path | None: The DDS file, or None if there is none.
+    """
+    for candidate in (folder / f"{stem}.DDS", folder / f"{stem}.dds"):
+        if candidate.is_file():
+            return candidate
+    return None
+
+def convert_many_to_dds(texconv_path: str, sources: list, dst_folder: Path, dds_format: str = "DXT5", batch_size: int = 64) -> dict:
+    """
+    Converts many images to DDS with as few `texconv.exe` runs as possible.
+
+    Instead of one process per image (see `convert_to_dds`), the sources are split into chunks of
+    `batch_size` and each chunk is passed to a single texconv run through a file list (`-flist`),
+    so the process start-up cost, which dominates under Wine, is paid once per chunk.
+    Afterwards every output is renamed to `<src stem>.dds`, whatever case texconv used.
+
+    Args:
+        texconv_path (str): Full path to the `texconv.exe` executable.
+        sources (list[Path]): The source images. Their stems must be unique, since texconv
+                              names every output after its source.
+        dst_folder (Path): The directory where the converted .dds files will be saved.
+        dds_format (str): The DDS compression format to use. Defaults to "DXT5".
+        batch_size (int): Maximum number of images per texconv run. Defaults to 64.
+
+    Returns:
+        dict[Path, Path]: The converted DDS file for each source.
+
+    Raises:
+        FileNotFoundError: If `texconv.exe` is not found, or did not produce a DDS file for a source.
+        subprocess.CalledProcessError: If `texconv.exe` returns a non-zero exit code.
+        ValueError: If two sources share a stem.
+    """
+    sources = [Path(src) for src in sources]
+    if len({src.stem.lower() for src in sources}) != len(sources):
+        raise ValueError("Sources for a batched texconv run must have unique file names.")
+    if not Path(texconv_path).is_file():
+        print(f"❌ Error: texconv executable not found at '{texconv_path}'.")
+        print("Please ensure it's installed, the path is correctly set in core/config.py, or texconv.exe is in your system PATH.")
+        raise FileNotFoundError(f"texconv.exe not found at specified path: {texconv_path}")
+
+    outputs = {}
+    for start in range(0, len(sources), max(1, batch_size)):
+        chunk = sources[start:start + max(1, batch_size)]
+        with tempfile.TemporaryDirectory(prefix="texconv_", dir=dst_folder) as work_dir:
+            file_list = Path(work_dir) / "sources.txt"
+            file_list.write_text("".join(f"{src.resolve()}\n" for src in chunk), encoding="utf-8")
+            # Same arguments as `convert_to_dds`, with the inputs read from the file list
+            command = [
+                texconv_path,
+                "-f", dds_format,
+                "-m", "1",
+                "-o", str(dst_folder),
+                "-flist", str(file_list),
+            ]
+            print(f"    Converting {len(chunk)} image(s) to DDS format '{dds_format}' in '{dst_folder}' with one texconv run...")
+            try:
+                process = subprocess.run(command, check=True, capture_output=True, text=True)
+                print(f"      texconv output: {process.stdout.strip() if process.stdout else 'No output'}")
+            except subprocess.CalledProcessError as e:
+                print(f"❌ Error: texconv failed to convert a batch of {len(chunk)} image(s).")
+                print(f"  Command: {' '.join(command)}")
+                print(f"  Return code: {e.returncode}")
+                if e.stdout:
+                    print(f"  Stdout: {e.stdout.strip()}")
+                if e.stderr:
+                    print(f"  Stderr: {e.stderr.strip()}")
+                raise
+
+        for src in chunk:
+            produced = find_dds_output(dst_folder, src.stem)
+            if produced is None:
+                raise FileNotFoundError(f"texconv did not produce a DDS file for '{src.name}'.")
+            target = dst_folder / f"{src.stem}.dds"
+            if produced != target:
+                os.replace(produced, target)
+            outputs[src] = target
+    return outputs
+
+def save_mip_levels(levels: list, folder: Path, stem: str) -> list:
+    """
+    Writes mipmap levels as uncompressed PNGs named "<stem>_mip<N>.png", ready for texconv.
+
+    Block-compressed formats work on 4x4 pixel blocks and texconv rejects smaller images,
+    so the mipmap levels (not the top level, whose size goes into the DDS header) are padded
+    to a multiple of 4 by repeating the edge pixels. That gives exactly the blocks the level
+    takes up in the DDS file.
+
+    Args:
+        levels (list[np.ndarray]): The levels from `build_mip_chain`, largest first.
+        folder (Path): The directory to write them to.
+        stem (str): The common file name prefix.
+
+    Returns:
+        list[Path]: The written files, in level order.
+    """
+    paths = []
+    for index, level in enumerate(levels):
+        path = folder / f"{stem}_mip{index}.png"
+        if index > 0:
+            height, width = level.shape[:2]
+            level = np.pad(level, ((0, (-height) % 4), (0, (-width) % 4), (0, 0)), mode="edge")
+        Image.fromarray(level, "RGBA").save(path, compress_level=0)
+        paths.append(path)
+    return paths
+
+def convert_image_to_dds(texconv_path: str, image: Image.Image, dst_path: Path, dds_format: str = "DXT5", backend: str = "texconv",
+                         mipmaps=1, mip_filter: str = "box") -> None:
+    """
+    Converts an in-memory image to a DDS file at exactly `dst_path`.
+
+    With the "builtin" backend the pixels go straight to the encoder and nothing else touches
+    the disk. `texconv.exe` can only read files, so with the "texconv" backend the image is
+    written once as an uncompressed PNG to a private temporary folder, converted with
+    `convert_to_dds`, and the temporary files are removed again.
+
+    Mipmaps are built by `core.mipmaps` for both backends, so the chosen filter applies either way.
+    The builtin encoder compresses every level itself; for texconv every level is written as its
+    own PNG, all levels are converted in a single texconv run, and the results are combined into
+    one DDS file (see `combine_dds_levels`).
+
+    Args:
+        texconv_path (str): Full path to the `texconv.exe` executable (unused by the builtin backend).
+        image (Image.Image): The image to convert.
+        dst_path (Path): Full path of the DDS file to write (any existing file is replaced).
+        dds_format (str): The DDS compression format to use. Defaults to "DXT5".
+        backend (str): "texconv" or "builtin". Defaults to "texconv".
+        mipmaps (int | str): Number of mipmap levels (1 = none) or "full". Defaults to 1.
+        mip_filter (str): "box", "lanczos" or "kaiser". Defaults to "box".
+
+    Raises:
+        FileNotFoundError: If `texconv.exe` is not found, or did not produce a DDS file.
+        ImportError: If mipmaps are requested and NumPy is not installed.
+        subprocess.CalledProcessError: If `texconv.exe` returns a non-zero exit code.
+        ValueError: If `backend` is unknown, or the builtin backend does not support `dds_format`.
+    """
+    if backend not in DDS_BACKENDS:
+        raise ValueError(f"Unknown DDS backend '{backend}'. Expected one of: {', '.join(DDS_BACKENDS)}")
+
+    if backend == "builtin":
+        print(f"    Encoding image to DDS format '{dds_format}' at '{dst_path}' (builtin encoder)...")
+        write_dds(image, dst_path, dds_format, mipmaps, mip_filter)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="dds_", dir=dst_path.parent) as work_dir:
+        work_dir = Path(work_dir)
+        if mipmaps != 1:
+            level_paths = save_mip_levels(build_mip_chain(image, mipmaps, mip_filter), work_dir, dst_path.stem)
+            outputs = convert_many_to_dds(texconv_path, level_paths, work_dir, dds_format, batch_size=len(level_paths))
+            dst_path.write_bytes(combine_dds_levels([outputs[path].read_bytes() for path in level_paths]))
+            return
+        src = work_dir / f"{dst_path.stem}.png"
+        # compress_level=0 stores the pixels without deflating them; the file only lives until texconv has read it.
+        image.save(src, compress_level=0)
+        convert_to_dds(texconv_path, src, work_dir, dds_format, backend)
+        produced = find_dds_output(work_dir, src.stem)
+        if produced is not None:
+            os.replace(produced, dst_path)
+            return
+    raise FileNotFoundError(f"texconv did not produce a DDS file for '{dst_path.name}'.")
+
 def create_mod_icon(image_path: Path, dst_path: Path) -> None:
     """
     Creates a standardized mod icon from a source image.
@@ -144,3 +400,17 @@ def create_mod_icon(image_path: Path, dst_path: Path) -> None:
     except IOError as e:
         print(f"❌ Error: Could not open or save image for mod icon. Path: '{image_path}' or '{dst_path}'. Details: {e}")
         raise
+
+def render_mod_icon(image: Image.Image) -> bytes:
+    """
+    Renders the standardized 276x162 JPEG mod icon from an in-memory image (see `create_mod_icon`).
+
+    Args:
+        image (Image.Image): The source image.
+
+    Returns:
+        bytes: The JPEG file content.
+    """
+    buffer = io.BytesIO()
+    image.convert("RGB").resize((276, 162), Image.Resampling.LANCZOS).save(buffer, "JPEG")
+    return buffer.getvalue()
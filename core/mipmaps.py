@@ -0,0 +1,148 @@
+"""
+Mipmap chain generation for the ETS2/ATS Skin Pack Builder.
+
+A mipmap chain is the texture repeated at half, quarter, ... size down to 1x1. The game
+samples the smaller levels for distant vehicles, which saves VRAM bandwidth and avoids
+shimmering. The chain is built here with NumPy, each level downsampled by 2 from the
+previous one, and then handed to whichever DDS backend is active (see `core.image_utils`).
+
+Available filters (`mipmap_filter` in config.py):
+- "box":     plain 2x2 average. Fastest, slightly soft.
+- "lanczos": Lanczos-3 windowed sinc. Sharper, may ring slightly on hard edges.
+- "kaiser":  Kaiser-windowed sinc (alpha 4, 3 lobes). Sharp with less ringing than Lanczos.
+
+Requires NumPy (pip install numpy).
+"""
+import math
+
+from PIL import Image
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+# Accepted values for `mip_filter` (and `mipmap_filter` in config.py)
+MIPMAP_FILTERS = ("box", "lanczos", "kaiser")
+
+# Support radius, in destination pixels, of the windowed-sinc filters
+_SINC_RADIUS = 3
+_KAISER_ALPHA = 4.0
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Mipmap generation needs NumPy. Install it with: pip install numpy "
+                          "(or set dds_mipmaps = 1 in core/config.py to build without mipmaps)")
+
+
+def mip_level_count(width: int, height: int, mipmaps) -> int:
+    """
+    Resolves a mipmap setting to the number of levels for a texture.
+
+    Args:
+        width (int): Width of the top level in pixels.
+        height (int): Height of the top level in pixels.
+        mipmaps (int | str): Number of levels including the top level (1 = no mipmaps),
+                             or "full" for the complete chain down to 1x1.
+
+    Returns:
+        int: The number of levels, never more than the full chain.
+
+    Raises:
+        ValueError: If `mipmaps` is neither "full" nor a positive integer.
+    """
+    full_chain = int(math.log2(max(width, height, 1))) + 1
+    if isinstance(mipmaps, str) and mipmaps.lower() == "full":
+        return full_chain
+    if isinstance(mipmaps, bool) or not isinstance(mipmaps, int) or mipmaps < 1:
+        raise ValueError(f"Invalid mipmap setting {mipmaps!r}: use a level count (1 = none) or \"full\".")
+    return min(mipmaps, full_chain)
+
+
+def _filter_weights(mip_filter: str) -> "np.ndarray":
+    """
+    Returns the taps of a separable 2:1 downsampling kernel.
+
+    A destination pixel sits between two source pixels, so the taps are at half-integer
+    distances from its centre: +-0.5, +-1.5, ... source pixels, i.e. +-0.25, +-0.75, ...
+    destination pixels, where the filter is evaluated.
+    """
+    offsets = (np.arange(4 * _SINC_RADIUS, dtype=np.float64) - (2 * _SINC_RADIUS - 0.5)) / 2
+    if mip_filter == "lanczos":
+        weights = np.sinc(offsets) * np.sinc(offsets / _SINC_RADIUS)
+    else: # kaiser
+        window = np.i0(_KAISER_ALPHA * np.sqrt(np.clip(1 - (offsets / _SINC_RADIUS) ** 2, 0, None))) / np.i0(_KAISER_ALPHA)
+        weights = np.sinc(offsets) * window
+    return (weights / weights.sum()).astype(np.float32)
+
+
+def _downsample_axis(pixels: "np.ndarray", axis: int, weights: "np.ndarray") -> "np.ndarray":
+    """Halves `pixels` (float32) along `axis` with the given kernel, clamping at the edges."""
+    size = pixels.shape[axis]
+    if size == 1:
+        return pixels
+    out_size = size // 2
+    pad = [(0, 0)] * pixels.ndim
+    pad[axis] = (2 * _SINC_RADIUS - 1, 2 * _SINC_RADIUS)
+    padded = np.pad(pixels, pad, mode="edge")
+    out = None
+    for tap, weight in enumerate(weights):
+        # Every second source pixel, starting at this tap's offset
+        index = [slice(None)] * pixels.ndim
+        index[axis] = slice(tap, tap + 2 * out_size, 2)
+        window = padded[tuple(index)]
+        out = window * weight if out is None else out + window * weight
+    return out
+
+
+def downsample(rgba: "np.ndarray", mip_filter: str = "box") -> "np.ndarray":
+    """
+    Computes the next mipmap level: half the width and height (a side of 1 stays 1).
+
+    Args:
+        rgba (np.ndarray): The current level as a (height, width, 4) uint8 array.
+        mip_filter (str): "box", "lanczos" or "kaiser". Defaults to "box".
+
+    Returns:
+        np.ndarray: The next level as a uint8 array.
+    """
+    pixels = rgba.astype(np.float32)
+    if mip_filter == "box":
+        height, width = pixels.shape[:2]
+        if height > 1:
+            pixels = (pixels[0:height - height % 2:2] + pixels[1:height:2]) / 2
+        if width > 1:
+            pixels = (pixels[:, 0:width - width % 2:2] + pixels[:, 1:width:2]) / 2
+    else:
+        weights = _filter_weights(mip_filter)
+        pixels = _downsample_axis(_downsample_axis(pixels, 0, weights), 1, weights)
+    return np.clip(np.rint(pixels), 0, 255).astype(np.uint8)
+
+
+def build_mip_chain(image, mipmaps="full", mip_filter: str = "box") -> list:
+    """
+    Builds the mipmap chain of an image, each level derived from the previous one.
+
+    Args:
+        image (PIL.Image.Image | np.ndarray): The top level. PIL images are converted to RGBA;
+                                              arrays must be (height, width, 4) uint8.
+        mipmaps (int | str): Number of levels (1 = top level only) or "full". Defaults to "full".
+        mip_filter (str): "box", "lanczos" or "kaiser". Defaults to "box".
+
+    Returns:
+        list[np.ndarray]: The levels, largest first, as (height, width, 4) uint8 arrays.
+
+    Raises:
+        ValueError: If `mip_filter` or `mipmaps` is invalid.
+    """
+    _require_numpy()
+    if mip_filter not in MIPMAP_FILTERS:
+        raise ValueError(f"Unknown mipmap filter '{mip_filter}'. Expected one of: {', '.join(MIPMAP_FILTERS)}")
+    if isinstance(image, Image.Image):
+        image = np.asarray(image.convert("RGBA"))
+    levels = [np.ascontiguousarray(image, dtype=np.uint8)]
+    height, width = levels[0].shape[:2]
+    for _ in range(mip_level_count(width, height, mipmaps) - 1):
+        levels.append(downsample(levels[-1], mip_filter))
+    return levels
@@ -9,19 +9,21 @@ This module is responsible for generating:
 """
 from pathlib import Path
 
-def write_manifest(output_folder: Path, mod_name: str, version: str = "1.0.0", author: str = "Your Name") -> None:
+def render_manifest(mod_name: str, version: str = "1.0.0", author: str = "Your Name") -> str:
     """
-    Writes the `manifest.sii` file for the mod.
+    Builds the content of the `manifest.sii` file for the mod.
 
     This file is crucial for the game to recognize and display the mod correctly.
     It includes metadata such as the mod's version, display name, author,
     and references to its icon and description file.
 
     Args:
-        output_folder (Path): The root directory of the mod output where `manifest.sii` will be saved.
         mod_name (str): The display name of the mod (e.g., "My Awesome Skin Pack").
         version (str): The version string for the mod (e.g., "1.0.0").
         author (str): The name of the mod author.
+
+    Returns:
+        str: The manifest.sii content.
     """
     # Define the content of the manifest.sii file using SiiNunit format
     # .package_name is a convention, the actual name is defined by display_name.
@@ -44,6 +46,20 @@ mod_package : .package_name
 	category[]:			"paint_job"
 }}
 }}"""
+    return manifest_content
+
+
+def write_manifest(output_folder: Path, mod_name: str, version: str = "1.0.0", author: str = "Your Name") -> None:
+    """
+    Writes the `manifest.sii` file for the mod (see `render_manifest` for the content).
+
+    Args:
+        output_folder (Path): The root directory of the mod output where `manifest.sii` will be saved.
+        mod_name (str): The display name of the mod (e.g., "My Awesome Skin Pack").
+        version (str): The version string for the mod (e.g., "1.0.0").
+        author (str): The name of the mod author.
+    """
+    manifest_content = render_manifest(mod_name, version, author)
     # Construct the full path to the manifest file and write the content
     manifest_file_path = output_folder / "manifest.sii"
     with open(manifest_file_path, "w", encoding="utf-8") as f:
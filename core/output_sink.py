@@ -0,0 +1,192 @@
+"""
+Output sinks for the ETS2/ATS Skin Pack Builder.
+
+The build produces a list of mod entries, each an `(archive_path, content)` pair
+where `content` is either the file's bytes or the `Path` of an existing file
+(e.g., a DDS in the encode cache). A sink decides where those entries end up:
+
+- `ArchiveSink` writes them straight into the .scs archive, so the mod never
+  exists as a loose folder on disk (no staging copy, no second read pass).
+- `DirectorySink` writes them as a regular folder tree (the "staging folder"),
+  which is handy for inspecting or hand-editing the output before packing.
+
+Many entries are identical (every model of a paint job gets the same shared .sui and
+the same empty stubs). Both sinks store such content once: the staging folder
+hardlinks the duplicates, the archive reuses the compressed data. The savings are
+reported in `duplicate_files` and `duplicate_bytes`.
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from core.dds_cache import place_file
+from core.pack_scs import DEFAULT_COMPRESS_LEVEL, STORED_EXTENSIONS, write_scs
+
+
+class DirectorySink:
+    """
+    Writes mod entries as files below a root folder.
+
+    Files whose content is already up to date (same bytes, or already a hardlink to the
+    same cached file) are left untouched, so rebuilding into an existing staging folder
+    only rewrites what actually changed. The paths of all entries are kept in `written`.
+
+    With hardlinks enabled, byte entries identical to an earlier one are hardlinked to
+    the first file written with that content. Files are always replaced rather than
+    rewritten in place, so changing one of them never changes its former links.
+
+    With `jobs` > 1 the files are written by a thread pool in the background, which hides
+    the per-file latency of network shares and on-access virus scanners. Folders are
+    created once, by the calling thread. `flush()` (or `close()`, or leaving a `with`
+    block) waits for the queued writes and raises the first error among them.
+
+    Args:
+        root (Path): The mod's output folder (e.g., "output_MySkinPack").
+        use_hardlinks (bool): Whether file entries (and duplicate byte entries) are hardlinked
+                              rather than copied. Defaults to True.
+        jobs (int): Number of writer threads (1 writes synchronously). Defaults to 1.
+    """
+
+    def __init__(self, root: Path, use_hardlinks: bool = True, jobs: int = 1):
+        self.root = Path(root)
+        self.use_hardlinks = use_hardlinks
+        self.written = set()
+        self.duplicate_files = 0
+        self.duplicate_bytes = 0
+        self._first_by_digest = {} # content digest -> (path, pending write or None)
+        self._made_dirs = set()
+        self._executor = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+        self._pending = []
+
+    def __enter__(self) -> "DirectorySink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+    def write_bytes(self, rel_path: str, data: bytes) -> None:
+        self.written.add(rel_path)
+        path = self.root / rel_path
+        self._make_parent(path)
+        if self.use_hardlinks:
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            if digest in self._first_by_digest:
+                self.duplicate_files += 1
+                self.duplicate_bytes += len(data)
+                self._submit(self._link_duplicate, *self._first_by_digest[digest], path)
+                return
+            self._first_by_digest[digest] = (path, self._submit(self._write_file, path, data))
+            return
+        self._submit(self._write_file, path, data)
+
+    def add_file(self, rel_path: str, src: Path) -> None:
+        self.written.add(rel_path)
+        path = self.root / rel_path
+        self._make_parent(path)
+        self._submit(self._place, src, path)
+
+    def flush(self) -> None:
+        """Waits until every queued file is written. Raises the first error, if any."""
+        pending, self._pending = self._pending, []
+        errors = [future.exception() for future in pending]
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def _make_parent(self, path: Path) -> None:
+        if path.parent not in self._made_dirs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._made_dirs.add(path.parent)
+
+    def _submit(self, func, *args):
+        if self._executor is None:
+            func(*args)
+            return None
+        future = self._executor.submit(func, *args)
+        self._pending.append(future)
+        return future
+
+    @staticmethod
+    def _write_file(path: Path, data: bytes) -> None:
+        if path.is_file() and path.stat().st_size == len(data) and path.read_bytes() == data:
+            return
+        path.unlink(missing_ok=True) # Don't write through a hardlink
+        path.write_bytes(data)
+
+    def _place(self, src: Path, path: Path) -> None:
+        if self.use_hardlinks and path.is_file() and os.path.samefile(src, path):
+            return
+        place_file(src, path, self.use_hardlinks)
+
+    def _link_duplicate(self, first: Path, first_write, path: Path) -> None:
+        # The first copy was queued earlier, so it is already being written (or done)
+        if first_write is not None:
+            first_write.result()
+        self._place(first, path)
+
+    def write_entries(self, entries) -> None:
+        """Writes a list of `(archive_path, bytes | Path)` entries."""
+        for rel_path, content in entries:
+            if isinstance(content, (bytes, bytearray)):
+                self.write_bytes(rel_path, content)
+            else:
+                self.add_file(rel_path, content)
+
+    def close(self) -> None:
+        """Waits for the queued writes (see `flush`) and stops the writer threads."""
+        try:
+            self.flush()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+
+
+class ArchiveSink:
+    """
+    Collects mod entries and writes them directly into a .scs archive on `close()`.
+
+    Byte contents are kept in memory (they are small text and icon files) and file
+    entries are only referenced, so large textures are read exactly once, while the
+    archive is being written. Entries are written in sorted path order, so the result
+    is byte-identical to packing the same files from a staging folder with `pack_to_scs`.
+    Nothing is written if the build fails before `close()` is called.
+
+    Args:
+        scs_path (Path): Path of the .scs archive to create.
+        compress_level (int): zlib level (1-9) for deflated (text) entries. Defaults to 6.
+        stored_extensions (tuple[str, ...]): Extensions to store uncompressed (see `write_scs`).
+        jobs (int): Number of compression threads used when writing the archive. Defaults to 1.
+    """
+
+    def __init__(self, scs_path: Path, compress_level: int = DEFAULT_COMPRESS_LEVEL,
+                 stored_extensions: tuple = STORED_EXTENSIONS, jobs: int = 1):
+        self.scs_path = Path(scs_path)
+        self.compress_level = compress_level
+        self.stored_extensions = tuple(stored_extensions)
+        self.jobs = jobs
+        self.duplicate_files = 0
+        self.duplicate_bytes = 0
+        self._entries = {}
+
+    def write_bytes(self, rel_path: str, data: bytes) -> None:
+        self._entries[rel_path] = bytes(data)
+
+    def add_file(self, rel_path: str, src: Path) -> None:
+        self._entries[rel_path] = Path(src)
+
+    def write_entries(self, entries) -> None:
+        """Adds a list of `(archive_path, bytes | Path)` entries."""
+        for rel_path, content in entries:
+            if isinstance(content, (bytes, bytearray)):
+                self.write_bytes(rel_path, content)
+            else:
+                self.add_file(rel_path, content)
+
+    def close(self) -> None:
+        """Writes the archive."""
+        self.duplicate_files, self.duplicate_bytes = write_scs(
+            self.scs_path, sorted(self._entries.items()), self.compress_level, self.stored_extensions, self.jobs)
@@ -1,25 +1,293 @@
+import hashlib
 import os
+import struct
 import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
 
-def pack_to_scs(output_folder: Path, mod_name: str) -> Path:
+# Fixed timestamp for every archive entry, so packing the same files always produces
+# the same .scs bytes, regardless of when (or in which order) the files were written.
+ARCHIVE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# Entries that are already compressed (DXT texture blocks, JPEG/PNG images) make up almost all
+# of a pack's bytes, and deflating them costs most of the packing time, so by default they are
+# stored as-is. Opaque DXT5 textures do still shrink (their alpha blocks are constant), so pass
+# `stored_extensions=()` when archive size matters more than packing time.
+STORED_EXTENSIONS = (".dds", ".jpg", ".jpeg", ".png")
+
+# Default zlib level for deflated (text) entries: 1 = fastest, 9 = smallest.
+DEFAULT_COMPRESS_LEVEL = 6
+
+# ZIP record limits above which the Zip64 extensions are used (large packs can exceed 4 GiB).
+ZIP64_SIZE_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+# Values written into the classic fields when the real value lives in a Zip64 record
+_ZIP64_SIZE_MARKER = 0xFFFFFFFF
+_ZIP64_COUNT_MARKER = 0xFFFF
+
+# Entries up to this size are deduplicated: identical content is read and compressed once,
+# and the result reused for every entry with that content (e.g., the shared .sui and the
+# empty stubs repeated for every model). Larger entries are not kept around.
+DEDUP_MAX_SIZE = 1024 * 1024
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+_EXTERNAL_ATTR = 0o644 << 16 # Regular file, rw-r--r--
+_CREATE_SYSTEM = 3 # "Unix", fixed so the archive doesn't depend on the OS that built it
+
+def compression_for(rel_path: str, stored_extensions: tuple = STORED_EXTENSIONS) -> int:
+    """
+    Picks the ZIP compression method for an archive entry based on its extension.
+
+    Args:
+        rel_path (str): The entry's path inside the archive.
+        stored_extensions (tuple[str, ...]): Lower-case extensions to store uncompressed.
+
+    Returns:
+        int: `zipfile.ZIP_STORED` for already-compressed formats, `zipfile.ZIP_DEFLATED` otherwise.
+    """
+    if rel_path.lower().endswith(stored_extensions):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+def _dos_date_time(date_time: tuple) -> tuple:
+    year, month, day, hour, minute, second = date_time
+    return ((year - 1980) << 9) | (month << 5) | day, (hour << 11) | (minute << 5) | (second // 2)
+
+def _prepare_entry(content, method: int, compress_level: int) -> tuple:
+    """
+    Does the CPU-heavy part of adding an entry: reading, CRC and compression.
+
+    Runs in a worker thread when packing in parallel; zlib releases the GIL, so entries
+    really are compressed concurrently. Stored file entries are left alone here and
+    streamed by the writer instead, so large textures are never held in memory.
+
+    Returns:
+        tuple: (method, crc, uncompressed size, payload), where payload is the bytes to write,
+               or the source `Path` for stored files (crc is then None and computed while writing).
+    """
+    if method == zipfile.ZIP_STORED and not isinstance(content, (bytes, bytearray)):
+        return method, None, Path(content).stat().st_size, Path(content)
+    if not isinstance(content, (bytes, bytearray)):
+        content = Path(content).read_bytes()
+    crc = zlib.crc32(content)
+    if method == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -15) # Raw deflate stream, as ZIP requires
+        payload = compressor.compress(content) + compressor.flush()
+    else:
+        payload = bytes(content)
+    return method, crc, len(content), payload
+
+class DedupStats(NamedTuple):
+    """
+    Entries that reused the content of an identical earlier entry.
+
+    Attributes:
+        files (int): Number of duplicate entries.
+        bytes (int): Their total (uncompressed) size.
+    """
+    files: int = 0
+    bytes: int = 0
+
+def _dedup_key(content, method: int):
+    """
+    Identifies an entry's content for deduplication, or returns None if it isn't deduplicated.
+
+    Byte contents are keyed by a hash. Files are keyed by their inode, which catches the
+    hardlinked duplicates in a staging folder (see `DirectorySink`) without reading them;
+    stored files are streamed anyway, so there is nothing to share.
+    """
+    if isinstance(content, (bytes, bytearray)):
+        if len(content) > DEDUP_MAX_SIZE:
+            return None
+        return method, hashlib.blake2b(content, digest_size=16).digest()
+    if method == zipfile.ZIP_STORED:
+        return None
+    stat = Path(content).stat()
+    if stat.st_size > DEDUP_MAX_SIZE:
+        return None
+    return method, stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+def _size_field(value: int) -> int:
+    return _ZIP64_SIZE_MARKER if value > ZIP64_SIZE_LIMIT else value
+
+class _ScsWriter:
+    """
+    Minimal ZIP writer for .scs archives.
+
+    `zipfile` always compresses entries itself, one at a time, so it can't take data that was
+    compressed elsewhere. This writer only lays out already-prepared entries (see `_prepare_entry`)
+    with fixed metadata, switching to Zip64 records when sizes, offsets or the entry count need it.
+    """
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.central_directory = []
+        self.dos_date, self.dos_time = _dos_date_time(ARCHIVE_DATE_TIME)
+
+    def add(self, rel_path: str, method: int, crc, file_size: int, payload) -> None:
+        name = rel_path.encode("utf-8")
+        flags = 0 if rel_path.isascii() else 0x800 # Bit 11: file name is UTF-8
+        offset = self.fp.tell()
+        compress_size = file_size if isinstance(payload, Path) else len(payload)
+
+        zip64 = file_size > ZIP64_SIZE_LIMIT or compress_size > ZIP64_SIZE_LIMIT
+        extra = struct.pack("<HHQQ", 0x0001, 16, file_size, compress_size) if zip64 else b""
+        version = 45 if zip64 else 20
+        self.fp.write(struct.pack(
+            "<IHHHHHIIIHH", 0x04034B50, version, flags, method, self.dos_time, self.dos_date, crc or 0,
+            _ZIP64_SIZE_MARKER if zip64 else compress_size, _ZIP64_SIZE_MARKER if zip64 else file_size,
+            len(name), len(extra)))
+        self.fp.write(name)
+        self.fp.write(extra)
+
+        if isinstance(payload, Path):
+            # Stored file: stream it in and patch the CRC into the local header afterwards.
+            crc = 0
+            with open(payload, "rb") as src:
+                for chunk in iter(lambda: src.read(_COPY_CHUNK_SIZE), b""):
+                    crc = zlib.crc32(chunk, crc)
+                    self.fp.write(chunk)
+            end = self.fp.tell()
+            self.fp.seek(offset + 14) # CRC-32 field of the local file header
+            self.fp.write(struct.pack("<I", crc))
+            self.fp.seek(end)
+        else:
+            self.fp.write(payload)
+
+        self.central_directory.append((name, flags, method, crc, compress_size, file_size, offset))
+
+    def finish(self) -> None:
+        cd_offset = self.fp.tell()
+        for name, flags, method, crc, compress_size, file_size, offset in self.central_directory:
+            # Zip64 extra field: only the values that overflow, in this fixed order
+            zip64_values = [value for value in (file_size, compress_size, offset) if value > ZIP64_SIZE_LIMIT]
+            extra = struct.pack(f"<HH{len(zip64_values)}Q", 0x0001, 8 * len(zip64_values), *zip64_values) if zip64_values else b""
+            version = 45 if zip64_values else 20
+            self.fp.write(struct.pack(
+                "<IHHHHHHIIIHHHHHII", 0x02014B50, (_CREATE_SYSTEM << 8) | version, version, flags, method,
+                self.dos_time, self.dos_date, crc,
+                _size_field(compress_size), _size_field(file_size),
+                len(name), len(extra), 0, 0, 0, _EXTERNAL_ATTR, _size_field(offset)))
+            self.fp.write(name)
+            self.fp.write(extra)
+        cd_size = self.fp.tell() - cd_offset
+        count = len(self.central_directory)
+
+        if count > ZIP64_COUNT_LIMIT or cd_offset > ZIP64_SIZE_LIMIT or cd_size > ZIP64_SIZE_LIMIT:
+            zip64_end_offset = self.fp.tell()
+            self.fp.write(struct.pack("<IQHHIIQQQQ", 0x06064B50, 44, (_CREATE_SYSTEM << 8) | 45, 45, 0, 0,
+                                      count, count, cd_size, cd_offset))
+            self.fp.write(struct.pack("<IIQI", 0x07064B50, 0, zip64_end_offset, 1))
+        count_field = _ZIP64_COUNT_MARKER if count > ZIP64_COUNT_LIMIT else count
+        self.fp.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, count_field, count_field,
+                                  _size_field(cd_size), _size_field(cd_offset), 0))
+
+def write_scs(scs_path: Path, entries, compress_level: int = DEFAULT_COMPRESS_LEVEL,
+              stored_extensions: tuple = STORED_EXTENSIONS, jobs: int = 1) -> DedupStats:
+    """
+    Writes a .scs archive from a list of entries.
+
+    Each entry is an `(archive_path, content)` pair where `content` is either the entry's
+    bytes or the `Path` of a file to read. Entries are written in the given order, each
+    with a fixed timestamp and permissions, so the same entries always produce a
+    byte-identical archive. Textures and images are stored, text formats (.sii, .sui,
+    .mat, .tobj, ...) are deflated (see `compression_for`).
+
+    Entries with the same content as an earlier one (up to `DEDUP_MAX_SIZE`) reuse its
+    CRC and compressed data instead of being compressed again. ZIP has no way to share
+    data between entries, so each one is still written out in full.
+
+    With `jobs` > 1, entries are compressed concurrently in a thread pool, a bounded number
+    of entries ahead of the writer, while the archive itself (and its central directory)
+    is still written strictly in entry order. The result is identical for any number of jobs.
+
+    Args:
+        scs_path (Path): Path of the .scs file to create (replaced if it exists).
+        entries (Iterable[tuple[str, bytes | Path]]): The archive entries, using "/" separators.
+        compress_level (int): zlib level (1-9) for deflated entries. Defaults to 6.
+        stored_extensions (tuple[str, ...]): Extensions to store uncompressed.
+                                             Pass `()` to deflate every entry.
+        jobs (int): Number of compression threads. Defaults to 1.
+
+    Returns:
+        DedupStats: The entries that reused an identical entry's data.
+    """
+    stored_extensions = tuple(stored_extensions) # str.endswith needs a tuple, config.py may hold a list
+    duplicate_files = duplicate_bytes = 0
+    prepared = {} # dedup key -> prepared entry (or its future)
+    with open(scs_path, "wb") as fp:
+        writer = _ScsWriter(fp)
+        if jobs <= 1:
+            for rel_path, content in entries:
+                method = compression_for(rel_path, stored_extensions)
+                key = _dedup_key(content, method)
+                if key in prepared:
+                    entry = prepared[key]
+                    duplicate_files += 1
+                    duplicate_bytes += entry[2]
+                else:
+                    entry = _prepare_entry(content, method, compress_level)
+                    if key is not None:
+                        prepared[key] = entry
+                writer.add(rel_path, *entry)
+        else:
+            # Keep only a few prepared entries in flight, so memory use stays flat however large the pack is.
+            pending = deque()
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                for rel_path, content in entries:
+                    method = compression_for(rel_path, stored_extensions)
+                    key = _dedup_key(content, method)
+                    duplicate = key in prepared
+                    if not duplicate:
+                        future = executor.submit(_prepare_entry, content, method, compress_level)
+                        if key is not None:
+                            prepared[key] = future
+                    pending.append((rel_path, prepared[key] if duplicate else future, duplicate))
+                    if len(pending) >= jobs * 2:
+                        ready_path, ready, duplicate = pending.popleft()
+                        entry = ready.result()
+                        duplicate_files += duplicate
+                        duplicate_bytes += entry[2] if duplicate else 0
+                        writer.add(ready_path, *entry)
+                while pending:
+                    ready_path, ready, duplicate = pending.popleft()
+                    entry = ready.result()
+                    duplicate_files += duplicate
+                    duplicate_bytes += entry[2] if duplicate else 0
+                    writer.add(ready_path, *entry)
+        writer.finish()
+    return DedupStats(duplicate_files, duplicate_bytes)
+
+def pack_to_scs(output_folder: Path, mod_name: str, compress_level: int = DEFAULT_COMPRESS_LEVEL,
+                stored_extensions: tuple = STORED_EXTENSIONS, jobs: int = 1) -> Path:
     """
     Creates a .scs archive from the given output folder.
 
+    Entries are added in sorted path order with a fixed timestamp, so the archive
+    is reproducible: the same mod files always give a byte-identical .scs.
+
     Args:
         output_folder (Path): The directory containing all mod files.
         mod_name (str): The name for the resulting SCS file (without extension).
+        compress_level (int): zlib level (1-9) for deflated (text) entries. Defaults to 6.
+        stored_extensions (tuple[str, ...]): Extensions to store uncompressed (see `write_scs`).
+        jobs (int): Number of compression threads. Defaults to 1.
 
     Returns:
         Path: The path to the created .scs file.
     """
     scs_name = Path(f"{mod_name}.scs")
 
-    with zipfile.ZipFile(scs_name, "w", zipfile.ZIP_DEFLATED) as scs:
-        for root, _, files in os.walk(output_folder):
-            for file in files:
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, output_folder)
-                scs.write(full_path, rel_path)
+    entries = []
+    for root, _, files in os.walk(output_folder):
+        for file in files:
+            full_path = os.path.join(root, file)
+            rel_path = os.path.relpath(full_path, output_folder).replace(os.sep, "/")
+            entries.append((rel_path, Path(full_path)))
+    entries.sort()
 
+    write_scs(scs_name, entries, compress_level, stored_extensions, jobs)
     return scs_name
@@ -0,0 +1,109 @@
+"""
+Stable paint job IDs for the ETS2/ATS Skin Pack Builder.
+
+Every source image becomes a paint job whose ID (e.g., "skin4821") ends up in all of its
+file names and definition files. IDs are derived from a hash of the image's file name, so
+the same skin gets the same ID on every run and every machine, and they are persisted in a
+small JSON mapping file. Once an image has an ID in the mapping it never changes, even if
+the prefix or digit count is changed later, so a released mod can be updated in place.
+
+Collisions (two file names hashing to the same ID) are resolved by re-hashing the name with
+an attempt counter until a free ID is found. IDs of images that were removed stay reserved
+in the mapping, so they are never handed to a different skin.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+
+def derive_paint_id(image_name: str, prefix: str, digits: int = 4, attempt: int = 0) -> str:
+    """
+    Derives a paint ID from an image's file name.
+
+    Args:
+        image_name (str): File name of the source image (e.g., "red_stripes.png").
+        prefix (str): The paint job prefix (e.g., "skin").
+        digits (int): Number of decimal digits after the prefix. Defaults to 4.
+        attempt (int): Collision counter; each value gives a different, equally stable ID. Defaults to 0.
+
+    Returns:
+        str: The paint ID (e.g., "skin4821").
+    """
+    key = image_name if attempt == 0 else f"{image_name}#{attempt}"
+    number = int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big") % (10 ** digits)
+    return f"{prefix}{number:0{digits}d}"
+
+
+def assign_paint_ids(image_names, mapping: dict, prefix: str, digits: int = 4) -> dict:
+    """
+    Assigns a paint ID to every image, keeping the IDs already recorded in `mapping`.
+
+    New images are processed in sorted order, so the result doesn't depend on the order
+    the images were listed in.
+
+    Args:
+        image_names (Iterable[str]): File names of the source images.
+        mapping (dict[str, str]): Previously assigned IDs by file name (see `load_paint_id_map`).
+        prefix (str): The paint job prefix for new IDs.
+        digits (int): Number of digits for new IDs. Defaults to 4.
+
+    Returns:
+        dict[str, str]: The updated mapping: every entry of `mapping`, plus one for each new image.
+
+    Raises:
+        ValueError: If the ID space (`10 ** digits` IDs) is exhausted.
+    """
+    result = dict(mapping)
+    taken = set(result.values())
+    for image_name in sorted(set(image_names) - result.keys()):
+        if len(taken) >= 10 ** digits:
+            raise ValueError(f"No free {digits}-digit paint IDs left for '{image_name}'; increase paint_id_digits.")
+        attempt = 0
+        paint_id = derive_paint_id(image_name, prefix, digits)
+        while paint_id in taken:
+            attempt += 1
+            paint_id = derive_paint_id(image_name, prefix, digits, attempt)
+        result[image_name] = paint_id
+        taken.add(paint_id)
+    return result
+
+
+def load_paint_id_map(path: Path) -> dict:
+    """
+    Loads the persisted paint ID mapping.
+
+    Args:
+        path (Path): Location of the mapping JSON file.
+
+    Returns:
+        dict[str, str]: Paint IDs by image file name (empty if the file doesn't exist yet).
+
+    Raises:
+        ValueError: If the file exists but isn't a valid mapping. It is never silently
+                    replaced, since that would change the IDs of a released mod.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            mapping = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if not isinstance(mapping, dict) or not all(isinstance(v, str) for v in mapping.values()):
+        raise ValueError(f"Paint ID mapping '{path}' must be a JSON object of image file name -> paint ID.")
+    return mapping
+
+
+def save_paint_id_map(path: Path, mapping: dict) -> None:
+    """
+    Writes the paint ID mapping (sorted, one entry per line, so it diffs well under version control).
+
+    Args:
+        path (Path): Location of the mapping JSON file.
+        mapping (dict[str, str]): Paint IDs by image file name.
+    """
+    path = Path(path)
+    partial_path = path.with_name(path.name + ".partial")
+    with open(partial_path, "w", encoding="utf-8") as f:
+        json.dump(mapping, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(partial_path, path)
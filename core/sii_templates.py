@@ -0,0 +1,174 @@
+"""
+Precompiled SII/SUI templates for the ETS2/ATS Skin Pack Builder.
+
+Every paint job needs the same few definition files for every truck and trailer model,
+differing only in the paint ID and model name. The file texts are kept here as templates
+with `${name}` placeholders. A `SiiTemplate` splits its text once, when it is created,
+so rendering is a single join of the literal parts and the values.
+
+`render_all` renders the definition files of many paint jobs and models as
+`(mod path, bytes)` entries, ready for an output sink (see `core.output_sink`).
+"""
+import re
+from functools import lru_cache
+
+from core.config import create_mask_sui, create_metallic_sui
+
+_PLACEHOLDER = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+class SiiTemplate:
+    """
+    A text template with `${name}` placeholders, compiled once.
+
+    Args:
+        text (str): The template text. Braces without a leading "$" are plain text,
+                    so SII unit blocks need no escaping.
+
+    Attributes:
+        fields (frozenset[str]): The placeholder names used by the template.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        # re.split with a group alternates literal text (even indices) and field names (odd indices)
+        self._parts = _PLACEHOLDER.split(text)
+        self._field_slots = tuple(range(1, len(self._parts), 2))
+        self.fields = frozenset(self._parts[i] for i in self._field_slots)
+
+    def render(self, **values) -> str:
+        """
+        Fills in the placeholders.
+
+        Args:
+            **values (str): A value for every placeholder in `fields`.
+
+        Returns:
+            str: The rendered text.
+
+        Raises:
+            KeyError: If a placeholder has no value.
+        """
+        parts = self._parts.copy()
+        for slot in self._field_slots:
+            parts[slot] = values[parts[slot]]
+        return "".join(parts)
+
+
+def _include_lines(metallic: bool, mask: bool) -> str:
+    lines = ""
+    if metallic:
+        lines += '\n@include "${paint_id}_metallic.sui"  # Optional: Metallic paint properties'
+    if mask:
+        lines += '\n@include "${paint_id}_mask.sui"      # Optional: Paint mask properties'
+    return lines
+
+
+@lru_cache(maxsize=None)
+def truck_sii_template(metallic: bool, mask: bool) -> SiiTemplate:
+    """The truck paint job .sii template, with or without the metallic and mask includes."""
+    return SiiTemplate(
+        "SiiNunit\n"
+        "{\n"
+        "accessory_paint_job_data: ${paint_id}_0.${model}.paint_job\n"
+        "{\n"
+        '@include "${paint_id}_shared.sui"     # Shared paint job attributes (price, name, etc.)'
+        + _include_lines(metallic, mask) + "\n"
+        "\n"
+        "# Specifies which truck cabins this paint job can be applied to.\n"
+        "# Common cabin types are listed; specific games/trucks might have more/less.\n"
+        'suitable_for[]: "l2h1.${model}.cabin"\n'
+        'suitable_for[]: "l2h2.${model}.cabin"\n'
+        'suitable_for[]: "l2h3.${model}.cabin"\n'
+        'suitable_for[]: "l2h3_8x4.${model}.cabin"\n'
+        "\n"
+        "# Path to the texture object (.tobj) file for this paint job.\n"
+        '# The "_0" in the TOBJ filename is a common convention for truck base textures.\n'
+        'paint_job_mask: "/vehicle/truck/upgrade/paintjob/${model}/${paint_id}/${paint_id}_0.tobj"\n'
+        "}\n"
+        "}"
+    )
+
+
+@lru_cache(maxsize=None)
+def trailer_sii_template(metallic: bool, mask: bool) -> SiiTemplate:
+    """The trailer paint job .sii template, with or without the metallic and mask includes."""
+    return SiiTemplate(
+        "SiiNunit\n"
+        "{\n"
+        "# Generated by ETS2/ATS Skin Pack Builder\n"
+        "\n"
+        "accessory_paint_job_data: ${paint_id}.${model}.paint_job\n"
+        "{\n"
+        "\n"
+        '@include "${paint_id}_shared.sui"     # Shared paint job attributes'
+        + _include_lines(metallic, mask) + "\n"
+        "\n"
+        "# Path to the texture object (.tobj) file for this paint job.\n"
+        '# "_shared" in the TOBJ filename is a common convention for trailer textures.\n'
+        'paint_job_mask: "/vehicle/trailer_owned/upgrade/paintjob/${model}/${paint_id}/${paint_id}_shared.tobj"\n'
+        "\n"
+        "}\n"
+        "}"
+    )
+
+
+# Shared attributes of a paint job, as used by "Advanced truck skin (NextGen)" templates
+_SHARED_SUI_BODY = """
+	name:					"${paint_id}"
+	price:					1
+	unlock:					0
+	icon:					"${paint_id}"  # Refers to the UI icon%s
+	airbrush:				true
+	base_color_locked:		true
+	base_color:				(0.600000, 0.600000, 0.600000)  # Default grey base color
+	alternate_uvset:		false
+"""
+
+TRUCK_SUI = SiiTemplate("# Generated by ETS2/ATS Skin Pack Builder: Shared SUI for Truck\n"
+                        + _SHARED_SUI_BODY % " (often derived from paint_id)")
+TRAILER_SUI = SiiTemplate("# Generated by ETS2/ATS Skin Pack Builder: Shared SUI for Trailer\n"
+                          + _SHARED_SUI_BODY % "")
+
+# Per vehicle type: (.sii template factory, shared .sui template)
+_VEHICLE_TEMPLATES = {
+    "truck": (truck_sii_template, TRUCK_SUI),
+    "trailer_owned": (trailer_sii_template, TRAILER_SUI),
+}
+
+
+def render_all(paint_ids, models, def_root: str = "def", metallic: bool = create_metallic_sui,
+               mask: bool = create_mask_sui):
+    """
+    Renders the definition files of every paint job for every model.
+
+    Per model and paint job this is the main `.sii`, the shared `.sui` and empty
+    metallic and mask `.sui` stubs (which users can fill in later without touching
+    the other files).
+
+    Args:
+        paint_ids (Iterable[str]): The paint job IDs.
+        models (Iterable[tuple[str, str]]): `(vehicle type, model)` pairs, where the vehicle
+                                            type is "truck" or "trailer_owned".
+        def_root (str): Mod path of the definition folder. Defaults to "def".
+        metallic (bool): Whether the .sii includes the metallic .sui. Defaults to `create_metallic_sui`.
+        mask (bool): Whether the .sii includes the mask .sui. Defaults to `create_mask_sui`.
+
+    Yields:
+        tuple[str, bytes]: `(mod path, content)` entries.
+
+    Raises:
+        ValueError: If a vehicle type is unknown.
+    """
+    paint_ids = list(paint_ids)
+    for vehicle_type_name, model in models:
+        if vehicle_type_name not in _VEHICLE_TEMPLATES:
+            raise ValueError(f"Invalid vehicle_type_name provided: {vehicle_type_name}")
+        sii_template_factory, sui_template = _VEHICLE_TEMPLATES[vehicle_type_name]
+        sii_template = sii_template_factory(metallic, mask)
+        def_path = f"{def_root}/vehicle/{vehicle_type_name}/{model}/paint_job"
+        for paint_id in paint_ids:
+            yield f"{def_path}/{paint_id}.sii", sii_template.render(paint_id=paint_id, model=model).encode("utf-8")
+            yield f"{def_path}/{paint_id}_shared.sui", sui_template.render(paint_id=paint_id).encode("utf-8")
+            yield f"{def_path}/{paint_id}_metallic.sui", b""
+            yield f"{def_path}/{paint_id}_mask.sui", b""
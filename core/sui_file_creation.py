@@ -4,12 +4,16 @@ Generates .sui definition files for ETS2/ATS paint jobs.
 These .sui files typically store shared attributes for paint job accessories,
 such as the name, price, unlock level, UI icon, and basic material properties.
 They are included by the main .sii definition files.
+
+`render_*` functions return the file content; `create_*` functions write it to disk.
+The texts are precompiled templates (see `core.sii_templates`).
 """
 from pathlib import Path
+from core.sii_templates import TRAILER_SUI, TRUCK_SUI
 
-def create_truck_sui(paint_id: str, path: Path, model: str) -> None:
+def render_truck_sui(paint_id: str, model: str) -> str:
     """
-    Creates a .sui file with shared attributes for a truck paint job.
+    Builds the content of a .sui file with shared attributes for a truck paint job.
 
     The content includes common parameters like name (derived from paint_id),
     price, unlock level, UI icon reference, and material properties like
@@ -18,57 +22,61 @@ def create_truck_sui(paint_id: str, path: Path, model: str) -> None:
     Args:
         paint_id (str): The unique identifier for the paint job (e.g., "skin001").
                         This is used for the 'name' and 'icon' fields.
-        path (Path): The full path where the .sui file will be saved.
         model (str): The internal game model name of the truck (e.g., "scania.s_2016").
                      Currently unused in the SUI content itself but kept for consistency.
+
+    Returns:
+        str: The .sui file content.
     """
-    # The content is a simple text block defining paint job attributes.
     # These attributes are common for "Advanced truck skin (NextGen)" templates.
-    content = f"""# Generated by ETS2/ATS Skin Pack Builder: Shared SUI for Truck
+    return TRUCK_SUI.render(paint_id=paint_id)
 
-	name:					"{paint_id}"
-	price:					1
-	unlock:					0
-	icon:					"{paint_id}"  # Refers to the UI icon (often derived from paint_id)
-	airbrush:				true
-	base_color_locked:		true
-	base_color:				(0.600000, 0.600000, 0.600000)  # Default grey base color
-	alternate_uvset:		false
-"""
+def create_truck_sui(paint_id: str, path: Path, model: str) -> None:
+    """
+    Creates a .sui file with shared attributes for a truck paint job (see `render_truck_sui`).
+
+    Args:
+        paint_id (str): The unique identifier for the paint job (e.g., "skin001").
+        path (Path): The full path where the .sui file will be saved.
+        model (str): The internal game model name of the truck (e.g., "scania.s_2016").
+    """
+    content = render_truck_sui(paint_id, model)
 
     # Write the generated content to the specified file path
     with open(path, "w", encoding="utf-8") as f:
         f.write(content)
     print(f"    Successfully created truck SUI: {path}")
         
-def create_trailer_sui(paint_id: str, path: Path, model: str) -> None:
+def render_trailer_sui(paint_id: str, model: str) -> str:
     """
-    Creates a .sui file with shared attributes for a trailer paint job.
+    Builds the content of a .sui file with shared attributes for a trailer paint job.
 
-    The content is identical to `create_truck_sui` in this implementation,
+    The content is identical to `render_truck_sui` in this implementation,
     providing common parameters like name, price, unlock level, UI icon,
     and basic material properties.
 
     Args:
         paint_id (str): The unique identifier for the paint job (e.g., "skin001").
                         This is used for the 'name' and 'icon' fields.
-        path (Path): The full path where the .sui file will be saved.
         model (str): The internal game model name of the trailer (e.g., "scs_box").
                      Currently unused in the SUI content itself but kept for consistency.
+
+    Returns:
+        str: The .sui file content.
     """
-    # The content is a simple text block defining paint job attributes.
     # Note: This content is identical to the truck SUI in the current script version.
-    content = f"""# Generated by ETS2/ATS Skin Pack Builder: Shared SUI for Trailer
+    return TRAILER_SUI.render(paint_id=paint_id)
 
-	name:					"{paint_id}"
-	price:					1
-	unlock:					0
-	icon:					"{paint_id}"  # Refers to the UI icon
-	airbrush:				true
-	base_color_locked:		true
-	base_color:				(0.600000, 0.600000, 0.600000)  # Default grey base color
-	alternate_uvset:		false
-"""
+def create_trailer_sui(paint_id: str, path: Path, model: str) -> None:
+    """
+    Creates a .sui file with shared attributes for a trailer paint job (see `render_trailer_sui`).
+
+    Args:
+        paint_id (str): The unique identifier for the paint job (e.g., "skin001").
+        path (Path): The full path where the .sui file will be saved.
+        model (str): The internal game model name of the trailer (e.g., "scs_box").
+    """
+    content = render_trailer_sui(paint_id, model)
 
     # Write the generated content to the specified file path
     with open(path, "w", encoding="utf-8") as f:
@@ -0,0 +1,76 @@
+"""
+Per-vehicle texture resolution profiles for the ETS2/ATS Skin Pack Builder.
+
+By default every truck and trailer gets the paint job texture at `image_resolution` in
+`dds_format`. A profile table (`resolution_profiles` in config.py) overrides that per model,
+using model names or shell-style wildcards:
+
+    resolution_profiles = [
+        ("scs.*", (2048, 2048), None),          # SCS trailers at 2048x2048, default format
+        ("krone.*", (2048, 2048), "DXT1"),      # Opaque trailers: 2048x2048 DXT1
+    ]
+
+The first matching pattern wins; models that match none use the defaults. Each image is
+then resized and encoded once per distinct (resolution, format) in use, and that texture
+is shared by every model with the same profile.
+"""
+from fnmatch import fnmatchcase
+from typing import NamedTuple
+
+
+class TextureProfile(NamedTuple):
+    """
+    Size and compression of a paint job texture.
+
+    Attributes:
+        resolution (tuple[int, int]): Texture size as (width, height).
+        dds_format (str): The DDS compression format (e.g., "DXT5").
+    """
+    resolution: tuple
+    dds_format: str
+
+    @property
+    def key(self) -> str:
+        """A short, file-name-safe label like "2048x2048_DXT5"."""
+        return f"{self.resolution[0]}x{self.resolution[1]}_{self.dds_format}"
+
+
+def validate_profiles(profiles) -> None:
+    """
+    Checks the profile table from config.py.
+
+    Args:
+        profiles (list[tuple]): `(pattern, (width, height), dds_format or None)` entries.
+
+    Raises:
+        ValueError: If an entry is malformed.
+    """
+    for entry in profiles:
+        if len(entry) != 3:
+            raise ValueError(f"Resolution profile {entry!r} must be (pattern, (width, height), dds_format or None).")
+        pattern, resolution, profile_format = entry
+        if not isinstance(pattern, str) or not pattern:
+            raise ValueError(f"Resolution profile {entry!r}: the pattern must be a non-empty string.")
+        if len(resolution) != 2 or not all(isinstance(v, int) and v > 0 for v in resolution):
+            raise ValueError(f"Resolution profile {entry!r}: the resolution must be two positive integers.")
+        if profile_format is not None and not isinstance(profile_format, str):
+            raise ValueError(f"Resolution profile {entry!r}: the DDS format must be a string or None.")
+
+
+def profile_for_model(model: str, profiles, default: TextureProfile) -> TextureProfile:
+    """
+    Looks up the texture profile for a vehicle model.
+
+    Args:
+        model (str): The internal model name (e.g., "scs.box").
+        profiles (list[tuple]): `(pattern, (width, height), dds_format or None)` entries;
+                                the first pattern matching `model` wins.
+        default (TextureProfile): Used when no pattern matches, and for a `None` format.
+
+    Returns:
+        TextureProfile: The profile for the model.
+    """
+    for pattern, resolution, profile_format in profiles:
+        if fnmatchcase(model, pattern):
+            return TextureProfile(tuple(resolution), profile_format or default.dds_format)
+    return default
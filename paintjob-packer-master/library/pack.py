@@ -0,0 +1,216 @@
+import os # Checking and making folders
+import json # Reading pack specs
+import re # Checking the internal name
+
+import library.paintjob as pj # Copying and generating mod files
+from library.parallel import WorkUnit, WorkUnitError, iter_work_units # Generating vehicles in parallel (a copy of the skin pack builder's core/parallel.py)
+
+# Paint job generation without the GUI, used by packer.py and packer_cli.py
+# Nothing here imports tkinter, so scripts can build any number of packs in one process
+# Like the rest of the library, file paths are relative to Paint Job Packer's folder, so that should be the working directory
+
+# Vehicle generation mostly waits on the disk (copying templates and writing small files), so by default it uses more
+# threads than there are CPU cores, like Python's ThreadPoolExecutor does
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) + 4)
+
+CABINS_SUPPORTED = {"all": "All cabins", "largest": "Largest cabin only"}
+CABIN_HANDLING = {"separate": "Separate paint jobs", "combined": "Combined paint job"}
+SPEC_TYPE_NAMES = {str: "text", int: "a whole number", bool: "true or false", list: "a list"}
+
+class PackSpec:
+    # Everything needed to generate one paint job (pack), read from a dictionary, e.g. one loaded from a JSON file:
+    # {
+    #     "game": "ets",                        "ets" or "ats"
+    #     "mod_name": "My Paint Job Pack",      Name of the mod folder and in the mod manager
+    #     "mod_version": "1.0",                 Optional, defaults to "1.0"
+    #     "mod_author": "Me",
+    #     "ingame_name": "My Paint Job",        Name in the game's upgrade shop
+    #     "ingame_price": 5000,
+    #     "unlock_level": 0,                    Optional, defaults to 0
+    #     "internal_name": "mypaintjob",        Up to 12 characters, or 10 with separate paint jobs for each cabin
+    #     "vehicles": ["scania.s_2016", "argosy [Harven]"],  Vehicle file names, "[SCS]" is optional
+    #     "paint_jobs": "pack",                 Optional, "pack" (default) or "single"
+    #     "cabins_supported": "all",            Optional, "all" (default) or "largest"
+    #     "cabin_handling": "separate",         Optional, "separate" (default) or "combined"
+    #     "placeholder_templates": false,       Optional, fill the mod with templates from the templates folder
+    #     "workshop_upload": false              Optional, also make the files needed to upload to the Steam Workshop
+    # }
+    # Raises a ValueError if anything is missing or invalid
+
+    def __init__(self, spec):
+        self.game = require(spec, "game")
+        if self.game not in ["ets", "ats"]:
+            raise ValueError("Unknown game \"{}\", should be \"ets\" or \"ats\"".format(self.game))
+        self.mod_name = require(spec, "mod_name")
+        if pj.contains_illegal_characters_file_name(self.mod_name) or self.mod_name.endswith("."):
+            raise ValueError("Mod name \"{}\" can't be used as a folder name".format(self.mod_name))
+        self.mod_version = check_type(spec, "mod_version", str, "1.0")
+        self.mod_author = require(spec, "mod_author")
+        self.ingame_name = require(spec, "ingame_name")
+        self.ingame_price = str(require(spec, "ingame_price", int))
+        self.unlock_level = str(check_type(spec, "unlock_level", int, 0))
+        if not self.ingame_price.isdigit() or not self.unlock_level.isdigit():
+            raise ValueError("In-game price and unlock level should be whole numbers")
+        self.num_of_paintjobs = choose(spec, "paint_jobs", {"pack": "pack", "single": "single"}, "pack")
+        self.cabins_supported = choose(spec, "cabins_supported", CABINS_SUPPORTED, "all")
+        self.cabin_handling = choose(spec, "cabin_handling", CABIN_HANDLING, "separate")
+        if self.cabins_supported == "Largest cabin only":
+            self.cabin_handling = "Combined paint job" # The same as the GUI
+        # The same rules as the GUI, separate paint jobs add "_a", "_b" etc. to the internal name
+        self.internal_name = require(spec, "internal_name")
+        if self.cabin_handling == "Separate paint jobs":
+            internal_name_length = 10
+        else:
+            internal_name_length = 12
+        if len(self.internal_name) > internal_name_length:
+            raise ValueError("Internal name \"{}\" is longer than {} characters".format(self.internal_name, internal_name_length))
+        if not re.match("^[0-9a-z_]*$", self.internal_name) or pj.contains_reserved_file_name(self.internal_name):
+            raise ValueError("Internal name \"{}\" can only use lowercase letters, numbers and underscores, and can't be a reserved file name".format(self.internal_name))
+        self.placeholder_templates = check_type(spec, "placeholder_templates", bool, False)
+        self.workshop_upload = check_type(spec, "workshop_upload", bool, False)
+
+        vehicle_names = require(spec, "vehicles", list)
+        if len(vehicle_names) == 0 or not all(isinstance(vehicle_name, str) for vehicle_name in vehicle_names):
+            raise ValueError("\"vehicles\" should be a list of at least one vehicle name")
+        vehicle_index = pj.load_vehicle_index(self.game)
+        self.truck_list = []
+        self.truck_mod_list = []
+        self.bus_mod_list = []
+        self.trailer_list = []
+        self.trailer_mod_list = []
+        vehicle_paths = {}
+        for vehicle_name in vehicle_names:
+            veh = pj.Vehicle(find_vehicle_file(vehicle_index, self.game, vehicle_name), self.game)
+            if veh.path in vehicle_paths:
+                raise ValueError("{} and {} can't be in the same pack, they use the same vehicle path".format(vehicle_paths[veh.path], vehicle_name))
+            vehicle_paths[veh.path] = vehicle_name
+            if veh.trailer:
+                if veh.mod:
+                    self.trailer_mod_list.append(veh)
+                else:
+                    self.trailer_list.append(veh)
+            else:
+                if veh.mod:
+                    if veh.bus_mod:
+                        self.bus_mod_list.append(veh)
+                    else:
+                        self.truck_mod_list.append(veh)
+                else:
+                    self.truck_list.append(veh)
+        self.vehicle_list = self.truck_list + self.truck_mod_list + self.bus_mod_list + self.trailer_list + self.trailer_mod_list
+
+def require(spec, key, value_type = str):
+    if spec.get(key) in [None, ""]:
+        raise ValueError("The pack spec is missing \"{}\"".format(key))
+    return check_type(spec, key, value_type)
+
+def check_type(spec, key, value_type, default = None):
+    # JSON and YAML values can be anything, so check them before they reach the library
+    value = spec.get(key, default)
+    if value_type == int:
+        valid = isinstance(value, (int, str)) and not isinstance(value, bool) # "5000" is fine, it's checked for digits later
+    elif value_type == str:
+        valid = isinstance(value, (str, int, float)) and not isinstance(value, bool) # YAML reads 1.0 as a number
+    else:
+        valid = isinstance(value, value_type)
+    if not valid:
+        raise ValueError("\"{}\" should be {}, not {}".format(key, SPEC_TYPE_NAMES[value_type], json.dumps(value, default = str)))
+    if value_type == str:
+        return str(value)
+    return value
+
+def choose(spec, key, options, default):
+    value = spec.get(key, default)
+    if not isinstance(value, str) or value not in options:
+        raise ValueError("Unknown {} \"{}\", should be one of: {}".format(key, value, ", ".join(options)))
+    return options[value]
+
+def find_vehicle_file(vehicle_index, game, vehicle_name):
+    for file_name in [vehicle_name, vehicle_name + ".ini", vehicle_name + " [SCS].ini"]:
+        if file_name in vehicle_index:
+            return file_name
+    raise ValueError("There's no vehicle called \"{}\" in library/vehicles/{}".format(vehicle_name, game))
+
+def load_specs(file_path):
+    # Reads a JSON or YAML (if PyYAML is installed) file holding one pack spec, or a list of them
+    with open(file_path, encoding="utf-8") as file:
+        if file_path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ModuleNotFoundError:
+                raise ValueError("PyYAML is not installed (pip install pyyaml), use a JSON spec instead")
+            specs = yaml.safe_load(file)
+        else:
+            specs = json.load(file)
+    if isinstance(specs, dict):
+        specs = [specs]
+    if not isinstance(specs, list) or not all(isinstance(spec, dict) for spec in specs):
+        raise ValueError("A spec file should hold one pack spec, or a list of them")
+    return specs
+
+def build_pack(spec, output_path, progress = None, jobs = DEFAULT_JOBS):
+    # Generates a paint job (pack) in output_path/mod_name, with "How to complete your mod.txt" (and the Workshop files) in
+    # output_path, like the GUI's "Paint Job Packer Output" folder. Those files are the same for every pack, so output_path
+    # holds one pack: give each pack its own folder, as packer_cli.py does
+    # spec is a PackSpec or a dictionary (see PackSpec)
+    # progress, if given, is called with ("step", category), where the progress bar should move on, and ("detail", text)
+    # jobs is the number of threads generating vehicles, 1 to generate them one at a time, 0 for one per CPU core
+    if not isinstance(spec, PackSpec):
+        spec = PackSpec(spec)
+    if progress == None:
+        progress = lambda kind, text: None
+
+    out_path = output_path+"/"+spec.mod_name
+    if os.path.exists(out_path) and len(os.listdir(out_path)) > 0:
+        raise FileExistsError("The mod folder {} already exists".format(out_path))
+    if os.path.exists(output_path+"/How to complete your mod.txt"):
+        raise FileExistsError("{} already holds a pack, each pack needs its own folder".format(output_path))
+    if not os.path.exists(out_path):
+        os.makedirs(out_path)
+
+    if spec.workshop_upload:
+        if not os.path.exists(output_path+"/Workshop uploading"):
+            os.makedirs(output_path+"/Workshop uploading")
+
+    progress("step", "General mod files")
+
+    progress("detail", "Mod manifest")
+    pj.make_manifest_sii(out_path, spec.mod_version, spec.mod_name, spec.mod_author, spec.workshop_upload)
+
+    progress("detail", "Mod manager image")
+    pj.copy_mod_manager_image(out_path)
+
+    progress("detail", "Mod manager description")
+    pj.make_description(out_path, spec.truck_list, spec.truck_mod_list, spec.bus_mod_list, spec.trailer_list, spec.trailer_mod_list, spec.num_of_paintjobs)
+
+    pj.make_material_folder(out_path)
+
+    progress("detail", "Paint job icon")
+    pj.copy_paintjob_icon(out_path, spec.ingame_name)
+
+    pj.make_paintjob_icon_tobj(out_path, spec.ingame_name)
+
+    pj.make_paintjob_icon_mat(out_path, spec.internal_name, spec.ingame_name)
+
+    # Every vehicle's files are independent, so they're generated on several threads, and reported as each vehicle
+    # finishes, so one vehicle with large templates doesn't hold up the progress of the others
+    vehicle_units = [WorkUnit(veh.display_name, pj.make_vehicle_files, (out_path, veh, spec.game, spec.internal_name, spec.ingame_name, spec.ingame_price, spec.unlock_level, spec.cabin_handling, spec.cabins_supported, spec.placeholder_templates)) for veh in spec.vehicle_list]
+    try:
+        for veh in iter_work_units(vehicle_units, jobs, ordered = False):
+            progress("step", veh.display_name)
+    except WorkUnitError as e:
+        raise e.__cause__ # So callers can tell a FileNotFoundError from a PermissionError, and so on
+
+    if spec.workshop_upload:
+        progress("step", "Workshop files")
+        pj.copy_versions_sii(output_path+"/Workshop uploading")
+        progress("detail", "Workshop image")
+        pj.copy_workshop_image(output_path)
+        progress("detail", "Workshop readme")
+        pj.make_workshop_readme(output_path, spec.truck_list, spec.truck_mod_list, spec.bus_mod_list, spec.trailer_list, spec.trailer_mod_list, spec.num_of_paintjobs, spec.cabins_supported)
+
+    pj.make_readme_file(output_path, spec.ingame_name, spec.game, spec.mod_name, spec.truck_list+spec.truck_mod_list, spec.bus_mod_list, spec.trailer_list+spec.trailer_mod_list)
+    return out_path
+
+if __name__ == "__main__":
+    print("Run \"packer.py\" to launch Paint Job Packer, or \"packer_cli.py\" to generate paint jobs from the command line")
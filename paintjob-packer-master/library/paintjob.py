@@ -1,19 +1,111 @@
 import os # Making folders and renaming files
+import sys # Finding the mod folder location for the readme
 import shutil # Copying files
-import binascii # Hex-ifying strings for TOBJ files
-import codecs # Encoding TOBJ files
+import binascii # Hex-ifying strings
 import configparser # Reading vehicle database files
+import zipfile # Unzipping templates
+import json # Caching the vehicle database
+import threading # Guarding the vehicle database cache
+
+from library.tobj_writer import build_tobj # Making TOBJ files, shared with the skin pack builder (a copy of its core/tobj_writer.py)
+
+# Complete template packs, linked in "How to complete your mod.txt"
+ETS_TEMPLATE_LINK = "https://forum.scssoft.com/viewtopic.php?f=33&t=272386"
+ATS_TEMPLATE_LINK = "https://forum.scssoft.com/viewtopic.php?f=199&t=288778"
+
+# Vehicle database index
+# Parsing 200+ vehicle INI files takes a noticeable moment, so their contents are compiled into one JSON file per game,
+# {game}-vehicle-index.json in vehicle_index_folder (a per-user cache folder, as the install folder may be read-only).
+# Each entry remembers its INI's modification time and size, and only INIs that have been added, changed or removed are
+# parsed again. The folder is only checked for changes when a game is first loaded, or when refresh is asked for (e.g.
+# when the game is switched), every other lookup is served from memory. Vehicles are looked up from several threads
+# while a paint job is generated, so the in-memory indexes are guarded by a lock.
+
+VEHICLE_INDEX_VERSION = 2
+
+def default_vehicle_index_folder():
+    if sys.platform.startswith("win"):
+        return os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "Paint Job Packer")
+    elif sys.platform.startswith("darwin"):
+        return os.path.expanduser("~/Library/Caches/Paint Job Packer")
+    else:
+        return os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "paint-job-packer")
+
+vehicle_index_folder = default_vehicle_index_folder() # Can be changed before the first load_vehicle_index(), e.g. by tests
+vehicle_indexes = {}
+vehicle_index_lock = threading.Lock()
+
+def load_vehicle_index(game, refresh = False):
+    with vehicle_index_lock:
+        if game in vehicle_indexes and not refresh:
+            return vehicle_indexes[game]
+
+        vehicles_folder = "library/vehicles/{}".format(game)
+        signatures = {}
+        for file_name in os.listdir(vehicles_folder):
+            file_stat = os.stat("{}/{}".format(vehicles_folder, file_name))
+            signatures[file_name] = [file_stat.st_mtime_ns, file_stat.st_size]
+
+        cached = {}
+        try:
+            with open(vehicle_index_path(game), encoding="utf-8") as file:
+                index = json.load(file)
+            # The cache folder is shared by every copy of Paint Job Packer, so only use an index of this copy's vehicles
+            if index["version"] == VEHICLE_INDEX_VERSION and index["folder"] == os.path.abspath(vehicles_folder):
+                cached = index["vehicles"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass # Missing or damaged index, it's rebuilt below
+
+        vehicles = {}
+        changed = len(cached) != len(signatures)
+        for file_name in sorted(signatures):
+            if file_name in cached and cached[file_name]["signature"] == signatures[file_name]:
+                vehicles[file_name] = cached[file_name]
+            else:
+                vehicles[file_name] = {"signature": signatures[file_name], "sections": read_vehicle_ini(game, file_name)}
+                changed = True
+
+        if changed:
+            try:
+                os.makedirs(vehicle_index_folder, exist_ok = True)
+                with open(vehicle_index_path(game) + ".tmp", "w", encoding="utf-8") as file:
+                    json.dump({"version": VEHICLE_INDEX_VERSION, "folder": os.path.abspath(vehicles_folder), "vehicles": vehicles}, file, ensure_ascii=False)
+                os.replace(vehicle_index_path(game) + ".tmp", vehicle_index_path(game))
+            except OSError:
+                print("Could not save the vehicle index, the vehicle database will be read again next time")
+
+        vehicle_indexes[game] = vehicles
+        return vehicles
+
+def vehicle_index_path(game):
+    return os.path.join(vehicle_index_folder, "{}-vehicle-index.json".format(game))
+
+def read_vehicle_ini(game, file_name):
+    veh_ini = configparser.ConfigParser(allow_no_value = True)
+    veh_ini.read("library/vehicles/{}/{}".format(game, file_name), encoding="utf-8")
+    return {section: dict(veh_ini[section]) for section in veh_ini.sections()}
+
+def vehicle_sections(game, file_name):
+    return load_vehicle_index(game)[file_name]["sections"]
+
+def read_bool(value):
+    # The same values and error as ConfigParser.getboolean()
+    if value is None:
+        return None
+    if value.lower() not in configparser.ConfigParser.BOOLEAN_STATES:
+        raise ValueError("Not a boolean: {}".format(value))
+    return configparser.ConfigParser.BOOLEAN_STATES[value.lower()]
 
 class Vehicle:
     def __init__(self, file_name, game):
-        veh_ini = configparser.ConfigParser(allow_no_value = True)
-        veh_ini.read("library/vehicles/{}/{}".format(game, file_name), encoding="utf-8")
+        veh_ini = vehicle_sections(game, file_name)
+        self.file_name = file_name
         self.path = veh_ini["vehicle info"]["vehicle path"]
-        self.alt_uvset = veh_ini["vehicle info"].getboolean("alt uvset")
+        self.alt_uvset = read_bool(veh_ini["vehicle info"].get("alt uvset"))
         self.display_name = veh_ini["vehicle info"]["name"]
         self.name = strip_diacritics(self.display_name)
-        self.trailer = veh_ini["vehicle info"].getboolean("trailer")
-        self.mod = veh_ini["vehicle info"].getboolean("mod")
+        self.trailer = read_bool(veh_ini["vehicle info"].get("trailer"))
+        self.mod = read_bool(veh_ini["vehicle info"].get("mod"))
         if self.mod:
             self.display_author = veh_ini["vehicle info"]["mod author"]
         else:
@@ -23,9 +115,9 @@ class Vehicle:
         self.mod_link_forums = veh_ini["vehicle info"]["mod link forums"]
         self.mod_link_trucky = veh_ini["vehicle info"]["mod link trucky"]
         self.mod_link_author_site = veh_ini["vehicle info"]["mod link author site"]
-        self.uses_accessories = veh_ini["vehicle info"].getboolean("uses accessories")
-        self.bus_mod = veh_ini["vehicle info"].getboolean("bus mod")
-        self.bus_door_workaround = veh_ini["vehicle info"].getboolean("bus door workaround")
+        self.uses_accessories = read_bool(veh_ini["vehicle info"].get("uses accessories"))
+        self.bus_mod = read_bool(veh_ini["vehicle info"].get("bus mod"))
+        self.bus_door_workaround = read_bool(veh_ini["vehicle info"].get("bus door workaround"))
         if self.uses_accessories:
             self.accessories = veh_ini["vehicle info"]["accessories"].split(";")
             self.acc_dict = {}
@@ -36,7 +128,7 @@ class Vehicle:
             self.separate_paintjobs = False
             self.type = "trailer_owned"
         else:
-            self.separate_paintjobs = veh_ini["cabins"].getboolean("separate paintjobs")
+            self.separate_paintjobs = read_bool(veh_ini["cabins"].get("separate paintjobs"))
             self.type = "truck"
             self.cabins = dict(veh_ini["cabins"].items())
             self.cabins.pop("separate paintjobs", None)
@@ -55,8 +147,7 @@ class Vehicle:
 
 
 def make_folder(output_path, path):
-    if not os.path.exists(output_path + "/" + path):
-        os.makedirs(output_path + "/" + path)
+    os.makedirs(output_path + "/" + path, exist_ok = True) # Vehicles are generated in parallel, so another thread may have just made a parent folder
 
 def convert_string_to_hex(string_input):
     if isinstance(string_input, int):
@@ -112,12 +203,8 @@ def contains_reserved_file_name(string_input):
     return any_found
 
 def generate_tobj(path):
-    tobj_string = "010AB170000000000000000000000000000000000100020002000303030002020001000000010000"
-    tobj_string += convert_string_to_hex(len(path))
-    tobj_string += "00000000000000"
-    tobj_string += convert_string_to_hex(path)
-    tobj_file = codecs.decode(tobj_string, "hex_codec")
-    return tobj_file
+    # Paint Job Packer's TOBJs clamp the texture in U and V
+    return build_tobj(path, "clamp")
 
 
 
@@ -179,6 +266,133 @@ def copy_versions_sii(output_path):
 def copy_workshop_image(output_path):
     shutil.copyfile("library/placeholder-files/workshop.jpg", output_path + "/Workshop image.jpg")
 
+def make_readme_file(output_path, paintjob_name, game, mod_name, truck_list, bus_list, trailer_list):
+    file = open(output_path+"/How to complete your mod.txt", "w", encoding="utf-8")
+    file.write("Your mod has been generated and placed inside the \"{}\" folder.\n".format(mod_name))
+    file.write("There are a few steps left to finish it off. You'll need to replace the files listed in this document.\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("To test your mod as you make it, move the \"{}\" folder to your game's mod folder:\n".format(mod_name))
+    if game == "ets":
+        game_name = "Euro Truck Simulator 2"
+    elif game == "ats":
+        game_name = "American Truck Simulator"
+    if sys.platform.startswith("win"):
+        mod_folder_location = "C:\\Users\\(username)\\Documents\\{}\\mod\n".format(game_name)
+    elif sys.platform.startswith("darwin"):
+        mod_folder_location = "/Users/(username)/Library/Application Support/{}/mod\n".format(game_name)
+    elif sys.platform.startswith("linux"):
+        mod_folder_location = "/home/(username)/.local/share/{}/mod\n".format(game_name)
+    file.write(mod_folder_location)
+    file.write("\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("== Mod manager image ==\n")
+    file.write("Mod_Manager_Image.jpg\n")
+    file.write("\n")
+    file.write("A 276 x 162 JPEG image that represents your mod in the in-game mod manager.\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("== Mod manager description ==\n")
+    file.write("Mod_Manager_Description.txt\n")
+    file.write("\n")
+    file.write("Your mod's description in the mod manager.\n")
+    file.write("It can be replaced, or you can modify the one that's already there.\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("== In-game paint job icon ==\n")
+    file.write("material/ui/accessory/{} Icon.dds\n".format(paintjob_name))
+    file.write("\n")
+    file.write("A 256 x 64 DDS image that is shown in-game when you buy your paint job.\n")
+    file.write("Stick to the shape in the placeholder for your icon to match the others in-game.\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("== Vehicle textures ==\n")
+    file.write("All of the .dds files in:\n")
+    if len(truck_list) == 1:
+        file.write("vehicle/truck/upgrade/paintjob/{}/{}/\n".format(paintjob_name, truck_list[0].name))
+    elif len(bus_list) == 1:
+        file.write("vehicle/truck/upgrade/paintjob/{}/{}/\n".format(paintjob_name, bus_list[0].name))
+    elif len(truck_list) + len(bus_list) > 1:
+        file.write("vehicle/truck/upgrade/paintjob/{}/<each vehicle>/\n".format(paintjob_name))
+    if len(truck_list + bus_list) > 0 and len(trailer_list) > 0:
+        file.write("and\n")
+    if len(trailer_list) == 1:
+        file.write("vehicle/trailer_owned/upgrade/paintjob/{}/{}/\n".format(paintjob_name, trailer_list[0].name))
+    elif len(trailer_list) > 1:
+        file.write("vehicle/trailer_owned/upgrade/paintjob/{}/<each vehicle>/\n".format(paintjob_name))
+    file.write("\n")
+    file.write("These are the main files of your mod, determining what your paint job will actually look like.\n")
+    if len(truck_list) + len(bus_list) + len(trailer_list) == 1:
+        file.write("Replace or re-colour every DDS image in this folder.\n")
+    else:
+        file.write("Replace or re-colour every DDS image in these folders.\n")
+    file.write("\n")
+    file.write("Save each DDS in DXT5 format with mipmaps, if possible.\n")
+    file.write("Ensure every file's height and width is a power of 2 (e.g. 16, 64, 2048, 4096 etc).\n")
+    file.write("\n")
+    if game == "ets":
+        file.write("You can grab a complete template pack here: {}\n".format(ETS_TEMPLATE_LINK))
+    else:
+        file.write("You can grab a complete template pack here: {}\n".format(ATS_TEMPLATE_LINK))
+    file.close()
+
+def make_workshop_readme(output_path, truck_list, truck_mod_list, bus_mod_list, trailer_list, trailer_mod_list, num_of_paintjobs, cabins_supported):
+    file = open(output_path+"/How to upload your mod to Steam Workshop.txt", "w", encoding="utf-8")
+    file.write("In order to upload your mod to Steam Workshop, you'll need to use the SCS Workshop Uploader, which only runs on Windows.\n")
+    file.write("To download it, you'll need to own ETS 2 or ATS on Steam. Then go to View > Hidden Games, tick \"Tools\" in the dropdown on\n")
+    file.write("the left, then scroll down to find the SCS Workshop Uploader.\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("Once your mod is complete, compress all of its files into a zip file. Name it universal.zip, and move it to the \"Workshop\n")
+    file.write("uploading\" folder, which should already contain a file called versions.sii.\n")
+    file.write("\n")
+    file.write("You'll also need to create a workshop image, which is a 640 x 360 JPEG, that will represent your mod when people search\n")
+    file.write("for it on the Workshop. There is a placeholder Workshop image.jpg with the correct dimensions.\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("Open the SCS Workshop Uploader and select your game. In the Mod data section browse to the \"Workshop uploading\" folder\n")
+    file.write("and your workshop image. Enter your mod name, change the visibility to Public if you wish, then enter your description.\n")
+    file.write("There's an automatically generated Workshop description at the bottom of this text file that you can copy-paste. On the right,\n")
+    file.write("select \"Truck parts\" under Type, then scroll down and check \"Paintjobs\". Select all the brands applicable to your mod, and\n")
+    file.write("enter a change note if you wish.\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("\n")
+    file.write("Below is a workshop description. It's identical to the mod manager description, but with clickable links for modded vehicles:\n")
+    file.write("\n")
+    if num_of_paintjobs == "single":
+        for veh in truck_list + trailer_list:
+            file.write("This paint job supports the {}\n".format(veh.display_name))
+        for veh in truck_mod_list + bus_mod_list + trailer_mod_list:
+            file.write("This paint job supports {}'s [url={}]{}[/url]\n".format(veh.display_author, veh.mod_link, veh.display_name.split(" [")[0]))
+    else:
+        if len(truck_list) + len(truck_mod_list) > 0:
+            file.write("Trucks supported:\n")
+            for veh in truck_list:
+                file.write(veh.display_name+"\n")
+            for veh in truck_mod_list:
+                file.write("{}'s [url={}]{}[/url]\n".format(veh.display_author, veh.mod_link, veh.display_name.split(" [")[0]))
+            file.write("\n")
+        if len(bus_mod_list) > 0:
+            file.write("Buses supported:\n")
+            for veh in bus_mod_list:
+                file.write("{}'s [url={}]{}[/url]\n".format(veh.display_author, veh.mod_link, veh.display_name.split(" [")[0]))
+            file.write("\n")
+        if len(trailer_list) + len(trailer_mod_list) > 0:
+            file.write("Trailers supported:\n")
+            for veh in trailer_list:
+                file.write(veh.display_name+"\n")
+            for veh in trailer_mod_list:
+                file.write("{}'s [url={}]{}[/url]\n".format(veh.display_author, veh.mod_link, veh.display_name.split(" [")[0]))
+    file.close()
+
 
 
 # material folder
@@ -351,6 +565,78 @@ def make_accessory_tobj(output_path, veh, ingame_name):
             file.write(generate_tobj("/vehicle/{}/upgrade/paintjob/{}/{}/{}.dds".format(veh.type, ingame_name, veh.name, acc_name)))
         file.close()
 
+
+# all files for one vehicle
+
+def make_vehicle_files(output_path, veh, game, internal_name, ingame_name, ingame_price, unlock_level, cabin_handling, cabins_supported, placeholder_templates):
+    # Vehicles don't share any files, so packer.py runs this for several vehicles at once - it mustn't touch the GUI
+    if placeholder_templates:
+        if os.path.exists("templates/{} templates/{} [{}].zip".format(game, veh.path, veh.mod_author)):
+            template_zip = zipfile.ZipFile("templates/{} templates/{} [{}].zip".format(game, veh.path, veh.mod_author))
+        else:
+            template_zip = None
+    else:
+        template_zip = None
+
+    make_def_folder(output_path, veh)
+    make_settings_sui(output_path, veh, internal_name, ingame_name, ingame_price, unlock_level)
+    make_vehicle_folder(output_path, veh, ingame_name)
+    if cabin_handling == "Combined paint job" or veh.type == "trailer_owned" or not veh.separate_paintjobs:
+        one_paintjob = True
+        paintjob_name = internal_name
+        if veh.uses_accessories:
+            if veh.type == "trailer_owned":
+                if veh.name in veh.acc_dict:
+                    main_dds_name = veh.name
+                    veh.acc_dict.pop(veh.name)
+                else:
+                    main_dds_name = "Base Colour"
+            elif veh.type == "truck":
+                main_dds_name = "Cabin"
+        else:
+            main_dds_name = veh.name
+        if veh.alt_uvset:
+            main_dds_name = main_dds_name + " (alt uvset)"
+        if veh.type == "truck" and cabins_supported == "Largest cabin only" and veh.separate_paintjobs:
+            one_paintjob = False
+            for cab_size in veh.cabins:
+                if cab_size == "a":
+                    cab_internal_name = veh.cabins[cab_size][1]
+                    if "/" in cab_internal_name:
+                        cab_internal_name = cab_internal_name.split("/") # For when multiple cabins can use the same template, e.g. Western Star 49X
+                    make_def_sii(output_path, veh, paintjob_name, internal_name, one_paintjob, ingame_name, main_dds_name, cab_internal_name)
+        else:
+            make_def_sii(output_path, veh, paintjob_name, internal_name, one_paintjob, ingame_name, main_dds_name)
+        copy_main_dds(output_path, veh, ingame_name, main_dds_name, template_zip)
+        make_main_tobj(output_path, veh, ingame_name, main_dds_name)
+        if veh.uses_accessories:
+            make_accessory_sii(output_path, veh, ingame_name, paintjob_name)
+    else:
+        for cab_size in veh.cabins:
+            if cabins_supported == "Largest cabin only" and cab_size != "a":
+                pass
+            else:
+                one_paintjob = False
+                paintjob_name = internal_name + "_" + cab_size
+                main_dds_name = veh.cabins[cab_size][0] # Cabin in-game name
+                if veh.alt_uvset:
+                    main_dds_name = main_dds_name[:-1] + ", alt uvset)" # Inserts "alt uvset" into the brackets in the cabin name
+                cab_internal_name = veh.cabins[cab_size][1]
+                if "/" in cab_internal_name:
+                    cab_internal_name = cab_internal_name.split("/") # For when multiple cabins can use the same template, e.g. Western Star 49X
+                make_def_sii(output_path, veh, paintjob_name, internal_name, one_paintjob, ingame_name, main_dds_name, cab_internal_name)
+                copy_main_dds(output_path, veh, ingame_name, main_dds_name, template_zip)
+                make_main_tobj(output_path, veh, ingame_name, main_dds_name)
+                if veh.uses_accessories:
+                    make_accessory_sii(output_path, veh, ingame_name, paintjob_name)
+    if veh.uses_accessories:
+        copy_accessory_dds(output_path, veh, ingame_name, game, template_zip)
+        make_accessory_tobj(output_path, veh, ingame_name)
+
+    if template_zip != None:
+        template_zip.close()
+    return veh
+
 if __name__ == "__main__":
     print("Run \"packer.py\" to launch Paintjob Packer")
     print("")
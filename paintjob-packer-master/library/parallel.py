@@ -0,0 +1,255 @@
+"""
+Work-unit scheduling for the ETS2/ATS Skin Pack Builder.
+
+The build is split into independent work units (one per source image, one per
+vehicle model). This module runs a list of such units either serially in the
+current process or across a pool of worker processes.
+
+Results are always returned in the order the units were given, regardless of
+which worker finished first, so a parallel build produces exactly the same
+output as a serial one.
+
+Units can carry an estimated memory cost. With a memory budget, a unit is only
+started once the units already running leave enough room for it, so a parallel
+build of a large skin folder never holds more image buffers than the budget allows.
+
+Cheap or I/O-bound units (rendering and writing definition files, copying
+templates) are not worth sending to another process; `iter_work_units` runs them
+on a thread pool instead and streams their results back in order.
+
+Paint Job Packer ships an identical copy as paintjob-packer-master/library/parallel.py,
+so it doesn't depend on this repository's layout; edit this file and copy it over
+(tests/test_parallel.py checks the two match).
+"""
+import logging
+import os
+import traceback
+import re
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, NamedTuple
+
+
+class WorkUnit(NamedTuple):
+    """
+    A single, independent piece of build work.
+
+    Attributes:
+        label (str): Human-readable name used in logs and error messages
+                     (e.g., "image skin1234" or "truck daf.xf / skin1234").
+        func (Callable): A module-level function to call. It must be picklable
+                         so it can be sent to a worker process.
+        args (tuple): Positional arguments for `func`.
+    """
+    label: str
+    func: Callable
+    args: tuple = ()
+
+
+class WorkUnitError(Exception):
+    """Raised when a work unit fails. Carries the unit label and the worker's traceback."""
+
+    def __init__(self, label: str, details: str):
+        super().__init__(label, details)
+        self.label = label
+        self.details = details
+
+    def __str__(self):
+        return f"Work unit '{self.label}' failed:\n{self.details}"
+
+
+def resolve_job_count(jobs: int) -> int:
+    """
+    Turns a requested job count into an actual number of worker processes.
+
+    Args:
+        jobs (int): Requested number of jobs. 0 or a negative value means "one per CPU core".
+
+    Returns:
+        int: The number of jobs to run (always at least 1).
+    """
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+_MEMORY_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_memory_size(value) -> int:
+    """
+    Parses a memory size like "8G", "512M", "1.5GiB" or a plain number of bytes.
+
+    Units are binary (1K = 1024 bytes) and case-insensitive.
+
+    Args:
+        value (int | str): The size.
+
+    Returns:
+        int: The size in bytes.
+
+    Raises:
+        ValueError: If the value can't be parsed or isn't positive.
+    """
+    if isinstance(value, int):
+        size = value
+    else:
+        match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*", str(value), re.IGNORECASE)
+        if not match:
+            raise ValueError(f"Invalid memory size '{value}'. Use e.g. 8G, 512M or a number of bytes.")
+        size = int(float(match.group(1)) * _MEMORY_UNITS[match.group(2).upper()])
+    if size <= 0:
+        raise ValueError(f"Memory size must be positive, got '{value}'.")
+    return size
+
+
+def _init_worker(log_level: int, log_format: str, log_datefmt: str) -> None:
+    # Worker processes started with "spawn" (the default on Windows) don't inherit
+    # the parent's logging setup, so apply the same configuration here.
+    logging.basicConfig(level=log_level, format=log_format, datefmt=log_datefmt)
+
+
+def _run_unit(unit: WorkUnit) -> Any:
+    try:
+        return unit.func(*unit.args)
+    except Exception:
+        # Tracebacks don't survive pickling, so send the formatted text back with the label.
+        raise WorkUnitError(unit.label, traceback.format_exc()) from None
+
+
+def _run_unit_in_thread(unit: WorkUnit) -> Any:
+    try:
+        return unit.func(*unit.args)
+    except Exception as e:
+        # Nothing is pickled here, so keep the original exception as the cause for callers that handle it by type.
+        raise WorkUnitError(unit.label, traceback.format_exc()) from e
+
+
+def run_work_units(units: list, jobs: int = 1, log_format: str = "%(message)s", log_datefmt: str = None,
+                   costs: list = None, memory_budget: int = None) -> list:
+    """
+    Runs a list of work units and returns their results in the same order.
+
+    With `jobs` equal to 1 every unit runs in the current process, one after another.
+    With more jobs, units are distributed over a `ProcessPoolExecutor`. Either way the
+    returned list lines up with `units`, and the first failing unit stops the run by
+    raising `WorkUnitError`.
+
+    With `costs` and `memory_budget`, units are admitted in order and only while the
+    estimated memory of the running units plus the next one fits the budget (a unit that
+    exceeds the budget on its own still runs, alone).
+
+    Args:
+        units (list[WorkUnit]): The work units to run.
+        jobs (int): Number of worker processes. 1 runs serially; 0 uses one per CPU core.
+                    Defaults to 1.
+        log_format (str): Logging format applied in worker processes.
+        log_datefmt (str): Logging date format applied in worker processes.
+        costs (list[int], optional): Estimated peak memory of each unit, in bytes.
+        memory_budget (int, optional): Maximum total estimated memory of the running units, in bytes.
+
+    Returns:
+        list: The return value of each unit, in the order of `units`.
+
+    Raises:
+        WorkUnitError: If any unit raises an exception.
+    """
+    jobs = min(resolve_job_count(jobs), max(len(units), 1))
+    if jobs == 1:
+        return [_run_unit(unit) for unit in units]
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(logging.getLogger().level, log_format, log_datefmt),
+    ) as executor:
+        if memory_budget is not None and costs is not None:
+            return _run_within_budget(executor, units, costs, memory_budget, jobs)
+        # Small units (e.g., writing a model's .sii/.sui files) are sent in batches
+        # so process start-up and pickling don't outweigh the actual work.
+        chunksize = max(1, len(units) // (jobs * 4))
+        return list(executor.map(_run_unit, units, chunksize=chunksize))
+
+
+def _run_within_budget(executor, units: list, costs: list, memory_budget: int, jobs: int) -> list:
+    results = [None] * len(units)
+    running = {} # future -> (index, cost)
+    in_use = 0
+    next_index = 0
+    try:
+        while next_index < len(units) or running:
+            # Admit units in order while they fit (and a worker is free to take them)
+            while (next_index < len(units) and len(running) < jobs
+                   and (not running or in_use + costs[next_index] <= memory_budget)):
+                future = executor.submit(_run_unit, units[next_index])
+                running[future] = (next_index, costs[next_index])
+                in_use += costs[next_index]
+                next_index += 1
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, cost = running.pop(future)
+                in_use -= cost
+                results[index] = future.result()
+    except BaseException:
+        for future in running:
+            future.cancel()
+        raise
+    return results
+
+
+def iter_work_units(units, jobs: int = 1, ordered: bool = True):
+    """
+    Runs work units on a thread pool and yields their results.
+
+    Nothing is pickled, so units may use any callable. Results are yielded while later
+    units are still running, so the caller can write or report them straight away.
+    At most `jobs * 2` units are queued at a time.
+
+    Args:
+        units (Iterable[WorkUnit]): The work units to run.
+        jobs (int): Number of threads. 1 runs serially; 0 uses one per CPU core. Defaults to 1.
+        ordered (bool): If True, results are yielded in the order of `units`, each once it and
+                        every unit before it are done. If False, results are yielded as soon as
+                        their unit is done, e.g. to move a progress bar on. Defaults to True.
+
+    Yields:
+        The return value of each unit.
+
+    Raises:
+        WorkUnitError: If any unit raises an exception; the original exception is its `__cause__`.
+                       Units not yet started are cancelled.
+    """
+    jobs = resolve_job_count(jobs)
+    if jobs == 1:
+        for unit in units:
+            yield _run_unit_in_thread(unit)
+        return
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        if ordered:
+            pending = deque()
+            try:
+                for unit in units:
+                    pending.append(executor.submit(_run_unit_in_thread, unit))
+                    if len(pending) >= jobs * 2:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+        else:
+            pending = set()
+            try:
+                for unit in units:
+                    pending.add(executor.submit(_run_unit_in_thread, unit))
+                    if len(pending) >= jobs * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
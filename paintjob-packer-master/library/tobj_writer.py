@@ -0,0 +1,251 @@
+"""
+Handles the creation of binary .tobj (Texture Object) files for ETS2/ATS.
+
+.tobj files are used by the game engine to reference texture files (usually .dds)
+and define certain properties related to how textures are loaded and used.
+The format is not officially documented; the layout below follows community
+reverse-engineering (e.g., ConverterPIX) and files written by Mods Studio 2:
+
+    offset  size  field
+    0       40    header (`TobjHeader`, little-endian)
+    40      4     length of the texture path in bytes (uint32)
+    44      4     reserved, zero
+    48      n     texture path, UTF-8, not null-terminated
+
+Every .tobj of a build shares the same header, so it is packed once per save mode
+and only the length and path are added per file. This module is the only TOBJ
+implementation: the batch builder and the Paint Job Packer GUI both use it.
+Paint Job Packer runs standalone (and as a PyInstaller build), so it ships an
+identical copy as paintjob-packer-master/library/tobj_writer.py; edit this file
+and copy it over (tests/test_tobj_writer.py checks the two match).
+"""
+from dataclasses import astuple, dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+import struct
+import sys
+
+# Magic number / version at offset 0 (bytes 01 0A B1 70)
+TOBJ_VERSION = 0x70B10A01
+
+_HEADER_STRUCT = struct.Struct("<5IH18B")
+_PATH_STRUCT = struct.Struct("<II")
+# Offset of the texture path
+_PATH_OFFSET = _HEADER_STRUCT.size + _PATH_STRUCT.size
+
+
+@dataclass(frozen=True)
+class TobjHeader:
+    """
+    The fixed 40-byte .tobj header. Field names for the unknown bytes are their offsets.
+
+    Attributes:
+        version (int): Magic number/version, always `TOBJ_VERSION`.
+        bias (int): Mipmap bias.
+        texture_type (int): 2 for a 2D texture (5 for a cube map).
+        mag_filter (int): Magnification filter (3 = engine default).
+        min_filter (int): Minification filter (3 = engine default).
+        mip_filter (int): Mipmap filter (3 = engine default).
+        addr_u (int): U address mode (0 = repeat, 2 = clamp to edge).
+        addr_v (int): V address mode.
+        addr_w (int): W address mode (3D textures only).
+        nocompress (int): 1 to keep the texture uncompressed in the game's texture cache.
+        noanisotropic (int): 1 to disable anisotropic filtering.
+        color_space (int): Custom color space flag.
+    """
+    version: int = TOBJ_VERSION
+    unknown_4: int = 0
+    unknown_8: int = 0
+    unknown_12: int = 0
+    unknown_16: int = 0
+    unknown_20: int = 1
+    bias: int = 2
+    unknown_23: int = 0
+    texture_type: int = 2
+    unknown_25: int = 0
+    mag_filter: int = 3
+    min_filter: int = 3
+    mip_filter: int = 3
+    unknown_29: int = 0
+    addr_u: int = 0
+    addr_v: int = 0
+    addr_w: int = 0
+    nocompress: int = 1
+    unknown_34: int = 0
+    noanisotropic: int = 0
+    unknown_36: int = 0
+    unknown_37: int = 1
+    color_space: int = 0
+    unknown_39: int = 0
+
+    def pack(self) -> bytes:
+        """Returns the 40 header bytes."""
+        return _HEADER_STRUCT.pack(*astuple(self))
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "TobjHeader":
+        """Reads a header from the first 40 bytes of `data`."""
+        return cls(*_HEADER_STRUCT.unpack_from(data))
+
+
+# Header fields changed by each save mode. The exact in-game effect of the modes is
+# empirical; they mostly switch the address (wrap) modes and the mipmap filter.
+SAVE_MODES = {
+    "default": {},
+    "mode1": {"nocompress": 0},
+    "mode2": {"bias": 0, "addr_u": 2, "addr_v": 2, "nocompress": 0},
+    "mode3": {"bias": 0, "mip_filter": 2, "addr_u": 2, "addr_v": 2},
+    # The header Paint Job Packer has always written: the default with U/V clamped
+    "clamp": {"addr_u": 2, "addr_v": 2},
+}
+
+
+def header_for_mode(save_mode: str = "default") -> TobjHeader:
+    """
+    Returns the header for a save mode.
+
+    Args:
+        save_mode (str): "default", "mode1", "mode2", "mode3" or "clamp". Defaults to "default".
+
+    Returns:
+        TobjHeader: The header.
+
+    Raises:
+        ValueError: If `save_mode` is unknown.
+    """
+    if save_mode not in SAVE_MODES:
+        raise ValueError(f"Invalid save_mode '{save_mode}'. Must be one of: {', '.join(SAVE_MODES)}.")
+    return replace(TobjHeader(), **SAVE_MODES[save_mode])
+
+
+@lru_cache(maxsize=None)
+def _header_bytes(save_mode: str) -> bytes:
+    return header_for_mode(save_mode).pack()
+
+
+def _encode_path(texture_path_in_mod: str) -> bytes:
+    path_bytes = texture_path_in_mod.encode("utf-8")
+    if len(path_bytes) > 0xFFFFFFFF:
+        raise ValueError(f"Texture path for TOBJ is too long ({len(path_bytes)} bytes).")
+    return path_bytes
+
+
+def _pack_tobj(header_bytes: bytes, texture_path_in_mod: str) -> bytes:
+    path_bytes = _encode_path(texture_path_in_mod)
+    return b"".join((header_bytes, _PATH_STRUCT.pack(len(path_bytes), 0), path_bytes))
+
+
+def build_tobj(texture_path_in_mod: str, save_mode: str = "default") -> bytes:
+    """
+    Builds the bytes of a .tobj file, which is a small metadata file pointing to a texture (DDS).
+
+    Args:
+        texture_path_in_mod (str): The relative path to the texture file (e.g., .dds)
+                                   as it will be structured within the mod archive.
+                                   Example: "/vehicle/truck/upgrade/paintjob/my_truck/skin01/texture.dds"
+        save_mode (str): A string key representing different header configurations (see `SAVE_MODES`).
+                         Valid modes are "default", "mode1", "mode2", "mode3", "clamp".
+                         Defaults to "default".
+
+    Returns:
+        bytes: The complete .tobj file content.
+
+    Raises:
+        ValueError: If `save_mode` is unknown.
+    """
+    return _pack_tobj(_header_bytes(save_mode), texture_path_in_mod)
+
+
+def parse_tobj(data: bytes) -> tuple:
+    """
+    Reads a .tobj file.
+
+    Args:
+        data (bytes): The .tobj file content.
+
+    Returns:
+        tuple[TobjHeader, str]: The header and the texture path.
+
+    Raises:
+        ValueError: If `data` isn't a valid .tobj file.
+    """
+    if len(data) < _PATH_OFFSET:
+        raise ValueError(f"TOBJ data is too short ({len(data)} bytes).")
+    header = TobjHeader.unpack(data)
+    if header.version != TOBJ_VERSION:
+        raise ValueError(f"Not a TOBJ file (version 0x{header.version:08X}).")
+    path_length, _ = _PATH_STRUCT.unpack_from(data, _HEADER_STRUCT.size)
+    if len(data) < _PATH_OFFSET + path_length:
+        raise ValueError(f"TOBJ texture path is truncated ({len(data) - _PATH_OFFSET} of {path_length} bytes).")
+    return header, bytes(data[_PATH_OFFSET:_PATH_OFFSET + path_length]).decode("utf-8")
+
+
+def write_tobj(tobj_filepath: Path, texture_path_in_mod: str, save_mode: str = "default") -> None:
+    """
+    Writes a binary .tobj file pointing to a texture (see `build_tobj` for the format).
+
+    Args:
+        tobj_filepath (Path): The full path where the output .tobj file will be saved.
+        texture_path_in_mod (str): The relative path to the texture file (e.g., .dds)
+                                   as it will be structured within the mod archive.
+        save_mode (str): The header configuration: "default", "mode1", "mode2", "mode3" or "clamp".
+                         Defaults to "default".
+    """
+    full_tobj_data = build_tobj(texture_path_in_mod, save_mode)
+
+    # Write the complete byte array to the output .tobj file in binary mode
+    try:
+        with open(tobj_filepath, 'wb') as f:
+            f.write(full_tobj_data)
+    except IOError as e:
+        print(f"❌ Error writing TOBJ file '{tobj_filepath}': {e}")
+        raise
+
+
+def write_many(tobjs, save_mode: str = "default") -> int:
+    """
+    Writes many .tobj files with the same save mode. The header is packed once.
+
+    Args:
+        tobjs (Iterable[tuple[Path, str]]): `(tobj_filepath, texture_path_in_mod)` pairs.
+        save_mode (str): The header configuration for all files. Defaults to "default".
+
+    Returns:
+        int: The number of files written.
+
+    Raises:
+        ValueError: If `save_mode` is unknown.
+        OSError: If a file can't be written.
+    """
+    header_bytes = _header_bytes(save_mode)
+    count = 0
+    for tobj_filepath, texture_path_in_mod in tobjs:
+        with open(tobj_filepath, 'wb') as f:
+            f.write(_pack_tobj(header_bytes, texture_path_in_mod))
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    # This section allows the script to be run directly from the command line
+    # for creating a single .tobj file, useful for testing or manual creation.
+    if len(sys.argv) < 3:
+        print("Usage: python tobj_writer.py <output_filename.tobj> <texture_path_in_mod> [save_mode]")
+        print(f"  save_mode can be: {', '.join(SAVE_MODES)} (optional, defaults to 'default')")
+        sys.exit(1)
+
+    output_file = Path(sys.argv[1])
+    texture_path_arg = sys.argv[2]
+    save_mode_arg = sys.argv[3] if len(sys.argv) > 3 else "default"
+
+    # Basic validation for save_mode argument
+    if save_mode_arg not in SAVE_MODES:
+        print(f"Error: Invalid save_mode '{save_mode_arg}'. Must be one of: {', '.join(SAVE_MODES)}.")
+        sys.exit(1)
+
+    try:
+        write_tobj(output_file, texture_path_arg, save_mode_arg)
+        print(f"Successfully wrote {output_file} for texture '{texture_path_arg}' with save mode '{save_mode_arg}'.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        sys.exit(1)
@@ -2,6 +2,7 @@ import tkinter as tk # GUI system
 from tkinter import ttk # Nicer-looking GUI elements
 from tkinter import messagebox # Showing popup windows for warnings and errors
 from tkinter import filedialog # Choosing save directory
+from tkinter import font as tkfont # Measuring vehicle names in the vehicle lists
 import webbrowser # Opening links in the web browser: forum thread, github page, mod links
 import sys # Determining OS, and quitting Paint Job Packer
 import configparser # Reading vehicle database files, version info and l10n dictionary
@@ -9,11 +10,11 @@ import os # Making folders and getting all vehicle database files
 import shutil # Copying files (checking write permission, all actual copying occurs in paintjob.py)
 import re # Checking for invalid characters in mod/paint job names
 import traceback # Handling unexpected errors
-import zipfile # Unzipping templates
 import urllib.request # Fetching version info from GitHub
 import locale # Determining the default system language
 import ssl # Opting out of verification when checking version - see check_new_version()
-import threading # Multi-threading the update checking process
+import threading # Multi-threading the update checking process and generating the paint job
+import queue # Passing progress from the generating thread to the GUI
 from datetime import date # Including date on submitted error reports
 try:
     import darkdetect # Detecting whether or not the system is in dark mode
@@ -22,6 +23,7 @@ except ModuleNotFoundError:
 
 try:
     import library.paintjob as pj # Copying and generating mod files
+    import library.pack # Generating the whole paint job, shared with packer_cli.py
     import library.analytics # Simple analytics using RudderStack, see analytics.py for a detailed breakdown
     import library.webhook as webhook # For notifying me of new crash reports
 except ModuleNotFoundError:
@@ -35,8 +37,8 @@ GITHUB_LINK = "https://github.com/Carsmaniac/paintjob-packer"
 KOFI_LINK = "https://ko-fi.com/carsmaniac"
 CROWDIN_LINK = "https://crowdin.com/project/paint-job-packer"
 MOD_LINK_PAGE_LINK = "https://github.com/Carsmaniac/paintjob-packer/blob/master/library/mod%20links.md"
-ETS_TEMPLATE_LINK = "https://forum.scssoft.com/viewtopic.php?f=33&t=272386"
-ATS_TEMPLATE_LINK = "https://forum.scssoft.com/viewtopic.php?f=199&t=288778"
+ETS_TEMPLATE_LINK = pj.ETS_TEMPLATE_LINK # Also used in the readme, so they're defined in paintjob.py
+ATS_TEMPLATE_LINK = pj.ATS_TEMPLATE_LINK
 VERSION_INFO_LINK = "https://raw.githubusercontent.com/Carsmaniac/paintjob-packer/master/library/version.ini"
 LATEST_VERSION_DOWNLOAD_LINK = "https://carsmani.ac/paint-job-packer#downloads"
 SUN_VALLEY_LINK = "https://github.com/rdbende/Sun-Valley-ttk-theme"
@@ -53,6 +55,9 @@ NEW_MOD_LINK_PAGE_LINK = "https://github.com/Carsmaniac/paint-job-packer/blob/ma
 NEW_VERSION_INFO_LINK = "https://raw.githubusercontent.com/Carsmaniac/paint-job-packer/main/library/version.ini"
 NEW_ANALYTICS_SCRIPT_LINK = "https://github.com/Carsmaniac/paint-job-packer/blob/main/library/analytics.py"
 
+PROGRESS_CHECK_INTERVAL = 50 # Milliseconds between checks for progress from the generating thread
+GENERATE_THREADS = library.pack.DEFAULT_JOBS # Threads generating vehicles at once, set to 1 to generate them one at a time
+
 # Set the path depending on how Paint Job Packer is bundled
 try:
     base_path = sys._MEIPASS # Packaged into executable
@@ -420,48 +425,39 @@ class PackerApp:
         self.trailer_mod_search_box.grid(row = 0, column = 1, sticky = "w", padx = 5, pady = (5, 0))
 
         # Scrollable lists in Vehicles Supported panel
+        self.selected_vehicles = set()
         self.scroll_canvas_trucks = tk.Canvas(self.tab_trucks, highlightthickness = 0)
         self.scroll_bar_trucks = ttk.Scrollbar(self.tab_trucks, orient = "vertical", command = self.scroll_canvas_trucks.yview)
-        self.scroll_frame_trucks = ttk.Frame(self.scroll_canvas_trucks)
-        self.scroll_frame_trucks.bind("<Configure>", lambda e: self.scroll_canvas_trucks.configure(scrollregion = self.scroll_canvas_trucks.bbox("all")))
-        self.scroll_canvas_trucks.create_window((0, 0), window = self.scroll_frame_trucks, anchor = "nw")
-        self.scroll_canvas_trucks.configure(yscrollcommand = self.scroll_bar_trucks.set)
+        self.check_list_trucks = VehicleCheckList(self.scroll_canvas_trucks, self.scroll_bar_trucks, False, self.selected_vehicles, self.vehicle_toggled)
+        self.scroll_frame_trucks = self.check_list_trucks.frame
         self.scroll_canvas_trucks.grid(row = 1, column = 0, columnspan = 2, pady = 5, sticky = "news")
         self.scroll_bar_trucks.grid(row = 0, rowspan = 2, column = 1, pady = 5, sticky = "nes")
 
         self.scroll_canvas_trailers = tk.Canvas(self.tab_trailers, highlightthickness = 0)
         self.scroll_bar_trailers = ttk.Scrollbar(self.tab_trailers, orient = "vertical", command = self.scroll_canvas_trailers.yview)
-        self.scroll_frame_trailers = ttk.Frame(self.scroll_canvas_trailers)
-        self.scroll_frame_trailers.bind("<Configure>", lambda e: self.scroll_canvas_trailers.configure(scrollregion = self.scroll_canvas_trailers.bbox("all")))
-        self.scroll_canvas_trailers.create_window((0, 0), window = self.scroll_frame_trailers, anchor = "nw")
-        self.scroll_canvas_trailers.configure(yscrollcommand = self.scroll_bar_trailers.set)
+        self.check_list_trailers = VehicleCheckList(self.scroll_canvas_trailers, self.scroll_bar_trailers, False, self.selected_vehicles, self.vehicle_toggled)
+        self.scroll_frame_trailers = self.check_list_trailers.frame
         self.scroll_canvas_trailers.grid(row = 1, column = 0, columnspan = 2, pady = 5, sticky = "nws")
         self.scroll_bar_trailers.grid(row = 0, rowspan = 2, column = 1, pady = 5, sticky = "nes")
 
         self.scroll_canvas_truck_mods = tk.Canvas(self.tab_truck_mods, highlightthickness = 0)
         self.scroll_bar_truck_mods = ttk.Scrollbar(self.tab_truck_mods, orient = "vertical", command = self.scroll_canvas_truck_mods.yview)
-        self.scroll_frame_truck_mods = ttk.Frame(self.scroll_canvas_truck_mods)
-        self.scroll_frame_truck_mods.bind("<Configure>", lambda e: self.scroll_canvas_truck_mods.configure(scrollregion = self.scroll_canvas_truck_mods.bbox("all")))
-        self.scroll_canvas_truck_mods.create_window((0, 0), window = self.scroll_frame_truck_mods, anchor = "nw")
-        self.scroll_canvas_truck_mods.configure(yscrollcommand = self.scroll_bar_truck_mods.set)
+        self.check_list_truck_mods = VehicleCheckList(self.scroll_canvas_truck_mods, self.scroll_bar_truck_mods, True, self.selected_vehicles, self.vehicle_toggled)
+        self.scroll_frame_truck_mods = self.check_list_truck_mods.frame
         self.scroll_canvas_truck_mods.grid(row = 1, column = 0, columnspan = 2, pady = 5, sticky = "nws")
         self.scroll_bar_truck_mods.grid(row = 0, rowspan = 3, column = 1, pady = 5, sticky = "nes")
 
         self.scroll_canvas_bus_mods = tk.Canvas(self.tab_bus_mods, highlightthickness = 0)
         self.scroll_bar_bus_mods = ttk.Scrollbar(self.tab_bus_mods, orient = "vertical", command = self.scroll_canvas_bus_mods.yview)
-        self.scroll_frame_bus_mods = ttk.Frame(self.scroll_canvas_bus_mods)
-        self.scroll_frame_bus_mods.bind("<Configure>", lambda e: self.scroll_canvas_bus_mods.configure(scrollregion = self.scroll_canvas_bus_mods.bbox("all")))
-        self.scroll_canvas_bus_mods.create_window((0, 0), window = self.scroll_frame_bus_mods, anchor = "nw")
-        self.scroll_canvas_bus_mods.configure(yscrollcommand = self.scroll_bar_bus_mods.set)
+        self.check_list_bus_mods = VehicleCheckList(self.scroll_canvas_bus_mods, self.scroll_bar_bus_mods, True, self.selected_vehicles, self.vehicle_toggled)
+        self.scroll_frame_bus_mods = self.check_list_bus_mods.frame
         self.scroll_canvas_bus_mods.grid(row = 1, column = 0, columnspan = 2, pady = 5, sticky = "nws")
         self.scroll_bar_bus_mods.grid(row = 0, rowspan = 3, column = 1, pady = 5, sticky = "nes")
 
         self.scroll_canvas_trailer_mods = tk.Canvas(self.tab_trailer_mods, highlightthickness = 0)
         self.scroll_bar_trailer_mods = ttk.Scrollbar(self.tab_trailer_mods, orient = "vertical", command = self.scroll_canvas_trailer_mods.yview)
-        self.scroll_frame_trailer_mods = ttk.Frame(self.scroll_canvas_trailer_mods)
-        self.scroll_frame_trailer_mods.bind("<Configure>", lambda e: self.scroll_canvas_trailer_mods.configure(scrollregion = self.scroll_canvas_trailer_mods.bbox("all")))
-        self.scroll_canvas_trailer_mods.create_window((0, 0), window = self.scroll_frame_trailer_mods, anchor = "nw")
-        self.scroll_canvas_trailer_mods.configure(yscrollcommand = self.scroll_bar_trailer_mods.set)
+        self.check_list_trailer_mods = VehicleCheckList(self.scroll_canvas_trailer_mods, self.scroll_bar_trailer_mods, True, self.selected_vehicles, self.vehicle_toggled)
+        self.scroll_frame_trailer_mods = self.check_list_trailer_mods.frame
         self.scroll_canvas_trailer_mods.grid(row = 1, column = 0, columnspan = 2, pady = 5, sticky = "nws")
         self.scroll_bar_trailer_mods.grid(row = 0, rowspan = 3, column = 1, pady = 5, sticky = "nes")
 
@@ -828,8 +824,8 @@ class PackerApp:
         self.main_screen.grid_forget()
         self.setup_screen.grid(row = 0, column = 0, padx = 10, pady = 10)
 
-        for veh in self.truck_list + self.truck_mod_list + self.bus_mod_list + self.trailer_list + self.trailer_mod_list:
-            veh.check.grid_forget()
+        for check_list in [self.check_list_trucks, self.check_list_truck_mods, self.check_list_bus_mods, self.check_list_trailers, self.check_list_trailer_mods]:
+            check_list.show([])
 
         self.panel_pack_link_truck.grid_forget() # Just in case it changes location
         self.panel_pack_link_bus.grid_forget()
@@ -896,33 +892,17 @@ class PackerApp:
         self.panel_pack_selector.select(0)
 
     def update_vehicle_checkboxes(self, *args):
-        for veh in self.truck_list + self.truck_mod_list + self.bus_mod_list + self.trailer_list + self.trailer_mod_list:
-            try:
-                veh.check.grid_forget()
-            except Exception:
-                print("whoops")
-
         truck_search_term = self.truck_search_variable.get().lower()
         truck_mod_search_term = self.truck_mod_search_variable.get().lower()
         bus_mod_search_term = self.bus_mod_search_variable.get().lower()
         trailer_search_term = self.trailer_search_variable.get().lower()
         trailer_mod_search_term = self.trailer_mod_search_variable.get().lower()
 
-        for i in range(len(self.truck_list)):
-            if truck_search_term in self.truck_list[i].name.lower():
-                self.truck_list[i].check.grid(row = i + 1, column = 0, columnspan = 2, sticky = "w", padx = 5)
-        for i in range(len(self.truck_mod_list)):
-            if truck_mod_search_term in self.truck_mod_list[i].name.lower() or truck_mod_search_term in self.truck_mod_list[i].mod_author.lower():
-                self.truck_mod_list[i].check.grid(row = i + 1, column = 0, columnspan = 2, sticky = "w", padx = 5)
-        for i in range(len(self.bus_mod_list)):
-            if bus_mod_search_term in self.bus_mod_list[i].name.lower() or bus_mod_search_term in self.bus_mod_list[i].mod_author.lower():
-                self.bus_mod_list[i].check.grid(row = i + 1, column = 0, columnspan = 2, sticky = "w", padx = 5)
-        for i in range(len(self.trailer_list)):
-            if trailer_search_term in self.trailer_list[i].name.lower():
-                self.trailer_list[i].check.grid(row = i + 1, column = 0, columnspan = 2, sticky = "w", padx = 5)
-        for i in range(len(self.trailer_mod_list)):
-            if trailer_mod_search_term in self.trailer_mod_list[i].name.lower() or trailer_mod_search_term in self.trailer_mod_list[i].mod_author.lower():
-                self.trailer_mod_list[i].check.grid(row = i + 1, column = 0, columnspan = 2, sticky = "w", padx = 5)
+        self.check_list_trucks.show([veh for veh in self.truck_list if truck_search_term in veh.name.lower()])
+        self.check_list_truck_mods.show([veh for veh in self.truck_mod_list if truck_mod_search_term in veh.name.lower() or truck_mod_search_term in veh.mod_author.lower()])
+        self.check_list_bus_mods.show([veh for veh in self.bus_mod_list if bus_mod_search_term in veh.name.lower() or bus_mod_search_term in veh.mod_author.lower()])
+        self.check_list_trailers.show([veh for veh in self.trailer_list if trailer_search_term in veh.name.lower()])
+        self.check_list_trailer_mods.show([veh for veh in self.trailer_mod_list if trailer_mod_search_term in veh.name.lower() or trailer_mod_search_term in veh.mod_author.lower()])
 
     def toggle_unlock_level(self):
         if self.panel_ingame_default_variable.get():
@@ -977,22 +957,24 @@ class PackerApp:
     def check_for_outdated_vehicles(self, game):
         outdated_vehicles = []
         try:
-            for file_name in os.listdir("library/vehicles/{}".format(game)):
-                veh_ini = configparser.ConfigParser(allow_no_value = True)
-                veh_ini.read("library/vehicles/{}/{}".format(game, file_name), encoding="utf-8")
-                if "mod link workshop" not in veh_ini.options("vehicle info"): # 1.7
+            vehicle_index = pj.load_vehicle_index(game, refresh = True) # The game was loaded or switched, so pick up any changed vehicle files
+            for file_name in vehicle_index:
+                veh_info = vehicle_index[file_name]["sections"]["vehicle info"]
+                if "mod link workshop" not in veh_info: # 1.7
                     outdated_vehicles.append(file_name)
-                if "bus mod" not in veh_ini.options("vehicle info"): # 1.8
+                if "bus mod" not in veh_info: # 1.8
                     outdated_vehicles.append(file_name)
             for file_name in outdated_vehicles:
                 os.remove("library/vehicles/{}/{}".format(game, file_name))
+            if len(outdated_vehicles) > 0:
+                pj.load_vehicle_index(game, refresh = True)
         except PermissionError:
             messagebox.showerror(title = ("Can't access intall folder"), message = ("Paint Job Packer has found an old file it needs to delete, but it doesn't have permission to access its install directory, so it's likely about to crash. If it does, please let me know on the SCS Forums thread, and I can walk you through the solution.\n\nYou should probably never see this message, but if you do, I'm sorry!"))
 
     def load_list_of_vehicles(self, game):
         l = self.get_localised_string
         complete_list = []
-        for file_name in os.listdir("library/vehicles/{}".format(game)):
+        for file_name in pj.load_vehicle_index(game):
             complete_list.append(VehSelection(game, file_name))
         truck_list = []
         truck_mod_list = []
@@ -1002,32 +984,32 @@ class PackerApp:
         for veh in complete_list:
             if veh.trailer:
                 if veh.mod:
-                    veh.check = ttk.Checkbutton(self.scroll_frame_trailer_mods, text = "{} ({})".format(veh.display_name, veh.display_author), command = lambda : self.update_total_vehicles_supported())
-                    veh.check.state(["!alternate","!selected"])
                     trailer_mod_list.append(veh)
                 else:
-                    veh.check = ttk.Checkbutton(self.scroll_frame_trailers, text = veh.display_name, command = lambda : self.update_total_vehicles_supported())
-                    veh.check.state(["!alternate","!selected"])
                     trailer_list.append(veh)
             else:
                 if veh.mod:
                     if veh.bus_mod:
-                        veh.check = ttk.Checkbutton(self.scroll_frame_bus_mods, text = "{} ({})".format(veh.display_name, veh.display_author), command = lambda : self.update_total_vehicles_supported())
-                        veh.check.state(["!alternate","!selected"])
                         bus_mod_list.append(veh)
                     else:
-                        veh.check = ttk.Checkbutton(self.scroll_frame_truck_mods, text = "{} ({})".format(veh.display_name, veh.display_author), command = lambda : self.update_total_vehicles_supported())
-                        veh.check.state(["!alternate","!selected"])
                         truck_mod_list.append(veh)
                 else:
-                    veh.check = ttk.Checkbutton(self.scroll_frame_trucks, text = veh.display_name, command = lambda : self.update_total_vehicles_supported())
-                    veh.check.state(["!alternate","!selected"])
                     truck_list.append(veh)
         truck_list.sort(key = lambda veh: veh.name.lower())
         trailer_list.sort(key = lambda veh: veh.name.lower())
         truck_mod_list.sort(key = lambda veh: veh.name.lower())
         bus_mod_list.sort(key = lambda veh: veh.name.lower())
         trailer_mod_list.sort(key = lambda veh: veh.name.lower())
+        # A new list of vehicles starts with nothing selected
+        self.selected_vehicles.clear()
+        self.total_trucks = 0
+        self.total_trailers = 0
+        self.total_buses = 0
+        self.check_list_trucks.set_vehicles(truck_list)
+        self.check_list_truck_mods.set_vehicles(truck_mod_list)
+        self.check_list_bus_mods.set_vehicles(bus_mod_list)
+        self.check_list_trailers.set_vehicles(trailer_list)
+        self.check_list_trailer_mods.set_vehicles(trailer_mod_list)
         return (truck_list, truck_mod_list, bus_mod_list, trailer_list, trailer_mod_list)
 
     def change_displayed_vehicle_dropdown(self, *args):
@@ -1052,20 +1034,22 @@ class PackerApp:
         else:
             self.panel_single_link.grid_forget()
 
+    def vehicle_toggled(self, veh, selected):
+        # Keeps a running count of selected vehicles, rather than checking every vehicle each time
+        if selected:
+            change = 1
+        else:
+            change = -1
+        if veh.trailer:
+            self.total_trailers += change
+        elif veh.bus_mod:
+            self.total_buses += change
+        else:
+            self.total_trucks += change
+        self.update_total_vehicles_supported()
+
     def update_total_vehicles_supported(self):
         l = self.get_localised_string
-        self.total_trucks = 0
-        self.total_trailers = 0
-        self.total_buses = 0
-        for veh in self.truck_list + self.truck_mod_list:
-            if "selected" in veh.check.state():
-                self.total_trucks += 1
-        for veh in self.trailer_list + self.trailer_mod_list:
-            if "selected" in veh.check.state():
-                self.total_trailers += 1
-        for veh in self.bus_mod_list:
-            if "selected" in veh.check.state():
-                self.total_buses += 1
         self.total_vehicles = self.total_trucks + self.total_trailers + self.total_buses
         self.panel_vehicles_pack.configure(text = l("{VehiclesPanelNamePack}").format(number = self.total_vehicles))
         if self.tab_game_variable.get() == "ets":
@@ -1198,7 +1182,7 @@ class PackerApp:
         # Check for incompatible vehicles
         veh_path_dict = {}
         for veh in self.truck_list + self.truck_mod_list + self.bus_mod_list + self.trailer_list + self.trailer_mod_list:
-            if "selected" in veh.check.state():
+            if veh in self.selected_vehicles:
                 if not veh.vehicle_path in veh_path_dict:
                     veh_path_dict[veh.vehicle_path] = []
                 veh_path_dict[veh.vehicle_path].append("{} ({})".format(veh.display_name, veh.display_author))
@@ -1213,7 +1197,7 @@ class PackerApp:
             warning_vehicles = []
             if self.tab_paintjob_variable.get() == "pack":
                 for veh in self.bus_mod_list:
-                    if "selected" in veh.check.state() and veh.bus_door_workaround:
+                    if veh in self.selected_vehicles and veh.bus_door_workaround:
                         warning_vehicles.append("{} ({})".format(veh.display_name, veh.display_author))
             elif self.tab_paintjob_variable.get() == "single":
                 for veh in self.bus_mod_list:
@@ -1230,7 +1214,7 @@ class PackerApp:
             templates_present = False
             if self.tab_paintjob_variable.get() == "pack":
                 for veh in self.truck_list + self.truck_mod_list + self.bus_mod_list + self.trailer_list + self.trailer_mod_list:
-                    if "selected" in veh.check.state():
+                    if veh in self.selected_vehicles:
                         if os.path.exists("templates/{} templates/{} [{}].zip".format(self.tab_game_variable.get(), veh.vehicle_path, veh.mod_author)):
                             templates_present = True
             elif self.tab_paintjob_variable.get() == "single":
@@ -1287,425 +1271,177 @@ class PackerApp:
                 self.panel_gen_buttons_generate.state(["disabled"])
                 try:
                     self.make_paintjob(output_path)
-                except PermissionError:
-                    # Caused for some reason by copying the mod manager image
-                    try:
-                        shutil.rmtree(output_path)
-                    except:
-                        print("Could not delete output folder, some files may remain")
-                    messagebox.showerror(title = l("{ErrorFolderAccessTitle}"), message = l("{ErrorFolderAccess1}\n\n{ErrorFolderAccess2}"))
-                    # Reset everything on the generating screen
-                    self.panel_gen_buttons_generate.state(["!disabled"])
-                    self.progress_value.set(0.0)
-                    self.panel_progress_category_variable.set(l("{ProgressReady}"))
-                    self.panel_progress_specific_variable.set(l("{ProgressAppearHere}"))
-                    self.panel_progress_specific_label.update() # All these update()s ensure the progress bar is updated in real time
-                except PathTooLongError:
-                    try:
-                        shutil.rmtree(output_path)
-                    except:
-                        print("Could not delete output folder, some files may remain")
-                    messagebox.showerror(title = l("{ErrorLongPathTitle}"), message = l("{ErrorLongPath1}\n\n{ErrorLongPath2}\n\n{ErrorLongPath3}"))
-                    # Reset everything on the generating screen
-                    self.panel_gen_buttons_generate.state(["!disabled"])
-                    self.progress_value.set(0.0)
-                    self.panel_progress_category_variable.set(l("{ProgressReady}"))
-                    self.panel_progress_specific_variable.set(l("{ProgressAppearHere}"))
-                    self.panel_progress_specific_label.update()
-                    self.ask_save_location()
-                except OSError as e:
-                    if e.errno == 23:
-                        # Not enough drive space
-                        try:
-                            shutil.rmtree(output_path)
-                        except:
-                            print("Could not delete output folder, some files may remain")
-                        messagebox.showerror(title = l("{ErrorNoSpaceTitle}"), message = l("{ErrorNoSpace1}\n\n{ErrorNoSpace2}"))
-                        # Reset everything on the generating screen
-                        self.panel_gen_buttons_generate.state(["!disabled"])
-                        self.progress_value.set(0.0)
-                        self.panel_progress_category_variable.set(l("{ProgressReady}"))
-                        self.panel_progress_specific_variable.set(l("{ProgressAppearHere}"))
-                        self.panel_progress_specific_label.update()
-                        self.ask_save_location()
-                    else:
-                        pass # I don't know what this crash is, leave it to the uncaught exception handler
+                except Exception as e:
+                    self.handle_generation_error(e, output_path)
+
+    def handle_generation_error(self, error, output_path):
+        # Called for errors while preparing to generate, and for errors reported by the generating thread
+        l = self.get_localised_string
+        if isinstance(error, PermissionError):
+            # Caused for some reason by copying the mod manager image
+            try:
+                shutil.rmtree(output_path)
+            except:
+                print("Could not delete output folder, some files may remain")
+            messagebox.showerror(title = l("{ErrorFolderAccessTitle}"), message = l("{ErrorFolderAccess1}\n\n{ErrorFolderAccess2}"))
+            self.reset_generate_screen()
+        elif isinstance(error, PathTooLongError):
+            try:
+                shutil.rmtree(output_path)
+            except:
+                print("Could not delete output folder, some files may remain")
+            messagebox.showerror(title = l("{ErrorLongPathTitle}"), message = l("{ErrorLongPath1}\n\n{ErrorLongPath2}\n\n{ErrorLongPath3}"))
+            self.reset_generate_screen()
+            self.ask_save_location()
+        elif isinstance(error, OSError) and error.errno == 23:
+            # Not enough drive space
+            try:
+                shutil.rmtree(output_path)
+            except:
+                print("Could not delete output folder, some files may remain")
+            messagebox.showerror(title = l("{ErrorNoSpaceTitle}"), message = l("{ErrorNoSpace1}\n\n{ErrorNoSpace2}"))
+            self.reset_generate_screen()
+            self.ask_save_location()
+        elif isinstance(error, OSError):
+            pass # I don't know what this crash is, leave it to the uncaught exception handler
+        else:
+            raise error
+
+    def reset_generate_screen(self): # Reset everything on the generating screen
+        l = self.get_localised_string
+        self.panel_gen_buttons_generate.state(["!disabled"])
+        self.progress_value.set(0.0)
+        self.panel_progress_category_variable.set(l("{ProgressReady}"))
+        self.panel_progress_specific_variable.set(l("{ProgressAppearHere}"))
 
 
 
     def make_paintjob(self, output_path):
         try:
             l = self.get_localised_string
-            truck_list = []
-            for veh in self.truck_list:
-                if "selected" in veh.check.state():
-                    truck_list.append(veh)
-            truck_mod_list = []
-            for veh in self.truck_mod_list:
-                if "selected" in veh.check.state():
-                    truck_mod_list.append(veh)
-            bus_mod_list = []
-            for veh in self.bus_mod_list:
-                if "selected" in veh.check.state():
-                    bus_mod_list.append(veh)
-            trailer_list = []
-            for veh in self.trailer_list:
-                if "selected" in veh.check.state():
-                    trailer_list.append(veh)
-            trailer_mod_list = []
-            for veh in self.trailer_mod_list:
-                if "selected" in veh.check.state():
-                    trailer_mod_list.append(veh)
-
-            vehicle_list = []
-            for veh in truck_list + truck_mod_list + bus_mod_list + trailer_list + trailer_mod_list:
-                vehicle_list.append(pj.Vehicle(veh.file_name, self.tab_game_variable.get()))
-
-            single_veh_full_name = self.panel_single_vehicle_variable.get()
-            single_veh_name = single_veh_full_name.split("[")[0].rstrip()
-            if "[" in single_veh_full_name:
-                single_veh_author = single_veh_full_name.split("[")[1][:-1]
+            num_of_paintjobs = self.tab_paintjob_variable.get()
+            if num_of_paintjobs == "single":
+                single_veh_full_name = self.panel_single_vehicle_variable.get()
+                single_veh_name = single_veh_full_name.split("[")[0].rstrip()
+                if "[" in single_veh_full_name:
+                    single_veh_author = single_veh_full_name.split("[")[1][:-1]
+                else:
+                    single_veh_author = "SCS"
+                vehicle_files = []
+                for veh in self.truck_list + self.truck_mod_list + self.bus_mod_list + self.trailer_list + self.trailer_mod_list:
+                    if veh.display_name == single_veh_name and veh.display_author == single_veh_author:
+                        vehicle_files.append(veh.file_name)
             else:
-                single_veh_author = "SCS"
-            for veh in self.truck_list + self.truck_mod_list + self.bus_mod_list + self.trailer_list + self.trailer_mod_list:
-                if veh.display_name == single_veh_name and veh.display_author == single_veh_author:
-                    single_veh = pj.Vehicle(veh.file_name, self.tab_game_variable.get())
-
-            game = self.tab_game_variable.get()
-
-            mod_name = self.panel_mod_name_variable.get()
-            mod_version = self.panel_mod_version_variable.get()
-            mod_author = self.panel_mod_author_variable.get()
+                vehicle_files = []
+                for veh in self.truck_list + self.truck_mod_list + self.bus_mod_list + self.trailer_list + self.trailer_mod_list:
+                    if veh in self.selected_vehicles:
+                        vehicle_files.append(veh.file_name)
 
-            ingame_name = self.panel_ingame_name_variable.get()
-            ingame_price = self.panel_ingame_price_variable.get()
             if self.panel_ingame_default_variable.get():
                 unlock_level = 0
             else:
                 unlock_level = self.panel_ingame_unlock_variable.get()
 
-            internal_name = self.panel_internal_name_variable.get()
-            num_of_paintjobs = self.tab_paintjob_variable.get()
-            workshop_upload = self.panel_generating_workshop_variable.get()
-
             # Convert variables to English for behind-the-scenes, to make things smoother
             if self.panel_internal_supported_variable.get() == l("{InternalSupportedLargest}"):
-                cabins_supported = "Largest cabin only"
+                cabins_supported = "largest"
             else:
-                cabins_supported = "All cabins"
+                cabins_supported = "all"
             if self.panel_internal_handling_variable.get() == l("{InternalHandlingCombined}"):
-                cabin_handling = "Combined paint job"
+                cabin_handling = "combined"
             else:
-                cabin_handling = "Separate paint jobs"
-
-            if cabins_supported == "Largest cabin only":
-                # This shouldn't be needed, but it might be, so I'm doing it for safe measure
-                cabin_handling = "Combined paint job"
+                cabin_handling = "separate"
+
+            # Everything the GUI knows about the paint job, in the same form as packer_cli.py's spec files
+            spec = library.pack.PackSpec({
+                "game": self.tab_game_variable.get(),
+                "mod_name": self.panel_mod_name_variable.get(),
+                "mod_version": self.panel_mod_version_variable.get(),
+                "mod_author": self.panel_mod_author_variable.get(),
+                "ingame_name": self.panel_ingame_name_variable.get(),
+                "ingame_price": self.panel_ingame_price_variable.get(),
+                "unlock_level": unlock_level,
+                "internal_name": self.panel_internal_name_variable.get(),
+                "vehicles": vehicle_files,
+                "paint_jobs": num_of_paintjobs,
+                "cabins_supported": cabins_supported,
+                "cabin_handling": cabin_handling,
+                "placeholder_templates": self.panel_generating_templates_variable.get(),
+                "workshop_upload": self.panel_generating_workshop_variable.get(),
+            })
 
-            placeholder_templates = self.panel_generating_templates_variable.get()
-
-            out_path = output_path+"/"+mod_name
+            self.progress_value.set(0.0)
+            things_to_load = len(spec.vehicle_list) + 2 # + general files, complete
+            if spec.workshop_upload:
+                things_to_load += 1 # Workshop image and description
+            self.panel_progress_bar.configure(maximum = float(things_to_load))
 
-            if num_of_paintjobs == "single":
-                if single_veh.trailer:
-                    if single_veh.mod:
-                        trailer_mod_list.append(single_veh)
-                    else:
-                        trailer_list.append(single_veh)
-                else:
-                    if single_veh.mod:
-                        if single_veh.bus_mod:
-                            bus_mod_list.append(single_veh)
-                        else:
-                            truck_mod_list.append(single_veh)
-                    else:
-                        truck_list.append(single_veh)
-                vehicle_list.append(single_veh)
+            # The files are generated on a background thread, which reports its progress through a queue that is checked
+            # from the Tk event loop, so the window stays responsive without forcing it to redraw after every file
+            self.progress_queue = queue.Queue()
+            generate_thread = threading.Thread(target = self.generate_paintjob_files, args = (spec, output_path), daemon = True)
+            generate_thread.start()
+            self.container.after(PROGRESS_CHECK_INTERVAL, self.check_progress_queue, output_path)
+        except FileNotFoundError:
+            # If a FileNotFoundError is raised at this point, it is most likely because the path is too long
+            # There may be some edge cases where it's caused by a missing library file or some other bizarre error
+            raise PathTooLongError
 
+    def generate_paintjob_files(self, spec, output_path):
+        # Runs on a background thread, so it mustn't touch any Tk widgets or variables, only self.progress_queue
+        # Progress is reported as (kind, text) events: "step" moves the progress bar on and names the current category,
+        # "detail" names the current file, and "done" or "error" (with the exception) ends generation
+        l = self.get_localised_string
+        report = self.progress_queue.put
+        try:
             if not os.path.exists("library/paint-job-tracker.txt"):
                 print("Sending data to RudderStack...")
                 code_ini = configparser.ConfigParser()
                 code_ini.read("library/vehicles/vehicle-codes.ini", encoding="UTF-8")
                 vehicle_codes = []
-                for veh in vehicle_list:
+                for veh in spec.vehicle_list:
                     try:
-                        vehicle_codes.append(code_ini[game]["{} [{}]".format(veh.path, veh.mod_author)])
+                        vehicle_codes.append(code_ini[spec.game]["{} [{}]".format(veh.path, veh.mod_author)])
                     except KeyError:
                         vehicle_codes.append("0000")
                 multi_thread_analytics = threading.Thread(target = library.analytics.send_analytics(",".join(vehicle_codes)))
                 multi_thread_analytics.start()
 
-            if not os.path.exists(out_path):
-                os.makedirs(out_path)
+            library.pack.build_pack(spec, output_path, lambda kind, text: report((kind, text)), GENERATE_THREADS)
 
-            if workshop_upload:
-                if not os.path.exists(output_path+"/Workshop uploading"):
-                    os.makedirs(output_path+"/Workshop uploading")
+            report(("step", l("{ProgressFinishing}")))
+            report(("detail", l("{ProgressSeconds}")))
 
-            self.progress_value.set(0.0)
-            things_to_load = len(vehicle_list) + 2 # + general files, complete
-            if workshop_upload:
-                things_to_load += 1 # Workshop image and description
-            self.panel_progress_bar.configure(maximum = float(things_to_load))
+            if os.path.exists("library/paint-job-tracker.txt") and spec.num_of_paintjobs != "single" and spec.mod_name != "123":
+                self.generate_paintjob_tracker_file(spec.game, spec.truck_list, spec.truck_mod_list, spec.bus_mod_list, spec.trailer_list, spec.trailer_mod_list, spec.mod_name)
 
-            self.progress_value.set(self.progress_value.get()+1.0)
-            self.panel_progress_category_variable.set("General mod files")
-
-            self.panel_progress_specific_variable.set("Mod manifest")
-            self.panel_progress_specific_label.update() # All these update()s ensure the progress bar is updated in real time
-            pj.make_manifest_sii(out_path, mod_version, mod_name, mod_author, workshop_upload)
-
-            self.panel_progress_specific_variable.set("Mod manager image")
-            self.panel_progress_specific_label.update()
-            pj.copy_mod_manager_image(out_path)
-
-            self.panel_progress_specific_variable.set("Mod manager description")
-            self.panel_progress_specific_label.update()
-            pj.make_description(out_path, truck_list, truck_mod_list, bus_mod_list, trailer_list, trailer_mod_list, num_of_paintjobs)
-
-            pj.make_material_folder(out_path)
-
-            self.panel_progress_specific_variable.set("Paint job icon")
-            self.panel_progress_specific_label.update()
-            pj.copy_paintjob_icon(out_path, ingame_name)
-
-            pj.make_paintjob_icon_tobj(out_path, ingame_name)
-
-            pj.make_paintjob_icon_mat(out_path, internal_name, ingame_name)
-
-            for veh in vehicle_list:
-                self.progress_value.set(self.progress_value.get()+1.0)
-                self.panel_progress_category_variable.set(veh.display_name)
-
-                if placeholder_templates:
-                    if os.path.exists("templates/{} templates/{} [{}].zip".format(game, veh.path, veh.mod_author)):
-                        template_zip = zipfile.ZipFile("templates/{} templates/{} [{}].zip".format(game, veh.path, veh.mod_author))
-                    else:
-                        template_zip = None
-                else:
-                    template_zip = None
-
-                pj.make_def_folder(out_path, veh)
-                self.panel_progress_specific_variable.set("Paint job settings")
-                self.panel_progress_specific_label.update()
-                pj.make_settings_sui(out_path, veh, internal_name, ingame_name, ingame_price, unlock_level)
-                pj.make_vehicle_folder(out_path, veh, ingame_name)
-                if cabin_handling == "Combined paint job" or veh.type == "trailer_owned" or not veh.separate_paintjobs:
-                    one_paintjob = True
-                    paintjob_name = internal_name
-                    if veh.uses_accessories:
-                        if veh.type == "trailer_owned":
-                            if veh.name in veh.acc_dict:
-                                main_dds_name = veh.name
-                                veh.acc_dict.pop(veh.name)
-                            else:
-                                main_dds_name = "Base Colour"
-                        elif veh.type == "truck":
-                            main_dds_name = "Cabin"
-                    else:
-                        main_dds_name = veh.name
-                    self.panel_progress_specific_variable.set(main_dds_name)
-                    self.panel_progress_specific_label.update()
-                    if veh.alt_uvset:
-                        main_dds_name = main_dds_name + " (alt uvset)"
-                    if veh.type == "truck" and cabins_supported == "Largest cabin only" and veh.separate_paintjobs:
-                        one_paintjob = False
-                        for cab_size in veh.cabins:
-                            if cab_size == "a":
-                                cab_internal_name = veh.cabins[cab_size][1]
-                                if "/" in cab_internal_name:
-                                    cab_internal_name = cab_internal_name.split("/") # For when multiple cabins can use the same template, e.g. Western Star 49X
-                                pj.make_def_sii(out_path, veh, paintjob_name, internal_name, one_paintjob, ingame_name, main_dds_name, cab_internal_name)
-                    else:
-                        pj.make_def_sii(out_path, veh, paintjob_name, internal_name, one_paintjob, ingame_name, main_dds_name)
-                    pj.copy_main_dds(out_path, veh, ingame_name, main_dds_name, template_zip)
-                    pj.make_main_tobj(out_path, veh, ingame_name, main_dds_name)
-                    if veh.uses_accessories:
-                        pj.make_accessory_sii(out_path, veh, ingame_name, paintjob_name)
-                else:
-                    for cab_size in veh.cabins:
-                        if cabins_supported == "Largest cabin only" and cab_size != "a":
-                            pass
-                        else:
-                            one_paintjob = False
-                            paintjob_name = internal_name + "_" + cab_size
-                            main_dds_name = veh.cabins[cab_size][0] # Cabin in-game name
-                            self.panel_progress_specific_variable.set(main_dds_name)
-                            self.panel_progress_specific_label.update()
-                            if veh.alt_uvset:
-                                main_dds_name = main_dds_name[:-1] + ", alt uvset)" # Inserts "alt uvset" into the brackets in the cabin name
-                            cab_internal_name = veh.cabins[cab_size][1]
-                            if "/" in cab_internal_name:
-                                cab_internal_name = cab_internal_name.split("/") # For when multiple cabins can use the same template, e.g. Western Star 49X
-                            pj.make_def_sii(out_path, veh, paintjob_name, internal_name, one_paintjob, ingame_name, main_dds_name, cab_internal_name)
-                            pj.copy_main_dds(out_path, veh, ingame_name, main_dds_name, template_zip)
-                            pj.make_main_tobj(out_path, veh, ingame_name, main_dds_name)
-                            if veh.uses_accessories:
-                                pj.make_accessory_sii(out_path, veh, ingame_name, paintjob_name)
-                if veh.uses_accessories:
-                    self.panel_progress_specific_variable.set("Accessories")
-                    self.panel_progress_specific_label.update()
-                    pj.copy_accessory_dds(out_path, veh, ingame_name, game, template_zip)
-                    pj.make_accessory_tobj(out_path, veh, ingame_name)
-
-                if template_zip != None:
-                    template_zip.close()
-
-            if workshop_upload:
-                self.progress_value.set(self.progress_value.get()+1.0)
-                self.panel_progress_category_variable.set("Workshop files")
-                self.panel_progress_specific_label.update()
-                pj.copy_versions_sii(output_path+"/Workshop uploading")
-                self.panel_progress_specific_variable.set("Workshop image")
-                self.panel_progress_specific_label.update()
-                pj.copy_workshop_image(output_path)
-                self.panel_progress_specific_variable.set("Workshop readme")
-                self.panel_progress_specific_label.update()
-                self.make_workshop_readme(output_path, truck_list, truck_mod_list, bus_mod_list, trailer_list, trailer_mod_list, num_of_paintjobs, cabins_supported)
-
-            self.make_readme_file(output_path, ingame_name, game, mod_name, truck_list+truck_mod_list, bus_mod_list, trailer_list+trailer_mod_list)
-
-            self.progress_value.set(self.progress_value.get()+1.0)
-            self.panel_progress_category_variable.set(l("{ProgressFinishing}"))
-            self.panel_progress_specific_variable.set(l("{ProgressSeconds}"))
-            self.panel_progress_specific_label.update()
-
-            if os.path.exists("library/paint-job-tracker.txt") and num_of_paintjobs != "single" and mod_name != "123":
-                self.generate_paintjob_tracker_file(game, truck_list, truck_mod_list, bus_mod_list, trailer_list, trailer_mod_list, mod_name)
-
-            exit_now = messagebox.showinfo(title = l("{ProgressCompleteTitle}"), message = l("{ProgressComplete1}\n\n{ProgressComplete2}\n\n{ProgressComplete3}").format(folder_name = "Paint Job Packer Output"))
-            sys.exit()
+            report(("done", None))
         except FileNotFoundError:
             # If a FileNotFoundError is raised at this point, it is most likely because the path is too long
             # There may be some edge cases where it's caused by a missing library file or some other bizarre error
-            raise PathTooLongError
-
-    def make_readme_file(self, output_path, paintjob_name, game, mod_name, truck_list, bus_list, trailer_list):
-        file = open(output_path+"/How to complete your mod.txt", "w", encoding="utf-8")
-        file.write("Your mod has been generated and placed inside the \"{}\" folder.\n".format(mod_name))
-        file.write("There are a few steps left to finish it off. You'll need to replace the files listed in this document.\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("To test your mod as you make it, move the \"{}\" folder to your game's mod folder:\n".format(mod_name))
-        if game == "ets":
-            game_name = "Euro Truck Simulator 2"
-        elif game == "ats":
-            game_name = "American Truck Simulator"
-        if sys.platform.startswith("win"):
-            mod_folder_location = "C:\\Users\\(username)\\Documents\\{}\\mod\n".format(game_name)
-        elif sys.platform.startswith("darwin"):
-            mod_folder_location = "/Users/(username)/Library/Application Support/{}/mod\n".format(game_name)
-        elif sys.platform.startswith("linux"):
-            mod_folder_location = "/home/(username)/.local/share/{}/mod\n".format(game_name)
-        file.write(mod_folder_location)
-        file.write("\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("== Mod manager image ==\n")
-        file.write("Mod_Manager_Image.jpg\n")
-        file.write("\n")
-        file.write("A 276 x 162 JPEG image that represents your mod in the in-game mod manager.\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("== Mod manager description ==\n")
-        file.write("Mod_Manager_Description.txt\n")
-        file.write("\n")
-        file.write("Your mod's description in the mod manager.\n")
-        file.write("It can be replaced, or you can modify the one that's already there.\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("== In-game paint job icon ==\n")
-        file.write("material/ui/accessory/{} Icon.dds\n".format(paintjob_name))
-        file.write("\n")
-        file.write("A 256 x 64 DDS image that is shown in-game when you buy your paint job.\n")
-        file.write("Stick to the shape in the placeholder for your icon to match the others in-game.\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("== Vehicle textures ==\n")
-        file.write("All of the .dds files in:\n")
-        if len(truck_list) == 1:
-            file.write("vehicle/truck/upgrade/paintjob/{}/{}/\n".format(paintjob_name, truck_list[0].name))
-        elif len(bus_list) == 1:
-            file.write("vehicle/truck/upgrade/paintjob/{}/{}/\n".format(paintjob_name, bus_list[0].name))
-        elif len(truck_list) + len(bus_list) > 1:
-            file.write("vehicle/truck/upgrade/paintjob/{}/<each vehicle>/\n".format(paintjob_name))
-        if len(truck_list + bus_list) > 0 and len(trailer_list) > 0:
-            file.write("and\n")
-        if len(trailer_list) == 1:
-            file.write("vehicle/trailer_owned/upgrade/paintjob/{}/{}/\n".format(paintjob_name, trailer_list[0].name))
-        elif len(trailer_list) > 1:
-            file.write("vehicle/trailer_owned/upgrade/paintjob/{}/<each vehicle>/\n".format(paintjob_name))
-        file.write("\n")
-        file.write("These are the main files of your mod, determining what your paint job will actually look like.\n")
-        if len(truck_list) + len(bus_list) + len(trailer_list) == 1:
-            file.write("Replace or re-colour every DDS image in this folder.\n")
-        else:
-            file.write("Replace or re-colour every DDS image in these folders.\n")
-        file.write("\n")
-        file.write("Save each DDS in DXT5 format with mipmaps, if possible.\n")
-        file.write("Ensure every file's height and width is a power of 2 (e.g. 16, 64, 2048, 4096 etc).\n")
-        file.write("\n")
-        if game == "ets":
-            file.write("You can grab a complete template pack here: {}\n".format(ETS_TEMPLATE_LINK))
-        else:
-            file.write("You can grab a complete template pack here: {}\n".format(ATS_TEMPLATE_LINK))
-        file.close()
+            report(("error", PathTooLongError()))
+        except Exception as e:
+            report(("error", e))
 
-    def make_workshop_readme(self, output_path, truck_list, truck_mod_list, bus_mod_list, trailer_list, trailer_mod_list, num_of_paintjobs, cabins_supported):
-        file = open(output_path+"/How to upload your mod to Steam Workshop.txt", "w", encoding="utf-8")
-        file.write("In order to upload your mod to Steam Workshop, you'll need to use the SCS Workshop Uploader, which only runs on Windows.\n")
-        file.write("To download it, you'll need to own ETS 2 or ATS on Steam. Then go to View > Hidden Games, tick \"Tools\" in the dropdown on\n")
-        file.write("the left, then scroll down to find the SCS Workshop Uploader.\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("Once your mod is complete, compress all of its files into a zip file. Name it universal.zip, and move it to the \"Workshop\n")
-        file.write("uploading\" folder, which should already contain a file called versions.sii.\n")
-        file.write("\n")
-        file.write("You'll also need to create a workshop image, which is a 640 x 360 JPEG, that will represent your mod when people search\n")
-        file.write("for it on the Workshop. There is a placeholder Workshop image.jpg with the correct dimensions.\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("Open the SCS Workshop Uploader and select your game. In the Mod data section browse to the \"Workshop uploading\" folder\n")
-        file.write("and your workshop image. Enter your mod name, change the visibility to Public if you wish, then enter your description.\n")
-        file.write("There's an automatically generated Workshop description at the bottom of this text file that you can copy-paste. On the right,\n")
-        file.write("select \"Truck parts\" under Type, then scroll down and check \"Paintjobs\". Select all the brands applicable to your mod, and\n")
-        file.write("enter a change note if you wish.\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("\n")
-        file.write("Below is a workshop description. It's identical to the mod manager description, but with clickable links for modded vehicles:\n")
-        file.write("\n")
-        if num_of_paintjobs == "single":
-            for veh in truck_list + trailer_list:
-                file.write("This paint job supports the {}\n".format(veh.display_name))
-            for veh in truck_mod_list + bus_mod_list + trailer_mod_list:
-                file.write("This paint job supports {}'s [url={}]{}[/url]\n".format(veh.display_author, veh.mod_link, veh.display_name.split(" [")[0]))
-        else:
-            if len(truck_list) + len(truck_mod_list) > 0:
-                file.write("Trucks supported:\n")
-                for veh in truck_list:
-                    file.write(veh.display_name+"\n")
-                for veh in truck_mod_list:
-                    file.write("{}'s [url={}]{}[/url]\n".format(veh.display_author, veh.mod_link, veh.display_name.split(" [")[0]))
-                file.write("\n")
-            if len(bus_mod_list) > 0:
-                file.write("Buses supported:\n")
-                for veh in bus_mod_list:
-                    file.write("{}'s [url={}]{}[/url]\n".format(veh.display_author, veh.mod_link, veh.display_name.split(" [")[0]))
-                file.write("\n")
-            if len(trailer_list) + len(trailer_mod_list) > 0:
-                file.write("Trailers supported:\n")
-                for veh in trailer_list:
-                    file.write(veh.display_name+"\n")
-                for veh in trailer_mod_list:
-                    file.write("{}'s [url={}]{}[/url]\n".format(veh.display_author, veh.mod_link, veh.display_name.split(" [")[0]))
-        file.close()
+    def check_progress_queue(self, output_path):
+        l = self.get_localised_string
+        while True:
+            try:
+                kind, text = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "step":
+                self.progress_value.set(self.progress_value.get()+1.0)
+                self.panel_progress_category_variable.set(text)
+            elif kind == "detail":
+                self.panel_progress_specific_variable.set(text)
+            elif kind == "done":
+                exit_now = messagebox.showinfo(title = l("{ProgressCompleteTitle}"), message = l("{ProgressComplete1}\n\n{ProgressComplete2}\n\n{ProgressComplete3}").format(folder_name = "Paint Job Packer Output"))
+                sys.exit()
+            elif kind == "error":
+                self.handle_generation_error(text, output_path)
+                return
+        self.container.after(PROGRESS_CHECK_INTERVAL, self.check_progress_queue, output_path)
 
     def generate_paintjob_tracker_file(self, game, truck_list, truck_mod_list, bus_mod_list, trailer_list, trailer_mod_list, mod_name):
         # This function is made to work with Paintjob Tracker, a mod management program I wrote for my own use
@@ -1880,18 +1616,107 @@ class PackerApp:
             except TypeError:
                 print("Couldn't compare version numbers, skipping (TypeError)")
 
+class VehicleCheckList:
+    # A scrollable list of vehicle checkboxes that only creates checkboxes for the rows currently in view (about 15),
+    # moving them to other vehicles as the list scrolls, instead of one per vehicle in the database
+    # Which vehicles are selected is kept in a set, which is shared between all five lists
+
+    def __init__(self, canvas, scroll_bar, show_author, selected_vehicles, on_toggle):
+        self.canvas = canvas
+        self.scroll_bar = scroll_bar
+        self.show_author = show_author
+        self.selected_vehicles = selected_vehicles
+        self.on_toggle = on_toggle
+        self.vehicles = [] # Every vehicle in the list, sorted
+        self.shown_vehicles = [] # The vehicles matching the search term
+        self.rows = [] # Reusable checkboxes, with the variable and vehicle they're currently showing
+        self.frame = ttk.Frame(canvas) # Sized to fit every shown vehicle, so the canvas scrolls as if they all had checkboxes
+        self.frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion = self.canvas.bbox("all")))
+        canvas.create_window((0, 0), window = self.frame, anchor = "nw")
+        canvas.configure(yscrollcommand = self.scrolled)
+        canvas.bind("<Configure>", lambda e: self.refresh())
+        self.add_row()
+        self.measure_rows()
+
+    def add_row(self):
+        row_variable = tk.BooleanVar(None, False)
+        row_index = len(self.rows)
+        row_check = ttk.Checkbutton(self.frame, variable = row_variable, command = lambda : self.toggled(row_index))
+        self.rows.append([row_check, row_variable, None])
+
+    def measure_rows(self):
+        # A labelled checkbox is as tall as the larger of its indicator and its font's line, so rows are measured with a
+        # sample label, and again whenever a list is loaded, in case the theme or font has changed
+        row_check, row_variable, row_veh = self.rows[0]
+        row_check.configure(text = "")
+        self.indicator_width = row_check.winfo_reqwidth()
+        row_check.configure(text = "Ag")
+        self.row_height = max(row_check.winfo_reqheight(), tkfont.nametofont("TkDefaultFont").metrics("linespace"))
+        if row_veh is None:
+            row_check.configure(text = "")
+        else:
+            row_check.configure(text = self.label(row_veh))
+
+    def label(self, veh):
+        if self.show_author:
+            return "{} ({})".format(veh.display_name, veh.display_author)
+        return veh.display_name
+
+    def set_vehicles(self, vehicles):
+        self.vehicles = vehicles
+        self.measure_rows()
+        font = tkfont.nametofont("TkDefaultFont")
+        widest_label = max([font.measure(self.label(veh)) for veh in vehicles], default = 0)
+        self.frame.configure(width = self.indicator_width + widest_label + 10)
+        self.show(vehicles)
+
+    def show(self, vehicles):
+        self.shown_vehicles = vehicles
+        self.frame.configure(height = max(1, len(vehicles) * self.row_height))
+        self.refresh()
+
+    def scrolled(self, first, last):
+        self.scroll_bar.set(first, last)
+        self.refresh()
+
+    def refresh(self):
+        top = max(0, int(self.canvas.canvasy(0)))
+        first_row = top // self.row_height
+        last_row = min(len(self.shown_vehicles), (top + self.canvas.winfo_height()) // self.row_height + 1)
+        while len(self.rows) < last_row - first_row:
+            self.add_row()
+        for i in range(len(self.rows)):
+            row_check, row_variable, row_veh = self.rows[i]
+            if first_row + i < last_row:
+                veh = self.shown_vehicles[first_row + i]
+                if veh is not row_veh:
+                    row_check.configure(text = self.label(veh))
+                    self.rows[i][2] = veh
+                row_variable.set(veh in self.selected_vehicles)
+                row_check.place(x = 5, y = (first_row + i) * self.row_height)
+            elif row_veh is not None:
+                row_check.place_forget()
+                self.rows[i][2] = None
+
+    def toggled(self, row_index):
+        row_check, row_variable, veh = self.rows[row_index]
+        if row_variable.get():
+            self.selected_vehicles.add(veh)
+        else:
+            self.selected_vehicles.discard(veh)
+        self.on_toggle(veh, row_variable.get())
+
 class VehSelection:
 
     def __init__(self, _game, _file_name):
         self.file_name = _file_name
         self.game = _game
-        veh_ini = configparser.ConfigParser(allow_no_value = True)
-        veh_ini.read("library/vehicles/{}/{}".format(self.game, self.file_name), encoding="utf-8")
+        veh_ini = pj.vehicle_sections(self.game, self.file_name) # Read from the compiled vehicle index, not the INI file
         self.vehicle_path = veh_ini["vehicle info"]["vehicle path"]
         self.display_name = veh_ini["vehicle info"]["name"]
         self.name = pj.strip_diacritics(self.display_name)
-        self.trailer = veh_ini["vehicle info"].getboolean("trailer")
-        self.mod = veh_ini["vehicle info"].getboolean("mod")
+        self.trailer = pj.read_bool(veh_ini["vehicle info"].get("trailer"))
+        self.mod = pj.read_bool(veh_ini["vehicle info"].get("mod"))
         if self.mod:
             self.display_author = veh_ini["vehicle info"]["mod author"]
         else:
@@ -1912,8 +1737,8 @@ class VehSelection:
             self.mod_link = self.mod_link_trucky
         else:
             self.mod_link = self.mod_link_author_site
-        self.bus_mod = veh_ini["vehicle info"].getboolean("bus mod")
-        self.bus_door_workaround = veh_ini["vehicle info"].getboolean("bus door workaround")
+        self.bus_mod = pj.read_bool(veh_ini["vehicle info"].get("bus mod"))
+        self.bus_door_workaround = pj.read_bool(veh_ini["vehicle info"].get("bus door workaround"))
 
 class PathTooLongError(Exception):
     # A FileNotFoundError raised when a file path is over Windows' max path length, given this custom name to distinguish it from FileNotFoundErrors caused by different issues
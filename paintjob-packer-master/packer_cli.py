@@ -0,0 +1,54 @@
+import argparse # Reading command line arguments
+import os # Finding Paint Job Packer's folder
+import sys # Exit codes
+import time # Timing each pack
+
+# Generates paint jobs from JSON (or YAML) spec files, without the GUI
+# See PackSpec in library/pack.py for what a spec contains, a file can hold one spec or a list of them:
+#
+#     python packer_cli.py my-pack.json other-packs.yaml --output "Paint Job Packer Output"
+#
+# Each pack gets its own folder in the output folder, holding the mod folder and its readme (and Workshop files),
+# e.g. "Paint Job Packer Output/My Pack/My Pack". A spec that fails is reported, and the others are still generated
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Generate Paint Job Packer mods from spec files, without the GUI.")
+    parser.add_argument("specs", nargs = "+", help = "JSON or YAML files, each holding one pack spec or a list of them.")
+    parser.add_argument("-o", "--output", default = "Paint Job Packer Output", help = "Folder to generate the mods in, each in a folder named after the mod. Defaults to \"Paint Job Packer Output\".")
+    parser.add_argument("-j", "--jobs", type = int, default = None, help = "Threads generating each pack's vehicles, 1 to generate them one at a time. Defaults to the number of CPU cores + 4, up to 32.")
+    args = parser.parse_args(argv)
+
+    # The library uses paths relative to Paint Job Packer's folder, so resolve the user's paths before moving there
+    spec_paths = [os.path.abspath(spec_path) for spec_path in args.specs]
+    output_path = os.path.abspath(args.output)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.getcwd())
+    import library.pack as pack
+    jobs = pack.DEFAULT_JOBS if args.jobs == None else args.jobs
+
+    failed = 0
+    built = 0
+    start_time = time.perf_counter()
+    for spec_path in spec_paths:
+        try:
+            specs = pack.load_specs(spec_path)
+        except (OSError, ValueError) as e:
+            print("Could not read {}: {}".format(spec_path, e))
+            failed += 1
+            continue
+        for spec in specs:
+            try:
+                pack_start_time = time.perf_counter()
+                spec = pack.PackSpec(spec)
+                out_path = pack.build_pack(spec, output_path + "/" + spec.mod_name, jobs = jobs)
+                print("Generated {} ({:.0f} ms)".format(out_path, (time.perf_counter() - pack_start_time) * 1000))
+                built += 1
+            except Exception as e: # Anything wrong with one spec shouldn't stop the rest of the batch
+                mod_name = spec.mod_name if isinstance(spec, pack.PackSpec) else spec.get("mod_name", "a pack")
+                print("Could not generate {} from {}: {} ({})".format(mod_name, spec_path, e, type(e).__name__))
+                failed += 1
+    print("Generated {} packs in {:.1f} seconds, {} failed".format(built, time.perf_counter() - start_time, failed))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
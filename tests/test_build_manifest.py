@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.build_manifest import (
+    is_reusable, load_manifest, make_image_record, prune_folder, remove_stale_outputs,
+    save_manifest, settings_fingerprint, source_state
+)
+
+
+class TestBuildManifest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.source = self.tmp / "skin.png"
+        self.source.write_bytes(b"original image")
+        self.cached = self.tmp / "cached.dds"
+        self.cached.write_bytes(b"DDS ")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _record(self):
+        return make_image_record(source_state(self.source), "skin1234", {"paint_dds": self.cached, "mod_icon": None})
+
+    def test_unchanged_image_is_reusable(self):
+        record = self._record()
+        self.assertTrue(is_reusable(record, source_state(self.source, record)))
+
+    def test_edited_image_is_not_reusable(self):
+        record = self._record()
+        self.source.write_bytes(b"edited image!!")
+        os.utime(self.source, ns=(record["mtime_ns"] + 10**9, record["mtime_ns"] + 10**9))
+        self.assertFalse(is_reusable(record, source_state(self.source, record)))
+
+    def test_missing_cached_file_is_not_reusable(self):
+        record = self._record()
+        self.cached.unlink()
+        self.assertFalse(is_reusable(record, source_state(self.source, record)))
+
+    def test_manifest_round_trip_and_settings_change(self):
+        manifest_path = self.tmp / "build_manifest.json"
+        fingerprint = settings_fingerprint({"dds_format": "DXT5", "image_resolution": [4096, 4096]})
+        save_manifest(manifest_path, fingerprint, {"skin.png": self._record()}, ["manifest.sii"])
+
+        loaded = load_manifest(manifest_path, fingerprint)
+        self.assertEqual(loaded["images"]["skin.png"]["paint_id"], "skin1234")
+        self.assertEqual(loaded["outputs"], ["manifest.sii"])
+
+        other = settings_fingerprint({"dds_format": "DXT1", "image_resolution": [4096, 4096]})
+        self.assertEqual(load_manifest(manifest_path, other), {"images": {}, "outputs": []})
+        self.assertEqual(load_manifest(self.tmp / "missing.json", fingerprint), {"images": {}, "outputs": []})
+
+    def test_stale_files_are_removed(self):
+        root = self.tmp / "output_Test"
+        for rel_path in ("manifest.sii", "def/old/skin1.sii", "def/new/skin2.sii"):
+            (root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            (root / rel_path).write_bytes(b"")
+        removed = remove_stale_outputs(root, ["manifest.sii", "def/old/skin1.sii"], {"manifest.sii", "def/new/skin2.sii"})
+        self.assertEqual(removed, 1)
+        self.assertFalse((root / "def/old").exists())
+        self.assertTrue((root / "def/new/skin2.sii").is_file())
+
+        self.assertEqual(prune_folder(self.tmp, keep={self.cached}), 1) # skin.png
+        self.assertEqual(sorted(p.name for p in self.tmp.iterdir() if p.is_file()), ["cached.dds"])
+
+if __name__ == '__main__':
+    unittest.main()
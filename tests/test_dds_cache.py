@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+import core.dds_cache as dds_cache
+
+
+class TestDdsCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.cache = self.tmp / "cache"
+        self.image = Image.new("RGBA", (16, 16), (200, 40, 10, 255))
+        self.src = self.tmp / "skin.png"
+        self.image.save(self.src)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def encode_file(self, dds_format="DXT5"):
+        with mock.patch.object(dds_cache, "convert_to_dds", wraps=dds_cache.convert_to_dds) as convert:
+            path = dds_cache.encode_dds_cached("", self.src, self.cache, dds_format, "builtin")
+        return path, convert.call_count
+
+    def encode_image(self, image, dds_format="DXT5"):
+        with mock.patch.object(dds_cache, "convert_image_to_dds", wraps=dds_cache.convert_image_to_dds) as convert:
+            path = dds_cache.encode_image_dds_cached("", image, self.cache, dds_format, "builtin")
+        return path, convert.call_count
+
+    def test_file_miss_then_hit(self):
+        first, conversions = self.encode_file()
+        self.assertEqual(conversions, 1)
+        self.assertTrue(first.is_file())
+        self.assertEqual(first.read_bytes()[:4], b"DDS ")
+        second, conversions = self.encode_file()
+        self.assertEqual(conversions, 0)
+        self.assertEqual(second, first)
+        self.assertEqual(os.listdir(self.cache), [first.name])
+
+    def test_file_key_changes_with_source_and_format(self):
+        original, _ = self.encode_file()
+        dxt1, conversions = self.encode_file("DXT1")
+        self.assertEqual(conversions, 1)
+        self.assertNotEqual(dxt1, original)
+        Image.new("RGBA", (16, 16), (0, 0, 255, 255)).save(self.src)
+        changed, conversions = self.encode_file()
+        self.assertEqual(conversions, 1)
+        self.assertNotEqual(changed, original)
+
+    def test_image_miss_then_hit(self):
+        first, conversions = self.encode_image(self.image)
+        self.assertEqual(conversions, 1)
+        second, conversions = self.encode_image(self.image.copy())
+        self.assertEqual(conversions, 0)
+        self.assertEqual(second, first)
+        # No partial files are left behind
+        self.assertEqual(os.listdir(self.cache), [first.name])
+
+    def test_image_key_changes_with_pixels_and_format(self):
+        original, _ = self.encode_image(self.image)
+        dxt1, conversions = self.encode_image(self.image, "DXT1")
+        self.assertEqual(conversions, 1)
+        self.assertNotEqual(dxt1, original)
+        changed_image = self.image.copy()
+        changed_image.putpixel((0, 0), (0, 0, 0, 255))
+        changed, conversions = self.encode_image(changed_image)
+        self.assertEqual(conversions, 1)
+        self.assertNotEqual(changed, original)
+
+    def test_place_file(self):
+        cached, _ = self.encode_file()
+        dst = self.tmp / "placed.dds"
+        dst.write_bytes(b"stale")
+        dds_cache.place_file(cached, dst)
+        self.assertEqual(dst.read_bytes(), cached.read_bytes())
+        copied = self.tmp / "copied.dds"
+        dds_cache.place_file(cached, copied, use_hardlinks=False)
+        self.assertEqual(copied.read_bytes(), cached.read_bytes())
+        self.assertNotEqual(os.stat(copied).st_ino, os.stat(cached).st_ino)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import struct
+import unittest
+
+import numpy as np
+
+from core.dds_encoder import build_dds_header, compress_blocks, encode_dds
+
+
+def _expand_565(value):
+    r, g, b = (value >> 11) & 0x1F, (value >> 5) & 0x3F, value & 0x1F
+    return np.array([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], dtype=np.float64)
+
+
+def _decode_color_block(block):
+    c0, c1, bits = struct.unpack("<HHI", block)
+    p0, p1 = _expand_565(c0), _expand_565(c1)
+    palette = [p0, p1, (2 * p0 + p1) / 3, (p0 + 2 * p1) / 3] if c0 > c1 else [p0, p1, (p0 + p1) / 2, np.zeros(3)]
+    return np.array([palette[(bits >> (2 * i)) & 3] for i in range(16)])
+
+
+def _decode_alpha_block(block):
+    a0, a1 = block[0], block[1]
+    bits = int.from_bytes(block[2:8], "little")
+    if a0 > a1:
+        palette = [a0, a1] + [((7 - i) * a0 + i * a1) / 7 for i in range(1, 7)]
+    else:
+        palette = [a0, a1] + [((5 - i) * a0 + i * a1) / 5 for i in range(1, 5)] + [0, 255]
+    return np.array([palette[(bits >> (3 * i)) & 7] for i in range(16)], dtype=np.float64)
+
+
+def _decode(data, width, height, dxt5):
+    """Reference decoder: turns compressed blocks back into an (H, W, 4) float image."""
+    block_size = 16 if dxt5 else 8
+    out = np.zeros((height, width, 4))
+    offset = 0
+    for by in range(height // 4):
+        for bx in range(width // 4):
+            block = data[offset:offset + block_size]
+            offset += block_size
+            alpha = _decode_alpha_block(block[:8]) if dxt5 else np.full(16, 255.0)
+            rgb = _decode_color_block(block[-8:])
+            out[by * 4:by * 4 + 4, bx * 4:bx * 4 + 4, :3] = rgb.reshape(4, 4, 3)
+            out[by * 4:by * 4 + 4, bx * 4:bx * 4 + 4, 3] = alpha.reshape(4, 4)
+    return out
+
+
+def _gradient(width=32, height=16):
+    y, x = np.mgrid[0:height, 0:width]
+    rgba = np.zeros((height, width, 4), dtype=np.uint8)
+    rgba[..., 0] = x * 255 // (width - 1)
+    rgba[..., 1] = y * 255 // (height - 1)
+    rgba[..., 2] = 128
+    rgba[..., 3] = (x + y) * 255 // (width + height - 2)
+    return rgba
+
+
+class TestDdsEncoder(unittest.TestCase):
+
+    def test_header_fields(self):
+        header = build_dds_header(64, 32, b"DXT5")
+        self.assertEqual(len(header), 128)
+        self.assertEqual(header[:4], b"DDS ")
+        size, flags, height, width, linear_size = struct.unpack_from("<5I", header, 4)
+        self.assertEqual((size, height, width, linear_size), (124, 32, 64, 16 * 8 * 16))
+        self.assertEqual(header[84:88], b"DXT5")
+
+    def test_solid_color_round_trips_exactly(self):
+        # Pure 565-representable colour and alpha: decoding must give back the input
+        rgba = np.zeros((8, 8, 4), dtype=np.uint8)
+        rgba[...] = (255, 0, 132, 200)
+        decoded = _decode(compress_blocks(rgba, "DXT5"), 8, 8, dxt5=True)
+        self.assertTrue(np.array_equal(decoded, rgba.astype(np.float64)))
+
+    def test_gradient_quality(self):
+        rgba = _gradient()
+        for dds_format, dxt5 in (("DXT1", False), ("DXT5", True)):
+            decoded = _decode(compress_blocks(rgba, dds_format), 32, 16, dxt5)
+            rgb_rmse = np.sqrt(((decoded[..., :3] - rgba[..., :3]) ** 2).mean())
+            self.assertLess(rgb_rmse, 8, dds_format)
+        alpha_error = np.abs(decoded[..., 3] - rgba[..., 3]).max()
+        self.assertLessEqual(alpha_error, 4)
+
+    def test_encode_dds_sizes(self):
+        rgba = _gradient()
+        self.assertEqual(len(encode_dds(rgba, "DXT1")), 128 + 8 * 4 * 8)
+        self.assertEqual(len(encode_dds(rgba, "BC3_UNORM")), 128 + 8 * 4 * 16)
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            encode_dds(_gradient(), "BC7_UNORM")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+import build_skin_pack
+from core.texture_profiles import TextureProfile
+
+PROFILES = [TextureProfile((64, 64), "DXT5"), TextureProfile((32, 32), "DXT1")]
+
+
+class TestImagePipeline(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.src = self.tmp / "skin.png"
+        image = Image.new("RGBA", (96, 96))
+        image.putdata([(x * 2, y * 2, (x + y) % 256, 255) for y in range(96) for x in range(96)])
+        image.save(self.src)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def encode(self, encode_textures, name):
+        # Each pipeline gets its own cache, so both really encode
+        work_folder = self.tmp / name
+        work_folder.mkdir()
+        with mock.patch.multiple(build_skin_pack, dds_backend="builtin", dds_mipmaps=1, image_resolution=(64, 64),
+                                 ui_accessory_resolution=(32, 8), temp_folder=work_folder,
+                                 dds_cache_folder=work_folder / "dds_cache"):
+            paint_dds, ui_dds, mod_icon = encode_textures(self.src, "skin0001", PROFILES, with_icon=True)
+        return ({key: path.read_bytes() for key, path in paint_dds.items()}, ui_dds.read_bytes(), mod_icon)
+
+    def test_in_memory_matches_temp_files(self):
+        in_memory = self.encode(build_skin_pack._encode_textures_in_memory, "in_memory")
+        temp_files = self.encode(build_skin_pack._encode_textures_via_temp_files, "temp_files")
+        self.assertEqual(sorted(in_memory[0]), ["32x32_DXT1", "64x64_DXT5"])
+        self.assertEqual(in_memory, temp_files)
+        self.assertEqual(in_memory[0]["64x64_DXT5"][:4], b"DDS ")
+
+    def test_only_profile_and_ui_sizes_are_resized(self):
+        # image_resolution is not used by any profile, so nothing is resized to it
+        with mock.patch.object(build_skin_pack, "image_resolution", (80, 80)), \
+                mock.patch.object(build_skin_pack.ImagePyramid, "get_many", autospec=True,
+                                  side_effect=build_skin_pack.ImagePyramid.get_many) as get_many:
+            self.encode(build_skin_pack._encode_textures_in_memory, "in_memory")
+        resolutions = get_many.call_args.args[1]
+        self.assertEqual(resolutions, [(64, 64), (32, 32), (32, 8)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+import core.image_pyramid as image_pyramid
+from core.image_pyramid import MOD_ICON_SIZE, ImagePyramid, estimate_memory
+
+
+class TestImagePyramid(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.src = Path(self._tmp.name) / "skin.png"
+        Image.new("RGB", (1024, 1024), (200, 30, 60)).save(self.src)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_sizes_are_memoized_and_derived_from_smaller_levels(self):
+        pyramid = ImagePyramid(self.src)
+        resized_from = []
+        real_resize = image_pyramid.resize_in_memory
+
+        def recording_resize(image, resolution):
+            resized_from.append((image.size, tuple(resolution)))
+            return real_resize(image, resolution)
+
+        with mock.patch.object(image_pyramid, "load_image", wraps=image_pyramid.load_image) as load, \
+             mock.patch.object(image_pyramid, "resize_in_memory", side_effect=recording_resize):
+            levels = pyramid.get_many([(256, 256), (512, 512), (256, 256)])
+            self.assertIs(pyramid.get((512, 512)), levels[(512, 512)])
+            pyramid.get((256, 54))
+            icon = pyramid.mod_icon()
+
+        load.assert_called_once()
+        self.assertEqual(resized_from, [
+            ((1024, 1024), (512, 512)),
+            ((512, 512), (256, 256)),
+            ((256, 256), (256, 54)),
+            ((512, 512), MOD_ICON_SIZE),
+        ])
+        with Image.open(io.BytesIO(icon)) as jpeg:
+            self.assertEqual((jpeg.format, jpeg.size), ("JPEG", MOD_ICON_SIZE))
+
+    def test_dropped_source_is_not_decoded_again(self):
+        pyramid = ImagePyramid(self.src)
+        pyramid.get((512, 512))
+        pyramid.drop_source()
+        with mock.patch.object(image_pyramid, "load_image") as load:
+            self.assertEqual(pyramid.get((128, 128)).size, (128, 128))
+            load.assert_not_called()
+
+    def test_estimate_memory_reads_only_the_header(self):
+        with mock.patch.object(image_pyramid, "load_image") as load:
+            plain = estimate_memory(self.src, [(512, 512), (256, 256), (512, 512)])
+            with_mipmaps = estimate_memory(self.src, [(512, 512), (256, 256)], "full")
+            load.assert_not_called()
+        self.assertEqual(plain, 4 * (2 * 1024 * 1024 + 512 * 512 + 256 * 256))
+        self.assertGreater(with_mipmaps, plain)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import struct
+import unittest
+
+import numpy as np
+
+from core.dds_encoder import combine_dds_levels, encode_dds
+from core.mipmaps import MIPMAP_FILTERS, build_mip_chain, downsample, mip_level_count
+
+
+class TestMipmaps(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.image = rng.integers(0, 256, (64, 32, 4), dtype=np.uint8)
+
+    def test_level_count(self):
+        self.assertEqual(mip_level_count(4096, 4096, "full"), 13)
+        self.assertEqual(mip_level_count(256, 54, "full"), 9)
+        self.assertEqual(mip_level_count(64, 64, 3), 3)
+        self.assertEqual(mip_level_count(4, 4, 10), 3) # Never more than the full chain
+        with self.assertRaises(ValueError):
+            mip_level_count(64, 64, 0)
+
+    def test_full_chain_sizes(self):
+        for mip_filter in MIPMAP_FILTERS:
+            chain = build_mip_chain(self.image, "full", mip_filter)
+            self.assertEqual([level.shape[:2] for level in chain],
+                             [(64, 32), (32, 16), (16, 8), (8, 4), (4, 2), (2, 1), (1, 1)])
+
+    def test_box_filter_averages_2x2(self):
+        level = downsample(self.image, "box")
+        expected = np.rint(self.image.astype(np.float32).reshape(32, 2, 16, 2, 4).mean(axis=(1, 3)))
+        np.testing.assert_array_equal(level, expected.astype(np.uint8))
+
+    def test_flat_image_stays_flat(self):
+        flat = np.full((32, 32, 4), 200, dtype=np.uint8)
+        for mip_filter in MIPMAP_FILTERS:
+            for level in build_mip_chain(flat, "full", mip_filter):
+                self.assertTrue((level == 200).all(), mip_filter)
+
+    def test_mipmapped_dds(self):
+        data = encode_dds(self.image, "DXT5", mipmaps="full")
+        flags, height, width, _, _, mip_count = struct.unpack_from("<6I", data, 8)
+        self.assertEqual((height, width, mip_count), (64, 32, 7))
+        self.assertTrue(flags & 0x20000) # DDSD_MIPMAPCOUNT
+        # 16 bytes per 4x4 block; levels below 4 pixels still take a whole block
+        blocks = sum(max(1, h // 4) * max(1, w // 4) for h, w in [(64, 32), (32, 16), (16, 8), (8, 4), (4, 2), (2, 1), (1, 1)])
+        self.assertEqual(len(data), 128 + 16 * blocks)
+
+    def test_combined_levels_match_direct_encoding(self):
+        chain = build_mip_chain(self.image, 4, "kaiser")
+        combined = combine_dds_levels([encode_dds(level, "DXT1") for level in chain])
+        self.assertEqual(combined, encode_dds(self.image, "DXT1", mipmaps=4, mip_filter="kaiser"))
+
+if __name__ == '__main__':
+    unittest.main()
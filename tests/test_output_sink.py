@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from core.output_sink import ArchiveSink, DirectorySink
+from core.pack_scs import pack_to_scs
+
+
+class TestOutputSinks(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.texture = self.tmp / "cached.dds"
+        self.texture.write_bytes(b"DDS " + bytes(range(256)) * 64)
+        # Deliberately unsorted, with one file shared by two entries
+        self.entries = [
+            ("def/vehicle/truck/a/paint_job/skin1.sii", b"SiiNunit\n{\n}"),
+            ("vehicle/truck/upgrade/paintjob/a/skin1/skin1_0.dds", self.texture),
+            ("manifest.sii", b"SiiNunit"),
+            ("vehicle/trailer_owned/upgrade/paintjob/b/skin1/skin1_shared.dds", self.texture),
+            ("def/vehicle/truck/a/paint_job/skin1_mask.sui", b""),
+        ]
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_archive_matches_packed_staging_folder(self):
+        staging = DirectorySink(self.tmp / "output_Test")
+        staging.write_entries(self.entries)
+        staging.close()
+        staged_scs = pack_to_scs(self.tmp / "output_Test", str(self.tmp / "staged"))
+
+        direct = ArchiveSink(self.tmp / "direct.scs")
+        direct.write_entries(self.entries)
+        direct.close()
+
+        self.assertEqual(staged_scs.read_bytes(), (self.tmp / "direct.scs").read_bytes())
+
+    def test_archive_contents(self):
+        sink = ArchiveSink(self.tmp / "direct.scs")
+        sink.write_entries(self.entries)
+        sink.close()
+        with zipfile.ZipFile(self.tmp / "direct.scs") as scs:
+            self.assertEqual(scs.namelist(), sorted(name for name, _ in self.entries))
+            self.assertEqual(scs.read("vehicle/truck/upgrade/paintjob/a/skin1/skin1_0.dds"), self.texture.read_bytes())
+            self.assertEqual(scs.read("def/vehicle/truck/a/paint_job/skin1_mask.sui"), b"")
+            # Textures are stored, text files deflated
+            self.assertEqual(scs.getinfo("vehicle/truck/upgrade/paintjob/a/skin1/skin1_0.dds").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(scs.getinfo("manifest.sii").compress_type, zipfile.ZIP_DEFLATED)
+
+    def test_staging_hardlinks_identical_content(self):
+        sink = DirectorySink(self.tmp / "output_Test")
+        sink.write_entries([("a/skin1_shared.sui", b"name: skin1"), ("b/skin1_shared.sui", b"name: skin1"),
+                            ("c/skin1_shared.sui", b"name: skin1")])
+        root = self.tmp / "output_Test"
+        self.assertTrue((root / "a/skin1_shared.sui").samefile(root / "c/skin1_shared.sui"))
+        self.assertEqual((sink.duplicate_files, sink.duplicate_bytes), (2, 2 * len(b"name: skin1")))
+
+        # A rebuild with different content for one file must not change its former links
+        rebuild = DirectorySink(root)
+        rebuild.write_entries([("a/skin1_shared.sui", b"name: edited"), ("b/skin1_shared.sui", b"name: skin1")])
+        self.assertEqual((root / "a/skin1_shared.sui").read_bytes(), b"name: edited")
+        self.assertEqual((root / "b/skin1_shared.sui").read_bytes(), b"name: skin1")
+        self.assertEqual((root / "c/skin1_shared.sui").read_bytes(), b"name: skin1")
+
+    def test_background_writes_match_serial(self):
+        entries = self.entries + [(f"def/vehicle/truck/m{i}/paint_job/skin1_shared.sui", b"name: skin1") for i in range(20)]
+        with DirectorySink(self.tmp / "serial") as serial:
+            serial.write_entries(entries)
+        with DirectorySink(self.tmp / "threaded", jobs=4) as threaded:
+            threaded.write_entries(entries)
+        self.assertEqual(threaded.duplicate_files, serial.duplicate_files)
+        for rel_path, _ in entries:
+            self.assertEqual((self.tmp / "threaded" / rel_path).read_bytes(), (self.tmp / "serial" / rel_path).read_bytes())
+
+    def test_flush_raises_write_errors(self):
+        (self.tmp / "output_Test").mkdir()
+        (self.tmp / "output_Test" / "file.sii").mkdir() # A folder where a file should go
+        sink = DirectorySink(self.tmp / "output_Test", jobs=2)
+        sink.write_bytes("file.sii", b"SiiNunit")
+        with self.assertRaises(OSError):
+            sink.close()
+
+    def test_nothing_written_before_close(self):
+        sink = ArchiveSink(self.tmp / "direct.scs")
+        sink.write_entries(self.entries)
+        self.assertFalse((self.tmp / "direct.scs").exists())
+
+if __name__ == '__main__':
+    unittest.main()
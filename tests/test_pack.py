@@ -0,0 +1,98 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PAINTJOB_PACKER = Path(__file__).resolve().parent.parent / "paintjob-packer-master"
+sys.path.insert(0, str(PAINTJOB_PACKER))
+
+import library.pack as pack
+import packer_cli
+
+SPEC = {
+    "game": "ets",
+    "mod_name": "Test Pack",
+    "mod_author": "Tester",
+    "ingame_name": "Test Paint Job",
+    "ingame_price": 5000,
+    "internal_name": "testpj",
+    "vehicles": ["krone.boxliner", "scania.s_2016 [SCS]"],
+}
+
+
+class TestBuildPack(unittest.TestCase):
+
+    def setUp(self):
+        # Paint Job Packer's library works relative to its own folder
+        self.old_cwd = os.getcwd()
+        os.chdir(PAINTJOB_PACKER)
+        self.tmp = tempfile.TemporaryDirectory()
+        # Keep the vehicle index out of the user's cache folder
+        self.old_index_folder = pack.pj.vehicle_index_folder
+        pack.pj.vehicle_index_folder = self.tmp.name + "/cache"
+        pack.pj.vehicle_indexes.clear()
+
+    def tearDown(self):
+        pack.pj.vehicle_index_folder = self.old_index_folder
+        pack.pj.vehicle_indexes.clear()
+        os.chdir(self.old_cwd)
+        self.tmp.cleanup()
+
+    def test_build_pack(self):
+        events = []
+        out_path = pack.build_pack(SPEC, self.tmp.name, lambda kind, text: events.append((kind, text)), jobs=2)
+        self.assertEqual(out_path, self.tmp.name + "/Test Pack")
+        self.assertTrue(os.path.isfile(out_path + "/manifest.sii"))
+        self.assertTrue(os.path.isfile(out_path + "/def/vehicle/trailer_owned/krone.boxliner/paint_job/testpj_settings.sui"))
+        self.assertTrue(os.path.isfile(self.tmp.name + "/How to complete your mod.txt"))
+        # One step for the general mod files, then one per vehicle
+        steps = [text for kind, text in events if kind == "step"]
+        self.assertEqual(steps[0], "General mod files")
+        self.assertEqual(len(steps), 3)
+        with self.assertRaises(FileExistsError):
+            pack.build_pack(SPEC, self.tmp.name)
+        # The readme is per pack, so a second pack can't share the folder
+        with self.assertRaises(FileExistsError):
+            pack.build_pack(dict(SPEC, mod_name="Other Pack"), self.tmp.name)
+
+    def test_invalid_specs(self):
+        for changes in ({"game": "fs22"}, {"internal_name": "Test PJ"}, {"internal_name": "much_too_long"},
+                        {"vehicles": ["not.a.vehicle"]}, {"vehicles": []}, {"cabin_handling": "mixed"},
+                        {"ingame_price": "free"}, {"mod_author": ""}, {"mod_name": ["Test"]}, {"ingame_price": True},
+                        {"placeholder_templates": "false"}, {"workshop_upload": 1}, {"vehicles": "krone.boxliner"},
+                        {"vehicles": [3]}, {"cabin_handling": ["separate"]}):
+            with self.assertRaises(ValueError, msg=changes):
+                pack.PackSpec(dict(SPEC, **changes))
+        # Largest cabin only always uses a combined paint job, which allows a longer internal name
+        spec = pack.PackSpec(dict(SPEC, internal_name="twelve_chars", cabins_supported="largest"))
+        self.assertEqual(spec.cabin_handling, "Combined paint job")
+
+    def test_cli_builds_each_pack_in_its_own_folder(self):
+        spec_path = self.tmp.name + "/specs.json"
+        with open(spec_path, "w", encoding="utf-8") as file:
+            json.dump([SPEC, dict(SPEC, mod_name=5), dict(SPEC, mod_name="Second Pack", workshop_upload="yes")], file)
+        output_path = self.tmp.name + "/out"
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(packer_cli.main([spec_path, "--output", output_path, "--jobs", "1"]), 1)
+        self.assertIn("Generated 2 packs", output.getvalue())
+        self.assertIn("workshop_upload", output.getvalue())
+        for mod_name in ["Test Pack", "5"]:
+            self.assertTrue(os.path.isfile(output_path + "/" + mod_name + "/" + mod_name + "/manifest.sii"))
+            self.assertTrue(os.path.isfile(output_path + "/" + mod_name + "/How to complete your mod.txt"))
+
+    def test_load_specs(self):
+        spec_path = self.tmp.name + "/specs.json"
+        with open(spec_path, "w", encoding="utf-8") as file:
+            json.dump(SPEC, file)
+        self.assertEqual(pack.load_specs(spec_path), [SPEC])
+        with open(spec_path, "w", encoding="utf-8") as file:
+            json.dump(["not a spec"], file)
+        with self.assertRaises(ValueError):
+            pack.load_specs(spec_path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+import core.pack_scs as pack_scs
+from core.pack_scs import DedupStats, write_scs
+
+
+class TestWriteScs(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        texture = self.tmp / "texture.dds"
+        texture.write_bytes(b"DDS " + bytes(range(256)) * 512)
+        self.entries = sorted(
+            [(f"def/vehicle/truck/model{i}/paint_job/skin{i}.sii", f"SiiNunit {{ skin{i} }}\n".encode() * 50) for i in range(30)]
+            + [(f"vehicle/truck/upgrade/paintjob/model{i}/skin/skin_0.dds", texture) for i in range(5)]
+            + [("material/ui/accessory/skin_ui_accessory.tobj", texture), ("manifest.sii", b"")]
+        )
+        self.expected = {
+            name: content if isinstance(content, bytes) else content.read_bytes() for name, content in self.entries
+        }
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _read_back(self, scs_path):
+        with zipfile.ZipFile(scs_path) as scs:
+            self.assertIsNone(scs.testzip()) # Every CRC checks out
+            self.assertEqual(scs.namelist(), [name for name, _ in self.entries])
+            return {name: scs.read(name) for name in scs.namelist()}
+
+    def test_parallel_matches_serial(self):
+        write_scs(self.tmp / "serial.scs", self.entries, jobs=1)
+        write_scs(self.tmp / "parallel.scs", self.entries, jobs=4)
+        self.assertEqual((self.tmp / "serial.scs").read_bytes(), (self.tmp / "parallel.scs").read_bytes())
+        self.assertEqual(self._read_back(self.tmp / "parallel.scs"), self.expected)
+
+    def test_deflate_everything(self):
+        write_scs(self.tmp / "all.scs", self.entries, compress_level=9, stored_extensions=(), jobs=2)
+        with zipfile.ZipFile(self.tmp / "all.scs") as scs:
+            self.assertTrue(all(info.compress_type == zipfile.ZIP_DEFLATED for info in scs.infolist()))
+        self.assertEqual(self._read_back(self.tmp / "all.scs"), self.expected)
+
+    def test_stored_extensions_as_list(self):
+        write_scs(self.tmp / "tuple.scs", self.entries, stored_extensions=(".dds",))
+        write_scs(self.tmp / "list.scs", self.entries, stored_extensions=[".dds"])
+        self.assertEqual((self.tmp / "tuple.scs").read_bytes(), (self.tmp / "list.scs").read_bytes())
+
+    def test_duplicates_are_compressed_once(self):
+        shared = b'name: "skin"\nprice: 1\n' * 20
+        entries = sorted([(f"def/vehicle/truck/model{i}/paint_job/skin_shared.sui", shared) for i in range(10)]
+                         + [(f"def/vehicle/truck/model{i}/paint_job/skin_mask.sui", b"") for i in range(10)])
+        for jobs in (1, 3):
+            with patch.object(pack_scs, "_prepare_entry", wraps=pack_scs._prepare_entry) as prepare:
+                stats = write_scs(self.tmp / f"dedup{jobs}.scs", entries, jobs=jobs)
+            self.assertEqual(prepare.call_count, 2)
+            self.assertEqual(stats, DedupStats(18, 9 * len(shared)))
+            with zipfile.ZipFile(self.tmp / f"dedup{jobs}.scs") as scs:
+                self.assertIsNone(scs.testzip())
+                self.assertEqual({scs.read(name) for name in scs.namelist()}, {shared, b""})
+        self.assertEqual((self.tmp / "dedup1.scs").read_bytes(), (self.tmp / "dedup3.scs").read_bytes())
+
+    @patch("core.pack_scs.ZIP64_SIZE_LIMIT", 1000)
+    @patch("core.pack_scs.ZIP64_COUNT_LIMIT", 10)
+    def test_zip64_records(self):
+        # Lowered limits force every Zip64 code path on a small archive
+        write_scs(self.tmp / "zip64.scs", self.entries, jobs=2)
+        self.assertEqual(self._read_back(self.tmp / "zip64.scs"), self.expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.paint_ids import assign_paint_ids, derive_paint_id, load_paint_id_map, save_paint_id_map
+
+
+class TestPaintIds(unittest.TestCase):
+
+    def test_ids_are_derived_from_file_names(self):
+        first = assign_paint_ids(["b.png", "a.png"], {}, "skin")
+        second = assign_paint_ids(["a.png", "b.png"], {}, "skin")
+        self.assertEqual(first, second)
+        self.assertEqual(first["a.png"], derive_paint_id("a.png", "skin"))
+        self.assertRegex(first["a.png"], r"^skin\d{4}$")
+
+    def test_existing_ids_never_change(self):
+        mapping = {"a.png": "skin0001", "removed.png": "skin0002"}
+        result = assign_paint_ids(["a.png", "new.png"], mapping, "paint", digits=6)
+        self.assertEqual(result["a.png"], "skin0001")
+        self.assertEqual(result["removed.png"], "skin0002") # Stays reserved
+        self.assertRegex(result["new.png"], r"^paint\d{6}$")
+
+    def test_collisions_get_unique_ids(self):
+        names = [f"skin_{i}.png" for i in range(60)]
+        result = assign_paint_ids(names, {}, "s", digits=2) # 60 names in 100 IDs: collisions are certain
+        self.assertEqual(len(set(result.values())), len(names))
+        with self.assertRaises(ValueError):
+            assign_paint_ids([f"x{i}.png" for i in range(11)], {}, "s", digits=1)
+
+    def test_mapping_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "paint_ids.json"
+            self.assertEqual(load_paint_id_map(path), {})
+            save_paint_id_map(path, {"a.png": "skin0001"})
+            self.assertEqual(load_paint_id_map(path), {"a.png": "skin0001"})
+            path.write_text("[1, 2]")
+            with self.assertRaises(ValueError):
+                load_paint_id_map(path)
+
+if __name__ == '__main__':
+    unittest.main()
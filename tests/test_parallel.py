@@ -0,0 +1,103 @@
+import unittest
+from pathlib import Path
+
+from core.parallel import WorkUnit, WorkUnitError, iter_work_units, run_work_units, resolve_job_count, parse_memory_size
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def _square(value):
+    return value * value
+
+
+def _fail_on_three(value):
+    if value == 3:
+        raise ValueError("three is not allowed")
+    return value
+
+
+class TestRunWorkUnits(unittest.TestCase):
+
+    def setUp(self):
+        self.units = [WorkUnit(f"unit {i}", _square, (i,)) for i in range(20)]
+
+    def test_serial_results_in_order(self):
+        self.assertEqual(run_work_units(self.units, jobs=1), [i * i for i in range(20)])
+
+    def test_parallel_matches_serial(self):
+        self.assertEqual(run_work_units(self.units, jobs=3), run_work_units(self.units, jobs=1))
+
+    def test_error_carries_unit_label(self):
+        units = [WorkUnit(f"unit {i}", _fail_on_three, (i,)) for i in range(5)]
+        for jobs in (1, 2):
+            with self.assertRaises(WorkUnitError) as ctx:
+                run_work_units(units, jobs=jobs)
+            self.assertEqual(ctx.exception.label, "unit 3")
+            self.assertIn("three is not allowed", str(ctx.exception))
+
+    def test_resolve_job_count(self):
+        self.assertEqual(resolve_job_count(4), 4)
+        self.assertGreaterEqual(resolve_job_count(0), 1)
+
+    def test_memory_budget_matches_serial(self):
+        # Unit 5 alone exceeds the budget and must still run
+        costs = [300 if i == 5 else 40 for i in range(20)]
+        result = run_work_units(self.units, jobs=3, costs=costs, memory_budget=100)
+        self.assertEqual(result, [i * i for i in range(20)])
+
+    def test_memory_budget_error_carries_unit_label(self):
+        units = [WorkUnit(f"unit {i}", _fail_on_three, (i,)) for i in range(5)]
+        with self.assertRaises(WorkUnitError) as ctx:
+            run_work_units(units, jobs=2, costs=[10] * 5, memory_budget=20)
+        self.assertEqual(ctx.exception.label, "unit 3")
+
+
+class TestIterWorkUnits(unittest.TestCase):
+
+    def test_threads_match_serial(self):
+        units = [WorkUnit(f"unit {i}", _square, (i,)) for i in range(50)]
+        self.assertEqual(list(iter_work_units(units, jobs=4)), [i * i for i in range(50)])
+        self.assertEqual(list(iter_work_units(iter(units), jobs=1)), [i * i for i in range(50)])
+
+    def test_unordered_yields_every_result(self):
+        units = [WorkUnit(f"unit {i}", _square, (i,)) for i in range(50)]
+        self.assertEqual(sorted(iter_work_units(units, jobs=4, ordered=False)), [i * i for i in range(50)])
+        with self.assertRaises(WorkUnitError):
+            list(iter_work_units([WorkUnit(f"unit {i}", _fail_on_three, (i,)) for i in range(10)], jobs=3, ordered=False))
+
+    def test_error_keeps_original_exception(self):
+        units = [WorkUnit(f"unit {i}", _fail_on_three, (i,)) for i in range(10)]
+        for jobs in (1, 3):
+            results = []
+            with self.assertRaises(WorkUnitError) as ctx:
+                for result in iter_work_units(units, jobs=jobs):
+                    results.append(result)
+            self.assertEqual(results, [0, 1, 2])
+            self.assertEqual(ctx.exception.label, "unit 3")
+            self.assertIsInstance(ctx.exception.__cause__, ValueError)
+
+
+class TestParseMemorySize(unittest.TestCase):
+
+    def test_units(self):
+        self.assertEqual(parse_memory_size("8G"), 8 * 1024 ** 3)
+        self.assertEqual(parse_memory_size("512m"), 512 * 1024 ** 2)
+        self.assertEqual(parse_memory_size("1.5GiB"), 3 * 1024 ** 3 // 2)
+        self.assertEqual(parse_memory_size("4096"), 4096)
+        self.assertEqual(parse_memory_size(4096), 4096)
+
+    def test_invalid(self):
+        for value in ("", "lots", "8X", "0", -1):
+            with self.assertRaises(ValueError):
+                parse_memory_size(value)
+
+
+class TestPaintJobPackerCopy(unittest.TestCase):
+
+    def test_copy_is_identical(self):
+        # Paint Job Packer ships its own copy, so it runs outside this repository
+        self.assertEqual((REPO / "paintjob-packer-master" / "library" / "parallel.py").read_bytes(), (REPO / "core" / "parallel.py").read_bytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from core.sii_templates import SiiTemplate, render_all, trailer_sii_template, TRUCK_SUI
+
+
+class TestSiiTemplate(unittest.TestCase):
+
+    def test_render(self):
+        template = SiiTemplate('unit: ${paint_id}.${model}\n{\n\tname: "${paint_id}"\n}')
+        self.assertEqual(template.fields, {"paint_id", "model"})
+        self.assertEqual(template.render(paint_id="skin1", model="scs.box"), 'unit: skin1.scs.box\n{\n\tname: "skin1"\n}')
+        self.assertEqual(SiiTemplate("{ $plain }").render(), "{ $plain }")
+        with self.assertRaises(KeyError):
+            template.render(paint_id="skin1")
+
+    def test_render_all(self):
+        models = [("truck", "scania.s_2016"), ("trailer_owned", "scs.box")]
+        entries = dict(render_all(["skin1", "skin2"], models, "def", metallic=False, mask=True))
+        self.assertEqual(len(entries), 2 * 2 * 4)
+        truck_sii = entries["def/vehicle/truck/scania.s_2016/paint_job/skin1.sii"].decode()
+        self.assertIn('paint_job_mask: "/vehicle/truck/upgrade/paintjob/scania.s_2016/skin1/skin1_0.tobj"', truck_sii)
+        self.assertIn('@include "skin1_mask.sui"', truck_sii)
+        self.assertNotIn("_metallic.sui", truck_sii)
+        self.assertEqual(entries["def/vehicle/trailer_owned/scs.box/paint_job/skin2.sii"].decode(),
+                         trailer_sii_template(False, True).render(paint_id="skin2", model="scs.box"))
+        self.assertEqual(entries["def/vehicle/truck/scania.s_2016/paint_job/skin2_shared.sui"].decode(),
+                         TRUCK_SUI.render(paint_id="skin2"))
+        self.assertEqual(entries["def/vehicle/truck/scania.s_2016/paint_job/skin2_metallic.sui"], b"")
+        with self.assertRaises(ValueError):
+            list(render_all(["skin1"], [("bus", "x")]))
+
+if __name__ == '__main__':
+    unittest.main()
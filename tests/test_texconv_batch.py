@@ -0,0 +1,63 @@
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.image_utils import convert_many_to_dds
+
+# Stand-in for texconv.exe: reads the -flist file list, "converts" each source by copying it
+# to "<stem>.DDS" in the -o folder, and records every run.
+FAKE_TEXCONV = """#!{python}
+import shutil, sys
+from pathlib import Path
+args = sys.argv[1:]
+out = Path(args[args.index("-o") + 1])
+sources = Path(args[args.index("-flist") + 1]).read_text(encoding="utf-8").splitlines()
+with open(out.parent / "runs.txt", "a") as runs:
+    runs.write(f"{{len(sources)}}\\n")
+for src in sources:
+    shutil.copyfile(src, out / (Path(src).stem + ".DDS"))
+"""
+
+
+@unittest.skipUnless(os.name == "posix", "the fake texconv is a script run through its shebang line")
+class TestTexconvBatch(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.texconv = self.tmp / "texconv"
+        self.texconv.write_text(FAKE_TEXCONV.format(python=sys.executable))
+        self.texconv.chmod(self.texconv.stat().st_mode | stat.S_IEXEC)
+        self.out = self.tmp / "out"
+        self.out.mkdir()
+        self.sources = []
+        for i in range(5):
+            src = self.tmp / f"image{i}.png"
+            src.write_bytes(f"pixels {i}".encode())
+            self.sources.append(src)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_outputs_are_mapped_back_and_renamed(self):
+        outputs = convert_many_to_dds(str(self.texconv), self.sources, self.out, "DXT5", batch_size=2)
+        self.assertEqual(list(outputs), self.sources)
+        for src, dds in outputs.items():
+            self.assertEqual(dds, self.out / f"{src.stem}.dds")
+            self.assertEqual(dds.read_bytes(), src.read_bytes())
+        self.assertEqual(sorted(p.name for p in self.out.iterdir()), [f"image{i}.dds" for i in range(5)])
+        # 5 images in chunks of 2: three texconv runs instead of five
+        self.assertEqual((self.tmp / "runs.txt").read_text().split(), ["2", "2", "1"])
+
+    def test_duplicate_stems_are_rejected(self):
+        other = self.tmp / "other"
+        other.mkdir()
+        (other / "image0.png").write_bytes(b"x")
+        with self.assertRaises(ValueError):
+            convert_many_to_dds(str(self.texconv), [self.sources[0], other / "image0.png"], self.out)
+
+if __name__ == '__main__':
+    unittest.main()
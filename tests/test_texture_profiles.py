@@ -0,0 +1,33 @@
+import unittest
+
+from core.texture_profiles import TextureProfile, profile_for_model, validate_profiles
+
+
+class TestTextureProfiles(unittest.TestCase):
+
+    def setUp(self):
+        self.default = TextureProfile((4096, 4096), "DXT5")
+        self.profiles = [
+            ("scs.box", (1024, 1024), "DXT1"),
+            ("scs.*", (2048, 2048), None),
+            ("krone.*liner", (2048, 2048), "DXT1"),
+        ]
+
+    def test_first_match_wins(self):
+        self.assertEqual(profile_for_model("scs.box", self.profiles, self.default), TextureProfile((1024, 1024), "DXT1"))
+        self.assertEqual(profile_for_model("scs.silo", self.profiles, self.default), TextureProfile((2048, 2048), "DXT5"))
+        self.assertEqual(profile_for_model("krone.dryliner", self.profiles, self.default), TextureProfile((2048, 2048), "DXT1"))
+
+    def test_unmatched_models_use_the_default(self):
+        self.assertEqual(profile_for_model("krone.profilinerhd", self.profiles, self.default), self.default)
+        self.assertEqual(profile_for_model("daf.xf", [], self.default), self.default)
+        self.assertEqual(self.default.key, "4096x4096_DXT5")
+
+    def test_validation(self):
+        validate_profiles(self.profiles)
+        for bad in [("scs.*", (2048,), None), ("", (2048, 2048), None), ("scs.*", (2048, 2048))]:
+            with self.assertRaises(ValueError):
+                validate_profiles([bad])
+
+if __name__ == '__main__':
+    unittest.main()
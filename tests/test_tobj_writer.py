@@ -0,0 +1,73 @@
+import importlib.util
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.tobj_writer import SAVE_MODES, TobjHeader, build_tobj, header_for_mode, parse_tobj, write_many
+
+REPO = Path(__file__).resolve().parent.parent
+PAINTJOB_PACKER = REPO / "paintjob-packer-master"
+PAINTJOB_PACKER_LIBRARY = PAINTJOB_PACKER / "library" / "paintjob.py"
+sys.path.insert(0, str(PAINTJOB_PACKER))
+
+TEXTURE_PATH = "/vehicle/truck/upgrade/paintjob/scania_s_2016/skin0001/skin0001.dds"
+
+# Headers written by the original bytearray implementation, one per save mode,
+# and by Paint Job Packer's hex-string implementation ("clamp")
+GOLDEN_HEADERS = {
+    "default": "010ab1700000000000000000000000000000000001000200020003030300000000010000000100004300000000000000",
+    "mode1":   "010ab1700000000000000000000000000000000001000200020003030300000000000000000100004300000000000000",
+    "mode2":   "010ab1700000000000000000000000000000000001000000020003030300020200000000000100004300000000000000",
+    "mode3":   "010ab1700000000000000000000000000000000001000000020003030200020200010000000100004300000000000000",
+    "clamp":   "010ab1700000000000000000000000000000000001000200020003030300020200010000000100004300000000000000",
+}
+
+
+class TestTobjWriter(unittest.TestCase):
+
+    def test_golden_bytes(self):
+        self.assertEqual(set(SAVE_MODES), set(GOLDEN_HEADERS))
+        for save_mode, header in GOLDEN_HEADERS.items():
+            expected = bytes.fromhex(header) + TEXTURE_PATH.encode()
+            self.assertEqual(build_tobj(TEXTURE_PATH, save_mode), expected, save_mode)
+
+    def test_parse_round_trip(self):
+        for save_mode in SAVE_MODES:
+            header, path = parse_tobj(build_tobj(TEXTURE_PATH, save_mode))
+            self.assertEqual((header, path), (header_for_mode(save_mode), TEXTURE_PATH))
+        self.assertEqual(TobjHeader.unpack(TobjHeader().pack()), TobjHeader())
+
+    def test_long_paths_keep_their_length(self):
+        long_path = "/vehicle/" + "a" * 300 + "/skin.dds"
+        data = build_tobj(long_path)
+        self.assertEqual(int.from_bytes(data[40:44], "little"), len(long_path))
+        self.assertEqual(parse_tobj(data)[1], long_path)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            build_tobj(TEXTURE_PATH, "mode9")
+        with self.assertRaises(ValueError):
+            parse_tobj(b"DDS " + bytes(60))
+        with self.assertRaises(ValueError):
+            parse_tobj(build_tobj(TEXTURE_PATH)[:-1])
+
+    def test_paintjob_packer_uses_shared_writer(self):
+        spec = importlib.util.spec_from_file_location("paintjob", PAINTJOB_PACKER_LIBRARY)
+        paintjob = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(paintjob)
+        self.assertEqual(paintjob.generate_tobj(TEXTURE_PATH), bytes.fromhex(GOLDEN_HEADERS["clamp"]) + TEXTURE_PATH.encode())
+
+    def test_paintjob_packer_copy_is_identical(self):
+        # Paint Job Packer ships its own copy of the writer, so it runs outside this repository
+        self.assertEqual((PAINTJOB_PACKER / "library" / "tobj_writer.py").read_bytes(), (REPO / "core" / "tobj_writer.py").read_bytes())
+
+    def test_write_many(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tobjs = [(Path(tmp) / f"skin{i}.tobj", f"/material/ui/accessory/skin{i}.dds") for i in range(5)]
+            self.assertEqual(write_many(tobjs, "mode2"), 5)
+            for tobj_path, texture_path in tobjs:
+                self.assertEqual(tobj_path.read_bytes(), build_tobj(texture_path, "mode2"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PAINTJOB_PACKER = Path(__file__).resolve().parent.parent / "paintjob-packer-master"
+PAINTJOB_PACKER_LIBRARY = PAINTJOB_PACKER / "library" / "paintjob.py"
+sys.path.insert(0, str(PAINTJOB_PACKER))
+
+TRAILER_INI = """[vehicle info]
+name = {name}
+vehicle path = scs.box
+trailer = True
+mod = False
+mod link workshop =
+mod link forums =
+mod link trucky =
+mod link author site =
+uses accessories = False
+bus mod = False
+bus door workaround = False
+"""
+
+
+class TestVehicleIndex(unittest.TestCase):
+
+    def setUp(self):
+        spec = importlib.util.spec_from_file_location("paintjob", PAINTJOB_PACKER_LIBRARY)
+        self.paintjob = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(self.paintjob)
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.paintjob.vehicle_index_folder = os.path.join(self.tmp.name, "cache")
+        os.makedirs("library/vehicles/ets")
+        self.write_ini("box.ini", "Box Trailer")
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        self.tmp.cleanup()
+
+    def write_ini(self, file_name, name, mtime_ns=None):
+        path = "library/vehicles/ets/" + file_name
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(TRAILER_INI.format(name=name))
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_index_is_saved_and_reused(self):
+        vehicle = self.paintjob.Vehicle("box.ini", "ets")
+        self.assertEqual((vehicle.display_name, vehicle.type, vehicle.trailer), ("Box Trailer", "trailer_owned", True))
+        with open("cache/ets-vehicle-index.json", encoding="utf-8") as file:
+            index = json.load(file)
+        self.assertEqual(index["vehicles"]["box.ini"]["sections"]["vehicle info"]["name"], "Box Trailer")
+
+        # A fresh process reads the saved index instead of the INI files
+        self.paintjob.vehicle_indexes.clear()
+        self.paintjob.read_vehicle_ini = None
+        self.assertEqual(list(self.paintjob.load_vehicle_index("ets")), ["box.ini"])
+
+    def test_changed_files_are_read_again(self):
+        self.paintjob.load_vehicle_index("ets")
+        self.write_ini("box.ini", "Renamed Trailer", mtime_ns=10 ** 18)
+        self.write_ini("curtain.ini", "Curtainsider")
+        # Lookups are served from memory until the folder is checked again
+        self.assertEqual(list(self.paintjob.load_vehicle_index("ets")), ["box.ini"])
+        vehicles = self.paintjob.load_vehicle_index("ets", refresh=True)
+        self.assertEqual(vehicles["box.ini"]["sections"]["vehicle info"]["name"], "Renamed Trailer")
+        self.assertEqual(sorted(vehicles), ["box.ini", "curtain.ini"])
+        os.remove("library/vehicles/ets/curtain.ini")
+        self.assertEqual(list(self.paintjob.load_vehicle_index("ets", refresh=True)), ["box.ini"])
+
+    def test_index_of_another_install_is_ignored(self):
+        self.paintjob.load_vehicle_index("ets")
+        other_install = os.path.join(self.tmp.name, "other")
+        os.makedirs(other_install + "/library/vehicles/ets")
+        os.chdir(other_install)
+        self.write_ini("box.ini", "Other Trailer")
+        self.paintjob.vehicle_indexes.clear()
+        self.assertEqual(self.paintjob.vehicle_sections("ets", "box.ini")["vehicle info"]["name"], "Other Trailer")
+
+    def test_read_bool(self):
+        self.assertTrue(self.paintjob.read_bool("Yes"))
+        self.assertFalse(self.paintjob.read_bool("off"))
+        self.assertIsNone(self.paintjob.read_bool(None))
+        with self.assertRaises(ValueError):
+            self.paintjob.read_bool("maybe")
+
+if __name__ == '__main__':
+    unittest.main()